@@ -26,11 +26,16 @@ class AccessPermission(BasePermission):
         if self.allow_superuser and user.is_superuser:
             return True
 
-        for role in self.allowed_roles:
-            if user.groups.filter(name=role).exists():
-                return True
+        if not self.allowed_roles:
+            return False
 
-        return False
+        # Stateless path: roles come from the access token claims
+        roles = getattr(user, "roles", None)
+        if roles is not None:
+            return any(role in roles for role in self.allowed_roles)
+
+        # DB-backed path (session / admin users)
+        return user.groups.filter(name__in=self.allowed_roles).exists()
 
 
 class AccessPermissionFactory:
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Q, Value
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+# Claims embedded into every issued token
+GROUPS_CLAIM = "groups"
+SUPERUSER_CLAIM = "is_superuser"
+
+
+def set_role_claims(token, groups: list[str], is_superuser: bool) -> None:
+    token[GROUPS_CLAIM] = groups
+    token[SUPERUSER_CLAIM] = is_superuser
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Embeds the user's group names and superuser flag into the token pair,
+    so role checks can be resolved from the access token without DB queries.
+    Role changes apply to the access tokens issued from the next refresh (`RoleTokenRefreshSerializer`).
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        set_role_claims(token, list(user.groups.values_list("name", flat=True)), user.is_superuser)
+        return token
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Re-reads the user's roles and active flag (one query) instead of copying the claims of the refresh token,
+    so a demoted, deleted or deactivated user keeps their roles for one access token lifetime at most.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user = (
+            get_user_model().objects
+            .filter(**{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)})
+            .annotate(group_names=ArrayAgg("groups__name", filter=Q(groups__isnull=False), default=Value([])))
+            .first()
+        )
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        set_role_claims(refresh, user.group_names, user.is_superuser)
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # Blacklist app not installed
+                    pass
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data["refresh"] = str(refresh)
+
+        return data
+
+
+class ClaimsTokenUser(TokenUser):
+    """
+    Stateless user built from a validated token by `JWTStatelessUserAuthentication`.
+    """
+
+    @cached_property
+    def roles(self) -> frozenset[str]:
+        return frozenset(self.token.get(GROUPS_CLAIM, []))
+
+    @cached_property
+    def is_superuser(self) -> bool:
+        return self.token.get(SUPERUSER_CLAIM, False)
@@ -0,0 +1,90 @@
+"""
+Shared helpers for the benchmark scripts (`python -m benchmarks.<name>`).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable
+
+DEFAULT_SETTINGS_MODULE = "entities.config.settings"
+
+
+def setup_django(settings_module: str = DEFAULT_SETTINGS_MODULE):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    import django
+    django.setup()
+
+
+def get_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per case (default: 20).")
+    parser.add_argument("--output", help="Write JSON results to this path (default: stdout).")
+    return parser
+
+
+def measure(func: Callable, repeat: int = 20, warmup: int = 2) -> dict:
+    """
+    Call `func` `warmup + repeat` times and summarize the timed runs in milliseconds.
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+def measure_resources(func: Callable, using: str = "default") -> dict:
+    """
+    Run `func` once, counting the database queries it executes and its peak traced Python memory.
+    """
+    from django.db import connections
+    from django.test.utils import CaptureQueriesContext
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connections[using]) as context:
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"queries": len(context.captured_queries), "peak_kib": round(peak / 1024, 1)}
+
+
+def write_results(name: str, params: dict, results: list[dict], output: str = None):
+    """
+    Dump a benchmark run as JSON: metadata, parameters and one entry per measured case.
+    """
+    payload = {
+        "benchmark": name,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    if output:
+        with open(output, "w") as file:
+            json.dump(payload, file, indent=2)
+    else:
+        json.dump(payload, sys.stdout, indent=2)
+        sys.stdout.write("\n")
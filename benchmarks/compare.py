@@ -0,0 +1,78 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+Cases are matched on their identifying fields (every non-metric field, e.g. scale + case or
+variant + query). A case regresses when its median time grows by more than `--threshold` percent,
+or when it runs more queries than before. Exits with status 1 if any case regressed.
+
+Usage:
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+# Measured values; all other fields identify the case
+METRIC_FIELDS = {
+    "runs", "min_ms", "median_ms", "p95_ms", "max_ms", "queries", "peak_kib",
+    "index_bytes", "plan", "entity_rows", "entity_detail_rows",
+}
+
+
+def get_case_key(result: dict) -> tuple:
+    return tuple(sorted((key, str(value)) for key, value in result.items() if key not in METRIC_FIELDS))
+
+
+def load_results(path: str) -> dict[tuple, dict]:
+    with open(path) as file:
+        payload = json.load(file)
+    return {get_case_key(result): result for result in payload["results"]}
+
+
+def compare(baseline: dict[tuple, dict], current: dict[tuple, dict], threshold: float) -> list[dict]:
+    rows = []
+    for key, result in current.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+
+        change = (result["median_ms"] - base["median_ms"]) / base["median_ms"] * 100 if base["median_ms"] else 0.0
+        queries_before, queries_after = base.get("queries"), result.get("queries")
+        rows.append({
+            "case": " ".join(value for _, value in key),
+            "median_before": base["median_ms"],
+            "median_after": result["median_ms"],
+            "change_pct": round(change, 1),
+            "queries_before": queries_before,
+            "queries_after": queries_after,
+            "regressed": change > threshold or (
+                queries_before is not None and queries_after is not None and queries_after > queries_before
+            ),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline", help="Baseline results (JSON written by a benchmark).")
+    parser.add_argument("current", help="Results to compare against the baseline.")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed median slowdown in %% (default: 10).")
+    args = parser.parse_args()
+
+    rows = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+    width = max((len(row["case"]) for row in rows), default=4)
+
+    print(f"{'case':<{width}}  {'before ms':>10}  {'after ms':>10}  {'change':>8}  {'queries':>9}")
+    for row in rows:
+        queries = f"{row['queries_before']}->{row['queries_after']}" if row["queries_before"] is not None else "-"
+        marker = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['case']:<{width}}  {row['median_before']:>10.3f}  {row['median_after']:>10.3f}  "
+            f"{row['change_pct']:>+7.1f}%  {queries:>9}{marker}"
+        )
+
+    sys.exit(1 if any(row["regressed"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare per-request latency with and without pooled Postgres connections.
+
+Every timed run simulates one request: `request_started`, the snapshot read queries
+(current entity, its current detail, its entity type), then `request_finished`. Django closes
+or recycles connections on those signals exactly as it does when serving traffic.
+
+Variants:
+    - new_connection: the default settings, a new connection per request (CONN_MAX_AGE = 0).
+    - persistent: one connection kept per worker (CONN_MAX_AGE = 600).
+    - pooled: the production profile (`core.production`), pool + server-side binding + prepared statements.
+
+Usage:
+    python -m benchmarks.connections --repeat 200 --output connections.json
+"""
+import uuid
+
+from benchmarks.base import get_parser, measure, setup_django, write_results
+
+
+def get_variants(database: dict) -> dict[str, dict]:
+    from core.production import get_pooled_database
+
+    return {
+        "new_connection": {**database, "CONN_MAX_AGE": 0},
+        "persistent": {**database, "CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True},
+        "pooled": get_pooled_database(database),
+    }
+
+
+def get_request(alias: str, entity_uuid):
+    from django.core.signals import request_finished, request_started
+
+    from entities.models import Entity, EntityDetail, EntityType
+
+    def request():
+        request_started.send(sender=None)
+        try:
+            entity = Entity.objects.using(alias).current().filter(uuid=entity_uuid).first()
+            list(EntityDetail.objects.using(alias).current().filter(entity_uuid=entity_uuid))
+            if entity is not None:
+                EntityType.objects.using(alias).filter(pk=entity.entity_type_id).first()
+        finally:
+            request_finished.send(sender=None)
+
+    return request
+
+
+def run(repeat: int) -> list[dict]:
+    from django.db import connections
+
+    from entities.models import Entity
+
+    entity_uuid = Entity.objects.current().values_list("uuid", flat=True).first() or uuid.uuid4()
+    connections["default"].close()
+
+    results = []
+    for variant, database in get_variants(connections.settings["default"]).items():
+        alias = f"bench_{variant}"
+        connections.settings[alias] = database
+        try:
+            results.append({"variant": variant, **measure(get_request(alias, entity_uuid), repeat=repeat)})
+        finally:
+            connection = connections[alias]
+            connection.close()
+            if getattr(connection, "pool", None) is not None:
+                connection.close_pool()
+            del connections[alias]
+            del connections.settings[alias]
+    return results
+
+
+def main():
+    parser = get_parser(__doc__.strip().splitlines()[0])
+    parser.set_defaults(repeat=200)
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.repeat)
+    write_results("connections", {"repeat": args.repeat}, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Compare GiST, btree and BRIN index choices for SCD2 history queries.
+
+Seeds a temporary table shaped like an SCD2 model (N keys x M versions, inserted in time order),
+then times the as-of, window and current-list queries under each index variant.
+The temporary table lives in the benchmark session only; no application data is touched.
+
+Usage:
+    python -m benchmarks.indexes --keys 20000 --versions 10 --output indexes.json
+"""
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.base import get_parser, measure, setup_django, write_results
+
+TABLE = "bench_scd2_history"
+
+VARIANTS = {
+    "none": [],
+    "gist_validity": [f"CREATE INDEX ON {TABLE} USING gist (validity)"],
+    "btree_valid_from_to": [f"CREATE INDEX ON {TABLE} (valid_from, valid_to)"],
+    "brin_valid_from_to": [f"CREATE INDEX ON {TABLE} USING brin (valid_from, valid_to)"],
+    "partial_current_covering": [f"CREATE INDEX ON {TABLE} (id) INCLUDE (uuid, display_name) WHERE is_current"],
+}
+
+QUERIES = {
+    "as_of_range": f"SELECT count(*) FROM {TABLE} WHERE validity @> %(ts)s::timestamptz",
+    "as_of_columns": (
+        f"SELECT count(*) FROM {TABLE} "
+        f"WHERE valid_from <= %(ts)s AND (valid_to IS NULL OR valid_to > %(ts)s)"
+    ),
+    "window": (
+        f"SELECT count(*) FROM {TABLE} "
+        f"WHERE valid_from BETWEEN %(from_dt)s AND %(to_dt)s OR valid_to BETWEEN %(from_dt)s AND %(to_dt)s"
+    ),
+    "current_page": f"SELECT id, uuid, display_name FROM {TABLE} WHERE is_current ORDER BY id LIMIT 100",
+}
+
+
+def seed(cursor, keys: int, versions: int, start: datetime, step: timedelta):
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(
+        f"CREATE TEMPORARY TABLE {TABLE} ("
+        f"id bigserial PRIMARY KEY, uuid uuid NOT NULL, display_name varchar(255) NOT NULL, "
+        f"valid_from timestamptz NOT NULL, valid_to timestamptz, is_current boolean NOT NULL, "
+        f"validity tstzrange GENERATED ALWAYS AS (tstzrange(valid_from, valid_to, '[)')) STORED)"
+    )
+    # Versions are appended in time order: version v of every key opens at start + v * step
+    cursor.execute(
+        f"INSERT INTO {TABLE} (uuid, display_name, valid_from, valid_to, is_current) "
+        f"SELECT k.uuid, 'entity ' || v, "
+        f"  %(start)s + v * %(step)s + k.n * interval '1 millisecond', "
+        f"  CASE WHEN v < %(last)s THEN %(start)s + (v + 1) * %(step)s + k.n * interval '1 millisecond' END, "
+        f"  v = %(last)s "
+        f"FROM generate_series(0, %(last)s) v "
+        f"CROSS JOIN (SELECT n, md5(n::text)::uuid AS uuid FROM generate_series(1, %(keys)s) n) k "
+        f"ORDER BY v, k.n",
+        {"start": start, "step": step, "last": versions - 1, "keys": keys},
+    )
+    cursor.execute(f"ANALYZE {TABLE}")
+
+
+def get_plan_node(cursor, sql: str, params: dict) -> str:
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+    plan = cursor.fetchone()[0][0]["Plan"]
+    while plan.get("Plans") and plan["Node Type"] in ("Aggregate", "Limit", "Gather"):
+        plan = plan["Plans"][0]
+    return plan["Node Type"]
+
+
+def run(keys: int, versions: int, repeat: int) -> list[dict]:
+    from django.db import connection
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    step = timedelta(days=1)
+    params = {
+        "ts": start + step * (versions // 2) + timedelta(hours=12),
+        "from_dt": start + step * (versions // 2),
+        "to_dt": start + step * (versions // 2) + timedelta(hours=6),
+    }
+
+    results = []
+    with connection.cursor() as cursor:
+        seed(cursor, keys, versions, start, step)
+
+        for variant, statements in VARIANTS.items():
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(f"ANALYZE {TABLE}")
+            cursor.execute(
+                "SELECT coalesce(sum(pg_relation_size(indexrelid)), 0)::bigint FROM pg_index "
+                "WHERE indrelid = %s::regclass AND NOT indisprimary",
+                [TABLE],
+            )
+            index_bytes = cursor.fetchone()[0]
+
+            for query, sql in QUERIES.items():
+                def execute(sql=sql):
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+
+                results.append({
+                    "variant": variant,
+                    "query": query,
+                    "index_bytes": index_bytes,
+                    "plan": get_plan_node(cursor, sql, params),
+                    **measure(execute, repeat=repeat),
+                })
+
+            cursor.execute(
+                "SELECT indexrelid::regclass::text FROM pg_index "
+                "WHERE indrelid = %s::regclass AND NOT indisprimary",
+                [TABLE],
+            )
+            for (index_name,) in cursor.fetchall():
+                cursor.execute(f"DROP INDEX {index_name}")
+
+        cursor.execute(f"DROP TABLE {TABLE}")
+    return results
+
+
+def main():
+    parser = get_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--keys", type=int, default=20000, help="Natural keys to seed (default: 20000).")
+    parser.add_argument("--versions", type=int, default=10, help="Versions per key (default: 10).")
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.keys, args.versions, args.repeat)
+    write_results(
+        "indexes",
+        {"keys": args.keys, "versions": args.versions, "repeat": args.repeat},
+        results,
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
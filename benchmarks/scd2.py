@@ -0,0 +1,224 @@
+"""
+Time SCD2 operations and the entities API endpoints at several data scales.
+
+For every scale `NxMxK` a throwaway test database is seeded with N entities x M versions,
+each entity with K details of M versions (the measured entity has a single detail). Then every
+case is timed (`measure`) and run once more to count its queries and peak Python memory
+(`measure_resources`). The versioned read cache is disabled unless `--with-cache` is given,
+so the database paths are measured.
+
+Cases:
+    - ops: hash_diff, new_version, save, get_changes_all
+    - api: list, snapshot, patch, history, as_of, diff
+
+Usage:
+    python -m benchmarks.scd2 --scales 100x5x2 1000x10x3 --output scd2.json
+    python -m benchmarks.compare baseline.json scd2.json
+"""
+import itertools
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.base import get_parser, measure, measure_resources, setup_django, write_results
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+STEP = timedelta(days=1)
+BATCH_SIZE = 5000
+
+
+def parse_scale(value: str) -> tuple[int, int, int]:
+    entities, versions, details = (int(part) for part in value.lower().split("x"))
+    if min(entities, versions, details) < 1:
+        raise ValueError(f"Invalid scale '{value}', use NxMxK with positive numbers.")
+    return entities, versions, details
+
+
+def get_validity(version: int, versions: int, offset: int) -> dict:
+    """
+    Contiguous validity of version `version` out of `versions`, shifted by `offset` microseconds per key.
+    """
+    valid_from = START + version * STEP + timedelta(microseconds=offset)
+    is_current = version == versions - 1
+    return {
+        "valid_from": valid_from,
+        "valid_to": None if is_current else valid_from + STEP,
+        "is_current": is_current,
+    }
+
+
+def seed(entities: int, versions: int, details: int) -> dict:
+    """
+    Bulk insert the versions (hash_diff included) and return handles used by the cases.
+    """
+    from entities.models import Entity, EntityDetail, EntityType
+
+    entity_type = EntityType.objects.create(code="BENCH", name="Benchmark")
+    entity_uuids = [uuid.uuid4() for _ in range(entities)]
+    # The snapshot / patch endpoints expect a single current detail: the measured entity gets one
+    target = entities // 2
+
+    def iter_entities():
+        for n, entity_uuid in enumerate(entity_uuids):
+            for version in range(versions):
+                yield Entity(
+                    uuid=entity_uuid,
+                    display_name=f"Entity {n} v{version}",
+                    entity_type=entity_type,
+                    **get_validity(version, versions, n),
+                )
+
+    def iter_details():
+        for n, entity_uuid in enumerate(entity_uuids):
+            for _ in range(1 if n == target else details):
+                detail_code = uuid.uuid4()
+                for version in range(versions):
+                    yield EntityDetail(
+                        entity_uuid=entity_uuid,
+                        detail_code=detail_code,
+                        value=f"value {version}",
+                        **get_validity(version, versions, n),
+                    )
+
+    for model, rows in ((Entity, iter_entities()), (EntityDetail, iter_details())):
+        while batch := list(itertools.islice(rows, BATCH_SIZE)):
+            for obj in batch:
+                obj.hash_diff = obj.compute_hash_diff()
+            model.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+
+    return {"entity_uuid": entity_uuids[target]}
+
+
+def get_api_client():
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIClient
+
+    from auth.tokens import RoleTokenObtainPairSerializer
+
+    user = User.objects.create_superuser(username="benchmark", password="benchmark")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleTokenObtainPairSerializer.get_token(user).access_token}")
+    return client
+
+
+def get_cases(entity_uuid, versions: int) -> dict:
+    from django.urls import reverse
+
+    from core.models.scd2.changes import get_changes_all
+    from entities.models import Entity
+
+    client = get_api_client()
+    counter = itertools.count()
+    as_of = (START + STEP * (versions // 2) + timedelta(hours=12)).date().isoformat()
+    diff_window = {"from": START.date().isoformat(), "to": (START + STEP * versions).date().isoformat()}
+
+    def get_current() -> Entity:
+        return Entity.objects.current().get(uuid=entity_uuid)
+
+    def new_version():
+        get_current().new_version(save=True, display_name=f"Renamed {next(counter)}")
+
+    def save():
+        entity = get_current()
+        entity.display_name = f"Saved {next(counter)}"
+        entity.save()
+
+    def get(url_name, *args, **params):
+        def request():
+            response = client.get(reverse(url_name, args=args), params)
+            assert response.status_code == 200, response.content
+        return request
+
+    def patch():
+        response = client.patch(
+            reverse("entity-snapshot", args=[entity_uuid]),
+            {"display_name": f"Patched {next(counter)}", "detail": {"value": f"patched {next(counter)}"}},
+            format="json",
+        )
+        assert response.status_code == 200, response.content
+
+    history = Entity.objects.filter(uuid=entity_uuid).order_by("-valid_from")
+    entity = get_current()
+
+    return {
+        "ops.hash_diff": entity.compute_hash_diff,
+        "ops.new_version": new_version,
+        "ops.save": save,
+        "ops.get_changes_all": lambda: get_changes_all(list(history)),
+        "api.list": get("entity", limit=100),
+        "api.snapshot": get("entity-snapshot", entity_uuid),
+        "api.history": get("entity-history", entity_uuid),
+        "api.as_of": get("entities-asof", as_of=as_of),
+        "api.diff": get("entities-diff", **diff_window),
+        "api.patch": patch,
+    }
+
+
+def run_scale(scale: str, repeat: int, cases: list[str] = None) -> list[dict]:
+    from django.db import connection
+
+    from entities.models import Entity, EntityDetail
+
+    entities, versions, details = parse_scale(scale)
+    handles = seed(entities, versions, details)
+    rows = {"entity_rows": Entity.objects.count(), "entity_detail_rows": EntityDetail.objects.count()}
+
+    results = []
+    for case, func in get_cases(handles["entity_uuid"], versions).items():
+        if cases and not any(case.startswith(prefix) for prefix in cases):
+            continue
+        results.append({
+            "scale": scale,
+            "case": case,
+            **rows,
+            **measure(func, repeat=repeat),
+            **measure_resources(func, using=connection.alias),
+        })
+    return results
+
+
+def run(scales: list[str], repeat: int, cases: list[str] = None, with_cache: bool = False) -> list[dict]:
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    results = []
+    try:
+        with override_settings(**({} if with_cache else {"SCD2_CACHE": None})):
+            for scale in scales:
+                # Fresh database per scale, so every scale starts from the same seeded state
+                connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                try:
+                    results += run_scale(scale, repeat, cases)
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+    finally:
+        teardown_test_environment()
+    return results
+
+
+def main():
+    parser = get_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scales", nargs="+", default=["100x5x2", "1000x10x3"],
+        help="Scales as ENTITIESxVERSIONSxDETAILS (default: 100x5x2 1000x10x3).",
+    )
+    parser.add_argument("--cases", nargs="*", help="Only run cases starting with these prefixes (e.g. ops api.list).")
+    parser.add_argument("--with-cache", action="store_true", help="Keep the versioned read cache enabled.")
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        parse_scale(scale)
+
+    setup_django()
+    results = run(args.scales, args.repeat, args.cases, args.with_cache)
+    write_results(
+        "scd2",
+        {"scales": args.scales, "repeat": args.repeat, "cases": args.cases, "with_cache": args.with_cache},
+        results,
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
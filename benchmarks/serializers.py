@@ -0,0 +1,81 @@
+"""
+Compare rows/sec of the history read path: DRF serializers vs. precompiled row serializers, JSON vs. orjson rendering.
+
+A throwaway test database is seeded with one entity of N versions (and one detail of N versions),
+then the entity history is read and rendered with each combination:
+    - serializer.*: model instances through `EntityHistorySerializer(many=True)`
+    - rows.*: `values_list()` rows through `entity_history_rows` (`core.utils.rows`)
+    - *.json / *.orjson: DRF's `JSONRenderer` / `ORJSONRenderer`
+
+Usage:
+    python -m benchmarks.serializers --versions 100000 --output serializers.json
+"""
+from benchmarks.base import get_parser, measure, setup_django, write_results
+from benchmarks.scd2 import seed
+
+
+def get_cases(entity_uuid) -> dict:
+    from rest_framework.renderers import JSONRenderer
+
+    from core.utils.renderers import ORJSONRenderer
+    from entities.models import Entity
+    from entities.v1 import serializers as sz
+
+    history = Entity.objects.filter(uuid=entity_uuid).order_by("-valid_from", "-id")
+
+    def read(serialize, renderer):
+        def case():
+            renderer.render({"entity_history": serialize()})
+        return case
+
+    def serializer():
+        return sz.EntityHistorySerializer(list(history), many=True).data
+
+    def rows():
+        return sz.entity_history_rows.values(history)
+
+    return {
+        "serializer.json": read(serializer, JSONRenderer()),
+        "serializer.orjson": read(serializer, ORJSONRenderer()),
+        "rows.json": read(rows, JSONRenderer()),
+        "rows.orjson": read(rows, ORJSONRenderer()),
+    }
+
+
+def run(versions: int, repeat: int) -> list[dict]:
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        handles = seed(1, versions, 1)
+        results = []
+        for case, func in get_cases(handles["entity_uuid"]).items():
+            timings = measure(func, repeat=repeat, warmup=1)
+            results.append({
+                "case": case,
+                "rows": versions,
+                **timings,
+                "rows_per_sec": round(versions / timings["median_ms"] * 1000),
+            })
+        return results
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def main():
+    parser = get_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--versions", type=int, default=100000, help="History rows of the entity (default: 100000).")
+    parser.set_defaults(repeat=5)
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.versions, args.repeat)
+    write_results("serializers", {"versions": args.versions, "repeat": args.repeat}, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 from django.contrib import admin
 from django.urls import path
 
+from core.metrics import metrics_view
+
 urlpatterns = [
+    path("metrics", metrics_view, name="metrics"),
     path("", admin.site.urls),
 ]
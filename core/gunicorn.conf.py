@@ -0,0 +1,62 @@
+"""
+Gunicorn configuration of the production profile.
+
+    # WSGI (cockpit / entities)
+    DJANGO_SETTINGS_MODULE=entities.config.settings_production gunicorn -c core/gunicorn.conf.py core.wsgi:application
+    # ASGI (entities async read endpoints)
+    DJANGO_SETTINGS_MODULE=entities.config.settings_asgi_production GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker \
+        gunicorn -c core/gunicorn.conf.py entities.asgi:application
+
+The application is imported once in the master (`preload_app`) and shared by the forked workers.
+Database connections and pools are created lazily, per worker, after the fork.
+"""
+import glob
+import multiprocessing
+import os
+
+# Prometheus multiprocess mode: workers (and `ingest_entities` runs) write their samples here, /metrics aggregates them.
+# Prepared before the application (and prometheus_client) is preloaded. This file is read again on every
+# reload (HUP), so samples of a previous run are only dropped once, in `on_starting`.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+preload_app = True
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers to bound memory growth
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # Drop the samples of the previous master's workers; workers write to fresh per-process files after the fork
+    for path in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    # Never share sockets opened in the master (e.g. by a preload-time query) with the workers
+    from django.db import connections
+
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        close_pool = getattr(connection, "close_pool", None)
+        if close_pool is not None:
+            close_pool()
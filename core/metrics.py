@@ -0,0 +1,101 @@
+"""
+Prometheus metrics of the SCD2 engine, ingestion and the HTTP API.
+
+With several worker processes (gunicorn), set `PROMETHEUS_MULTIPROC_DIR` to a writable directory
+before prometheus_client is imported: every process, `ingest_entities` runs included, writes its samples
+there and `metrics_view` aggregates them. Without it, the metrics of the current process are exposed.
+"""
+import hmac
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+
+DEFAULT_METRICS = {
+    "ENABLED": True,
+    # Bearer token required by GET /metrics (`Authorization: Bearer <token>`); None serves it unauthenticated
+    "TOKEN": None,
+}
+
+# SCD2
+SCD2_TRANSITIONS = Counter(
+    "scd2_transitions_total",
+    "SCD2 transitions (current version closed and replaced), per model and write path.",
+    ["model", "path"],
+)
+SCD2_HASH_DIFF_SKIPS = Counter(
+    "scd2_hash_diff_skips_total",
+    "Saves and bulk versions skipped because the hash_diff did not change.",
+    ["model", "reason"],
+)
+SCD2_CONFLICT_RETRIES = Counter(
+    "scd2_conflict_retries_total",
+    "Concurrent-transition conflicts (constraint violations / lost conditional closes) per outcome.",
+    ["model", "outcome"],
+)
+
+# Ingestion
+INGEST_ROWS = Counter(
+    "ingest_rows_total",
+    "Ingested rows per result.",
+    ["result"],
+)
+INGEST_SECONDS = Counter(
+    "ingest_seconds_total",
+    "Time spent applying ingestion chunks.",
+)
+INGEST_ROWS_PER_SECOND = Gauge(
+    "ingest_rows_per_second",
+    "Throughput of the most recently applied ingestion chunk.",
+    multiprocess_mode="mostrecent",
+)
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Request latency per endpoint (URL route pattern).",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+def get_metrics_settings() -> dict:
+    return {**DEFAULT_METRICS, **getattr(settings, "METRICS", {})}
+
+
+def get_model_label(model) -> str:
+    return model._meta.label_lower
+
+
+def get_registry():
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def is_metrics_request_allowed(request, token: str | None) -> bool:
+    if token is None:
+        return True
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(credentials.strip().encode(), token.encode())
+
+
+def metrics_view(request):
+    """
+    GET /metrics: all metrics in the Prometheus text format, aggregated over worker processes.
+    404 when metrics are disabled, 401 without the configured bearer token.
+    """
+    config = get_metrics_settings()
+    if not config["ENABLED"]:
+        raise Http404()
+    if not is_metrics_request_allowed(request, config["TOKEN"]):
+        response = HttpResponse("Unauthorized", status=401, content_type="text/plain")
+        response["WWW-Authenticate"] = 'Bearer realm="metrics"'
+        return response
+
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
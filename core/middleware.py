@@ -0,0 +1,136 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from core.metrics import HTTP_REQUEST_DURATION, get_metrics_settings
+from core.utils.instrumentation import QueryRecorder, get_instrumentation_settings, install_query_recorder
+
+logger = logging.getLogger("core.middleware")
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records the database statements of every request (count, total time, slowest statement)
+    through an `execute_wrapper` installed on all database connections, including those of the
+    threads running sync views under ASGI.
+
+    The numbers are exposed as a `Server-Timing` header and logged as one JSON line on the
+    `core.middleware` logger. Toggled per deployment with `settings.QUERY_INSTRUMENTATION`;
+    when disabled the middleware removes itself from the stack (MiddlewareNotUsed).
+
+    Queries run while a streaming response is consumed happen after the response is returned
+    and are not counted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.config = get_instrumentation_settings()
+        if not self.config["ENABLED"]:
+            raise MiddlewareNotUsed()
+
+        connection_created.connect(install_query_recorder, dispatch_uid="core.middleware.install_query_recorder")
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder, start = QueryRecorder(), time.perf_counter()
+        with self.record(recorder):
+            response = self.get_response(request)
+        return self.process(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        recorder, start = QueryRecorder(), time.perf_counter()
+        with self.record(recorder):
+            response = await self.get_response(request)
+        return self.process(request, response, recorder, time.perf_counter() - start)
+
+    @staticmethod
+    @contextmanager
+    def record(recorder: QueryRecorder):
+        # Connections of this thread may predate the connection_created receiver
+        for connection in connections.all():
+            install_query_recorder(connection)
+        token = recorder.activate()
+        try:
+            yield recorder
+        finally:
+            recorder.deactivate(token)
+
+    def process(self, request, response, recorder: QueryRecorder, duration: float):
+        if self.config["SERVER_TIMING"]:
+            response["Server-Timing"] = get_server_timing(recorder, duration)
+
+        if self.config["LOG"]:
+            sql = recorder.slowest_sql
+            logger.info(json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round(duration * 1000, 3),
+                "db_queries": recorder.count,
+                "db_ms": round(recorder.total * 1000, 3),
+                "db_slowest_ms": round(recorder.slowest * 1000, 3),
+                "db_slowest_sql": sql[:self.config["MAX_SQL_LENGTH"]] if sql else None,
+            }))
+        return response
+
+
+def get_server_timing(recorder: QueryRecorder, duration: float) -> str:
+    """
+    e.g. `db;desc="3 queries";dur=4.210, db-slowest;dur=2.004, total;dur=11.873`
+    """
+    return ", ".join([
+        f'db;desc="{recorder.count} queries";dur={recorder.total * 1000:.3f}',
+        f"db-slowest;dur={recorder.slowest * 1000:.3f}",
+        f"total;dur={duration * 1000:.3f}",
+    ])
+
+
+class MetricsMiddleware:
+    """
+    Observes the latency of every request in the `http_request_duration_seconds` histogram,
+    labelled by method, URL route pattern (bounded cardinality) and status code.
+    Disabled with `settings.METRICS = {"ENABLED": False}`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_metrics_settings()["ENABLED"]:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        return response
+
+    @staticmethod
+    def observe(request, response, duration: float) -> None:
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match is not None else "<unmatched>"
+        HTTP_REQUEST_DURATION.labels(request.method, route, str(response.status_code)).observe(duration)
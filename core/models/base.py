@@ -13,6 +13,64 @@ class BaseModel(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._capture_loaded_values()
+        return instance
+
+    @classmethod
+    def get_tracked_fields(cls) -> set[str]:
+        """
+        Fields whose loaded values are kept on the instance (see `get_loaded_values`).
+        Mixins extend the set cooperatively: `return super().get_tracked_fields() | {...}`.
+        """
+        return set()
+
+    @classmethod
+    def _get_tracked_attnames(cls) -> dict[str, str]:
+        # Resolved once per class: {field name: attname}
+        tracked = cls.__dict__.get("_tracked_attnames")
+        if tracked is None:
+            tracked = {name: cls._meta.get_field(name).attname for name in cls.get_tracked_fields()}
+            cls._tracked_attnames = tracked
+        return tracked
+
+    def _capture_loaded_values(self) -> None:
+        self._loaded_values = {
+            name: self.__dict__[attname]
+            for name, attname in self._get_tracked_attnames().items()
+            if attname in self.__dict__
+        }
+
+    def get_loaded_values(self) -> dict | None:
+        """
+        Values of the tracked fields as last loaded from / saved to the database,
+        or None for instances that were never loaded or saved.
+        """
+        return getattr(self, "_loaded_values", None)
+
+    def has_changed(self, fields: list[str]) -> bool | None:
+        """
+        Compare `fields` with their loaded values without querying the database.
+
+        Returns:
+            bool | None: True/False, or None if the loaded values of `fields` are unknown.
+        """
+        loaded = self.get_loaded_values()
+        if loaded is None or any(field not in loaded for field in fields):
+            return None
+        attnames = self._get_tracked_attnames()
+        return any(self.__dict__.get(attnames[field]) != loaded[field] for field in fields)
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._capture_loaded_values()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._capture_loaded_values()
+
     def check_fields_change(self, data: dict, set_attrs: bool = False) -> bool:
         """
         Check if any of the given fields have different values compared to the instance.
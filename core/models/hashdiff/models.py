@@ -1,6 +1,8 @@
 import hashlib
 from django.db import models
 
+from core.metrics import SCD2_HASH_DIFF_SKIPS, get_model_label
+
 
 class HashDiffConfig:
     fields: list = []
@@ -60,12 +62,31 @@ class HashDiffMixin(models.Model):
         2. If the new hash matches the existing `hash_diff`, the save is skipped
            (idempotent behavior).
         3. Otherwise, updates `hash_diff` and calls the superclass save method.
+        The hash fields are tracked at load time, so saving an instance whose hash was computed
+        by the previous save and whose hash fields did not change skips the rehash altogether.
         """
         if self.hash_diff_config.fields and self.pk:
-            # kwargs["hash_diff_checked"] = True
+            # Hash computed by the previous save and no hash field changed since: nothing to write
+            if getattr(self, "_hash_diff_verified", False) and not self._hash_fields_changed():
+                SCD2_HASH_DIFF_SKIPS.labels(get_model_label(self.__class__), "verified").inc()
+                return
+
             new_hash = self.compute_hash_diff()
             if new_hash == self.hash_diff:
+                self._hash_diff_verified = True
+                SCD2_HASH_DIFF_SKIPS.labels(get_model_label(self.__class__), "unchanged").inc()
                 return
             self.hash_diff = new_hash
 
         super().save(*args, **kwargs)
+        self._hash_diff_verified = bool(self.pk and self.hash_diff)
+
+    @classmethod
+    def get_tracked_fields(cls) -> set[str]:
+        tracked = getattr(super(), "get_tracked_fields", set)()
+        return tracked | set(getattr(cls, "hash_diff_config", None) and cls.hash_diff_config.fields or [])
+
+    def _hash_fields_changed(self) -> bool:
+        # Without load-time tracking (see BaseModel.get_tracked_fields) assume changed
+        has_changed = getattr(self, "has_changed", None)
+        return has_changed is None or has_changed(self.hash_diff_config.fields) is not False
@@ -0,0 +1,225 @@
+from typing import Iterable
+
+from django.db import IntegrityError, OperationalError, connection, models, transaction
+from django.utils import timezone
+
+from core.metrics import SCD2_HASH_DIFF_SKIPS, SCD2_TRANSITIONS, get_model_label
+from core.models.scd2.cache import invalidate_cache, invalidate_cache_keys
+from core.models.scd2.changelog import write_change_log
+from core.models.scd2.concurrency import SCD2VersionConflict, is_version_conflict
+from core.models.scd2.snapshots import invalidate_checkpoints
+
+
+class SCD2BulkResult:
+    """
+    Counters returned by a bulk SCD2 transition.
+
+    - inserted: new versions written (first versions and replacements of closed rows).
+    - closed: current versions closed because an incoming version replaced them.
+    - skipped: incoming versions identical to the current one (idempotent no-ops).
+    """
+
+    def __init__(self, inserted: int = 0, closed: int = 0, skipped: int = 0):
+        self.inserted = inserted
+        self.closed = closed
+        self.skipped = skipped
+
+    def __add__(self, other: "SCD2BulkResult") -> "SCD2BulkResult":
+        return SCD2BulkResult(
+            inserted=self.inserted + other.inserted,
+            closed=self.closed + other.closed,
+            skipped=self.skipped + other.skipped,
+        )
+
+    def __repr__(self):
+        return f"SCD2BulkResult(inserted={self.inserted}, closed={self.closed}, skipped={self.skipped})"
+
+
+def get_current_by_natural_key(model, keys: set[tuple]) -> dict[tuple, models.Model]:
+    """
+    Load the current versions for the given natural keys with a single query.
+
+    Each natural key field is filtered with `IN (...)`, which may return a superset
+    for composite keys; the exact match is done in Python.
+    """
+    if not keys:
+        return {}
+
+    config = model.scd2_config
+    filter_kwargs = {
+        f"{field}__in": {key[index] for key in keys}
+        for index, field in enumerate(config.natural_key_fields)
+    }
+
+    current = {}
+    for obj in model.objects.current().filter(**filter_kwargs):
+        key = config.natural_key(obj)
+        if key in keys:
+            current[key] = obj
+
+    return current
+
+
+def has_hash_diff(obj: models.Model) -> bool:
+    hash_diff_config = getattr(obj, "hash_diff_config", None)
+    return bool(hash_diff_config and hash_diff_config.fields)
+
+
+def has_version_changes(incoming: models.Model, current: models.Model) -> bool:
+    """
+    Compare an incoming version with the current one.
+
+    A difference in any of the detection_fields is a change. Otherwise, models using
+    HashDiffMixin compare the incoming hash with the hash recomputed from the current
+    row (the stored hash_diff is not trusted, it is not refreshed on every write path).
+    """
+    detection_fields = incoming.scd2_config.detection_fields
+    if detection_fields and any(getattr(incoming, field) != getattr(current, field) for field in detection_fields):
+        return True
+
+    if has_hash_diff(incoming):
+        return incoming.hash_diff != current.compute_hash_diff()
+
+    return not detection_fields
+
+
+def bulk_close(model, ids: list[int], timestamp) -> int:
+    """
+    Close the given current versions with a single `UPDATE ... WHERE id = ANY(...)`.
+    Fields with `auto_now` (e.g. `updated_at`) are bumped to the same timestamp.
+    Cache keys of the closed rows are returned by the same statement and invalidated.
+
+    Raises:
+        SCD2VersionConflict: a version was concurrently closed and moved to a history partition.
+    """
+    if not ids:
+        return 0
+
+    meta = model._meta
+    qn = connection.ops.quote_name
+
+    is_current_column = qn(meta.get_field("is_current").column)
+
+    assignments = [f"{qn(meta.get_field('valid_to').column)} = %s", f"{is_current_column} = false"]
+    params = [timestamp]
+    for field in meta.concrete_fields:
+        if getattr(field, "auto_now", False):
+            assignments.append(f"{qn(field.column)} = %s")
+            params.append(timestamp)
+
+    sql = (
+        f"UPDATE {qn(meta.db_table)} SET {', '.join(assignments)} "
+        f"WHERE {qn(meta.pk.column)} = ANY(%s) AND {is_current_column}"
+    )
+    cache_key_field = model.scd2_config.cache_key_field
+    if cache_key_field:
+        sql += f" RETURNING {qn(meta.get_field(cache_key_field).column)}"
+
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(sql, [*params, list(ids)])
+        except OperationalError as error:
+            if is_version_conflict(model, error):
+                raise SCD2VersionConflict(str(error)) from error
+            raise
+        if cache_key_field:
+            invalidate_cache_keys(model, (row[0] for row in cursor.fetchall()))
+        return cursor.rowcount
+
+
+def bulk_new_versions(
+        model,
+        objs: Iterable[models.Model],
+        timestamp=None,
+        batch_size: int = None,
+        with_transaction: bool = True,
+) -> SCD2BulkResult:
+    """
+    Apply many incoming versions of an SCD2 model in a constant number of queries.
+
+    Incoming objects are unsaved instances carrying the natural key and the new values.
+    If several incoming objects share a natural key, the last one wins.
+
+    Steps:
+        1. Load the current versions for all natural keys with one query.
+        2. Skip objects whose hash_diff / detection_fields match the current version.
+        3. Close the replaced versions with one UPDATE.
+        4. Insert the new versions with one bulk_create.
+        5. Write the change log (if configured) with one bulk insert.
+
+    Returns:
+        SCD2BulkResult: inserted / closed / skipped counters.
+
+    Raises:
+        SCD2VersionConflict: a loaded current version was closed concurrently; nothing is written
+            when running `with_transaction`. Use `run_transition` to retry.
+    """
+    config = model.scd2_config
+    timestamp = timestamp or timezone.now()
+
+    incoming = {}
+    duplicates = 0
+    for obj in objs:
+        key = config.natural_key(obj)
+        if key in incoming:
+            duplicates += 1
+        incoming[key] = obj
+
+    result = SCD2BulkResult(skipped=duplicates)
+    if not incoming:
+        return result
+
+    current = get_current_by_natural_key(model, set(incoming))
+
+    to_close = []
+    to_insert = []
+    transitions = []
+    for key, obj in incoming.items():
+        obj.valid_from = timestamp
+        obj.valid_to = None
+        obj.is_current = True
+        if has_hash_diff(obj):
+            obj.hash_diff = obj.compute_hash_diff()
+
+        current_version = current.get(key)
+        if current_version is not None:
+            if not has_version_changes(obj, current_version):
+                result.skipped += 1
+                continue
+            to_close.append(current_version.pk)
+            transitions.append((obj, current_version))
+
+        to_insert.append(obj)
+
+    if result.skipped > duplicates:
+        SCD2_HASH_DIFF_SKIPS.labels(get_model_label(model), "bulk").inc(result.skipped - duplicates)
+    if not to_insert:
+        return result
+
+    def _apply():
+        result.closed = bulk_close(model, to_close, timestamp)
+        if result.closed != len(to_close):
+            raise SCD2VersionConflict(
+                f"{len(to_close) - result.closed} {model.__name__} versions were closed concurrently."
+            )
+
+        try:
+            model.objects.bulk_create(to_insert, batch_size=batch_size)
+        except IntegrityError as error:
+            if is_version_conflict(model, error):
+                raise SCD2VersionConflict(str(error)) from error
+            raise
+        write_change_log(model, transitions, timestamp)
+        invalidate_cache(model, to_insert)
+        invalidate_checkpoints(model, timestamp)
+
+    if with_transaction:
+        with transaction.atomic():
+            _apply()
+    else:
+        _apply()
+
+    result.inserted = len(to_insert)
+    if result.closed:
+        SCD2_TRANSITIONS.labels(get_model_label(model), "bulk").inc(result.closed)
+    return result
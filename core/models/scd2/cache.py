@@ -0,0 +1,28 @@
+from typing import Iterable
+
+from core.utils.cache import get_versioned_cache
+
+
+def invalidate_cache(model, objs: Iterable) -> None:
+    """
+    Invalidate cached reads for the given versions (see `SCD2ModelConfig.cache_key_field`).
+    No-op when the cache is disabled or the model does not declare a cache key.
+    """
+    config = model.scd2_config
+    cache = get_versioned_cache()
+    if cache is None or not config.cache_key_field:
+        return
+
+    cache.invalidate_many(
+        config.cache_namespace,
+        {getattr(obj, config.cache_key_field): obj.pk for obj in objs},
+    )
+
+
+def invalidate_cache_keys(model, keys: Iterable) -> None:
+    config = model.scd2_config
+    cache = get_versioned_cache()
+    if cache is None or not config.cache_key_field:
+        return
+
+    cache.invalidate_many(config.cache_namespace, set(keys))
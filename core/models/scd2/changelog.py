@@ -0,0 +1,128 @@
+from django.apps import apps
+from django.db import models
+from django.db.models import Index
+
+
+class SCD2ChangeLogBase(models.Model):
+    """
+    Abstract append-only log of SCD2 transitions: one narrow row per changed field.
+
+    Usage:
+        1. Define a concrete model in your app:
+            class EntityChangeLog(SCD2ChangeLogBase):
+                class Meta:
+                    indexes = [*get_change_log_indexes("entity")]
+        2. Point the SCD2 config to it: `SCD2ModelConfig(change_log_model="entities.EntityChangeLog")`.
+        3. `SCD2BaseModel.new_version` and the bulk paths write the log in the same transaction.
+    """
+    # Fields
+    model_name = models.CharField(max_length=100)
+    natural_key = models.CharField(max_length=255, help_text="Natural key values joined with '|'.")
+    field = models.CharField(max_length=100)
+    old_value = models.TextField(null=True, blank=True)
+    new_value = models.TextField(null=True, blank=True)
+    changed_at = models.DateTimeField()
+    changed_mask = models.BigIntegerField(
+        help_text="Bitmask of changed fields, bit N = scd2_config.detection_fields[N]."
+    )
+
+    # Keys
+    version_id = models.BigIntegerField(help_text="Primary key of the new version.")
+    previous_version_id = models.BigIntegerField(help_text="Primary key of the closed version.")
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.model_name}({self.natural_key}).{self.field}: {self.old_value} -> {self.new_value}"
+
+
+def get_change_log_indexes(model_name: str) -> list[Index]:
+    return [
+        Index(fields=["changed_at"], name=f"idx_chlog_time_{model_name}"),
+        Index(fields=["model_name", "natural_key", "changed_at"], name=f"idx_chlog_key_{model_name}"),
+    ]
+
+
+def get_natural_key_str(key: tuple) -> str:
+    return "|".join(str(value) for value in key)
+
+
+def get_changed_fields(new_version, old_version, fields: list[str]) -> tuple[list[str], int]:
+    """
+    Returns:
+        (changed_fields, mask): changed field names and their bitmask by position in `fields`.
+    """
+    changed = []
+    mask = 0
+    for index, field in enumerate(fields):
+        if getattr(new_version, field) != getattr(old_version, field):
+            changed.append(field)
+            mask |= 1 << index
+    return changed, mask
+
+
+def _to_text(value) -> str | None:
+    return None if value is None else str(value)
+
+
+def has_change_log(model) -> bool:
+    return bool(model.scd2_config.change_log_model)
+
+
+def write_change_log(model, transitions: list[tuple], timestamp=None) -> int:
+    """
+    Write change records for saved transitions with a single bulk insert.
+
+    Args:
+        model: SCD2 model class; nothing is written unless `scd2_config.change_log_model` is set.
+        transitions: list of (new_version, old_version) pairs, both already saved.
+        timestamp: transition time; default: `valid_from` of each new version.
+
+    Returns:
+        int: number of change records written.
+    """
+    config = model.scd2_config
+    if not config.change_log_model or not transitions:
+        return 0
+
+    log_model = apps.get_model(config.change_log_model)
+    detection_fields = config.detection_fields or []
+
+    entries = []
+    for new_version, old_version in transitions:
+        changed, mask = get_changed_fields(new_version, old_version, detection_fields)
+        natural_key = get_natural_key_str(config.natural_key(new_version))
+        for field in changed:
+            entries.append(
+                log_model(
+                    model_name=config.model_name,
+                    natural_key=natural_key,
+                    field=field,
+                    old_value=_to_text(getattr(old_version, field)),
+                    new_value=_to_text(getattr(new_version, field)),
+                    changed_at=timestamp or new_version.valid_from,
+                    changed_mask=mask,
+                    version_id=new_version.pk,
+                    previous_version_id=old_version.pk,
+                )
+            )
+
+    log_model.objects.bulk_create(entries)
+    return len(entries)
+
+
+def get_change_log(model, from_dt, to_dt, natural_key: tuple = None):
+    """
+    Change records of an SCD2 model in [from_dt, to_dt], optionally for a single natural key.
+    Served by the `changed_at` / `(model_name, natural_key, changed_at)` indexes; backs the diff of
+    `core.models.scd2.changes.fill_dict_with_transitions`.
+    """
+    config = model.scd2_config
+    log_model = apps.get_model(config.change_log_model)
+
+    queryset = log_model.objects.filter(model_name=config.model_name, changed_at__range=(from_dt, to_dt))
+    if natural_key is not None:
+        queryset = queryset.filter(natural_key=get_natural_key_str(natural_key))
+
+    return queryset.order_by("changed_at", "id")
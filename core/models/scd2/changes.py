@@ -1,10 +1,15 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterable, Iterator
 
-from django.db.models import QuerySet
+from django.apps import apps
+from django.db.models import F, Q, QuerySet, Window
+from django.db.models.functions import Lag
 
+from core.models.scd2.changelog import get_change_log, has_change_log, write_change_log
 from core.models.scd2.models import SCD2BaseModel
 
+DEFAULT_BACKFILL_BATCH_SIZE = 2000
+
 
 def get_object_changes(
         new_version: SCD2BaseModel,
@@ -93,3 +98,240 @@ def fill_dict_with_changes(
                 changes_dict[key][second_key_name] = changes
             else:
                 changes_dict[key][second_key_name].extend(changes)
+
+
+def get_window_changes_queryset(
+        model: type[SCD2BaseModel],
+        from_dt: datetime,
+        to_dt: datetime,
+        queryset: QuerySet = None,
+) -> QuerySet:
+    """
+    Values queryset of the version transitions inside [from_dt, to_dt].
+
+    Only versions opened inside the window (`valid_from`) and their predecessors
+    (closed inside the window, `valid_to`) are read. `LAG()` over
+    `PARTITION BY <natural key> ORDER BY valid_from` pairs every version with its
+    predecessor, and only contiguous transitions (`prev.valid_to = valid_from`) are kept.
+    Rows hold the natural key fields, `valid_from`, the detection_fields and their `prev_<field>` values.
+    """
+    config = model.scd2_config
+    detection_fields = config.detection_fields or []
+
+    if queryset is None:
+        queryset = model.objects.all()
+
+    window = {
+        "partition_by": [F(field) for field in config.natural_key_fields],
+        "order_by": F("valid_from").asc(),
+    }
+    previous = {f"prev_{field}": Window(Lag(field), **window) for field in detection_fields}
+
+    return (
+        queryset
+        .filter(Q(valid_from__range=(from_dt, to_dt)) | Q(valid_to__range=(from_dt, to_dt)))
+        .annotate(prev_valid_to=Window(Lag("valid_to"), **window), **previous)
+        .filter(prev_valid_to=F("valid_from"))
+        .order_by("-valid_from")
+        .values(*config.natural_key_fields, "valid_from", *detection_fields, *previous)
+    )
+
+
+def iter_row_changes(model: type[SCD2BaseModel], rows: Iterable[dict]) -> Iterator[tuple[dict, list[dict]]]:
+    """
+    Yields:
+        (row, changes) for rows of `get_window_changes_queryset`, `changes` listing only
+        the detection_fields that changed: [{field: {"old_value": ..., "new_value": ...}}, ...]
+    """
+    detection_fields = model.scd2_config.detection_fields or []
+
+    for row in rows:
+        changes = [
+            {
+                field: {
+                    "old_value": row[f"prev_{field}"],
+                    "new_value": row[field],
+                }
+            }
+            for field in detection_fields
+            if row[field] != row[f"prev_{field}"]
+        ]
+        if changes:
+            yield row, changes
+
+
+def get_window_changes(
+        model: type[SCD2BaseModel],
+        from_dt: datetime,
+        to_dt: datetime,
+        queryset: QuerySet = None,
+) -> Iterator[tuple[dict, list[dict]]]:
+    """
+    Compute version transitions inside [from_dt, to_dt] in SQL (see `get_window_changes_queryset`).
+
+    Yields:
+        (row, changes): `row` holds the natural key fields and `valid_from` of the new
+        version, `changes` lists only the detection_fields that changed.
+    """
+    rows = get_window_changes_queryset(model, from_dt, to_dt, queryset=queryset)
+    yield from iter_row_changes(model, rows.iterator())
+
+
+def fill_dict_with_row_changes(
+        changes_dict: dict,
+        model: type[SCD2BaseModel],
+        rows: Iterable[dict],
+        key_field: str,
+        second_key_name: str,
+) -> None:
+    """
+    Group `(row, changes)` of `iter_row_changes` as {key: {second_key_name: {valid_from: [changes]}}}.
+    """
+    for row, changes in iter_row_changes(model, rows):
+        key = str(row[key_field])
+        by_timestamp = changes_dict.setdefault(key, {}).setdefault(second_key_name, {})
+        by_timestamp.setdefault(str(row["valid_from"]), []).extend(changes)
+
+
+def fill_dict_with_window_changes(
+        changes_dict: dict,
+        model: type[SCD2BaseModel],
+        from_dt: datetime,
+        to_dt: datetime,
+        key_field: str,
+        second_key_name: str,
+        queryset: QuerySet = None,
+) -> None:
+    """
+    Same output shape as `fill_dict_with_changes`, computed with `get_window_changes`:
+        {key: {second_key_name: {valid_from: [changes]}}}
+    """
+    rows = get_window_changes_queryset(model, from_dt, to_dt, queryset=queryset)
+    fill_dict_with_row_changes(changes_dict, model, rows.iterator(), key_field, second_key_name)
+
+
+def get_log_changes_queryset(model: type[SCD2BaseModel], from_dt: datetime, to_dt: datetime) -> QuerySet:
+    """
+    Values queryset of the change log records inside [from_dt, to_dt], newest transition first:
+    a range scan of the small log table instead of window functions over the versioned table.
+    """
+    return (
+        get_change_log(model, from_dt, to_dt)
+        .order_by("-changed_at", "id")
+        .values("natural_key", "changed_at", "field", "old_value", "new_value")
+    )
+
+
+def fill_dict_with_log_changes(
+        changes_dict: dict,
+        model: type[SCD2BaseModel],
+        rows: Iterable[dict],
+        key_field: str,
+        second_key_name: str,
+) -> None:
+    """
+    `fill_dict_with_row_changes` for rows of `get_log_changes_queryset`. `key_field` is one of the
+    natural key fields; logged text values are converted back by the model fields.
+    """
+    key_index = model.scd2_config.natural_key_fields.index(key_field)
+    fields = {}
+
+    for row in rows:
+        field = row["field"]
+        if field not in fields:
+            fields[field] = model._meta.get_field(field)
+        key = row["natural_key"].split("|")[key_index]
+        by_timestamp = changes_dict.setdefault(key, {}).setdefault(second_key_name, {})
+        by_timestamp.setdefault(str(row["changed_at"]), []).append({
+            field: {
+                "old_value": fields[field].to_python(row["old_value"]),
+                "new_value": fields[field].to_python(row["new_value"]),
+            }
+        })
+
+
+def fill_dict_with_transitions(
+        changes_dict: dict,
+        model: type[SCD2BaseModel],
+        from_dt: datetime,
+        to_dt: datetime,
+        key_field: str,
+        second_key_name: str,
+) -> None:
+    """
+    Changes of the transitions inside [from_dt, to_dt] as {key: {second_key_name: {valid_from: [changes]}}}:
+    read from the change log when the model has one, computed with window functions otherwise.
+    """
+    if has_change_log(model):
+        rows = get_log_changes_queryset(model, from_dt, to_dt)
+        fill_dict_with_log_changes(changes_dict, model, rows.iterator(), key_field, second_key_name)
+    else:
+        fill_dict_with_window_changes(changes_dict, model, from_dt, to_dt, key_field, second_key_name)
+
+
+def backfill_change_log(model: type[SCD2BaseModel], batch_size: int = DEFAULT_BACKFILL_BATCH_SIZE) -> int:
+    """
+    Write the change records of the contiguous transitions that have none, e.g. versions saved before
+    the change log was configured; transitions already logged are skipped, so it can be re-run.
+
+    Returns:
+        int: number of change records written.
+    """
+    config = model.scd2_config
+    detection_fields = config.detection_fields or []
+
+    window = {
+        "partition_by": [F(field) for field in config.natural_key_fields],
+        "order_by": F("valid_from").asc(),
+    }
+    previous = {f"prev_{field}": Window(Lag(field), **window) for field in detection_fields}
+
+    rows = (
+        model.objects
+        .annotate(prev_id=Window(Lag("id"), **window), prev_valid_to=Window(Lag("valid_to"), **window), **previous)
+        .filter(prev_valid_to=F("valid_from"))
+        .values("id", "prev_id", "valid_from", *config.natural_key_fields, *detection_fields, *previous)
+    )
+
+    written = 0
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            written += _write_missing_change_log(model, batch)
+            batch = []
+
+    return written + _write_missing_change_log(model, batch)
+
+
+def _write_missing_change_log(model: type[SCD2BaseModel], rows: list[dict]) -> int:
+    """
+    Change records of the `backfill_change_log` rows whose new version has none yet.
+    """
+    config = model.scd2_config
+    log_model = apps.get_model(config.change_log_model)
+    detection_fields = config.detection_fields or []
+
+    # Logged versions are skipped here: a filter on the window queryset would also hide them from LAG()
+    logged = set(
+        log_model.objects
+        .filter(model_name=config.model_name, version_id__in=[row["id"] for row in rows])
+        .values_list("version_id", flat=True)
+    )
+    transitions = [
+        (
+            model(
+                pk=row["id"],
+                valid_from=row["valid_from"],
+                **{field: row[field] for field in [*config.natural_key_fields, *detection_fields]},
+            ),
+            model(
+                pk=row["prev_id"],
+                **{field: row[field] for field in config.natural_key_fields},
+                **{field: row[f"prev_{field}"] for field in detection_fields},
+            ),
+        )
+        for row in rows
+        if row["id"] not in logged
+    ]
+    return write_change_log(model, transitions)
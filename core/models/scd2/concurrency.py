@@ -0,0 +1,96 @@
+import random
+import time
+from typing import Callable, TypeVar
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from core.metrics import SCD2_CONFLICT_RETRIES, get_model_label
+from core.models.scd2.changelog import get_natural_key_str
+from core.models.scd2.partitions import CURRENT_PARTITION_SUFFIX
+
+T = TypeVar("T")
+
+CONCURRENCY_MODES = ("retry", "lock")
+
+# Postgres serialization_failure, raised in READ COMMITTED when a concurrent UPDATE moved the row to another partition
+SERIALIZATION_FAILURE = "40001"
+# Postgres deadlock_detected, e.g. between bulk writers taking the overlap trigger's natural-key locks in different orders
+DEADLOCK_DETECTED = "40P01"
+
+DEFAULT_CONCURRENCY = {
+    # "retry": re-run the transition on conflict; "lock": also serialize writers per natural key
+    "MODE": "retry",
+    "RETRIES": 3,
+    "BACKOFF": 0.02,
+}
+
+
+class SCD2VersionConflict(Exception):
+    """
+    The current version was closed or replaced by a concurrent transaction.
+    """
+
+
+def get_concurrency_settings() -> dict:
+    config = {**DEFAULT_CONCURRENCY, **getattr(settings, "SCD2_CONCURRENCY", {})}
+    if config["MODE"] not in CONCURRENCY_MODES:
+        raise ValueError(f"Unknown SCD2 concurrency mode '{config['MODE']}'. Use one of: {', '.join(CONCURRENCY_MODES)}.")
+    return config
+
+
+def is_version_conflict(model, error: DatabaseError) -> bool:
+    """
+    True if `error` is a violation of the model's SCD2 constraints (current-version uniqueness / overlap,
+    also as per-partition copies or the cross-partition overlap trigger), or, for partitioned models,
+    the current version was closed, and so moved to a history partition, by a concurrent transaction.
+    """
+    if getattr(error.__cause__, "sqlstate", None) in (SERIALIZATION_FAILURE, DEADLOCK_DETECTED):
+        return bool(model.scd2_config.partition_interval)
+    diag = getattr(error.__cause__, "diag", None)
+    model_name = model.scd2_config.model_name
+    name = getattr(diag, "constraint_name", None) or ""
+    return any(
+        name in (constraint, f"{constraint}_{CURRENT_PARTITION_SUFFIX}") or name.startswith(f"{constraint}_p")
+        for constraint in (f"unique_current_version_{model_name}", f"exclude_overlapping_{model_name}")
+    )
+
+
+def lock_natural_key(model, key: tuple) -> None:
+    """
+    Take a transaction-scoped advisory lock on `(model, natural key)`.
+    Concurrent transitions of the same key queue behind each other instead of conflicting.
+    """
+    lock_name = f"{model.scd2_config.model_name}:{get_natural_key_str(key)}"
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))", [lock_name])
+
+
+def run_transition(func: Callable[[], T], model=None, key: tuple = None) -> T:
+    """
+    Run `func` in a transaction and resolve concurrent transitions per `settings.SCD2_CONCURRENCY`.
+
+    - retry: on SCD2VersionConflict the transaction is rolled back and `func` re-run (it must re-read
+      the current version) up to RETRIES times, with jittered exponential backoff.
+    - lock: additionally takes an advisory lock on `(model, key)` before `func`, so writers of the
+      same key are serialized; retries still cover writers that do not take the lock (e.g. bulk paths).
+
+    Raises:
+        SCD2VersionConflict: the conflict persisted after all retries.
+    """
+    config = get_concurrency_settings()
+    attempt = 0
+    while True:
+        try:
+            with transaction.atomic():
+                if config["MODE"] == "lock" and model is not None and key is not None:
+                    lock_natural_key(model, key)
+                return func()
+        except SCD2VersionConflict:
+            attempt += 1
+            label = get_model_label(model) if model is not None else ""
+            if attempt > config["RETRIES"]:
+                SCD2_CONFLICT_RETRIES.labels(label, "exhausted").inc()
+                raise
+            SCD2_CONFLICT_RETRIES.labels(label, "retried").inc()
+            time.sleep(config["BACKOFF"] * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
@@ -5,22 +5,23 @@ from django.contrib.postgres.fields import RangeOperators
 from django.db.models import F, Func, UniqueConstraint, Q
 
 
+def get_validity_range() -> Func:
+    """
+    `TSTZRANGE(valid_from, valid_to, '[)')`: the validity window of a version (NULL valid_to = unbounded).
+    Stored on SCD2 models as the generated `validity` column.
+    """
+    return Func(
+        F("valid_from"),
+        F("valid_to"),
+        function="TSTZRANGE",
+        template="TSTZRANGE(%(expressions)s, '[)')"
+    )
+
+
 def get_no_overlap_versions(model_name: str, natural_key_fields: list[str] = None) -> ExclusionConstraint | None:
     if natural_key_fields:
         expressions: list[tuple[Any, Any]] = [(F(field), "=") for field in natural_key_fields]
-        expressions.append((
-            Func(
-                F("valid_from"),
-                Func(
-                    F("valid_to"),
-                    template="COALESCE(%(expressions)s, 'infinity')",
-                    function="COALESCE"
-                ),
-                function="TSTZRANGE",
-                template="TSTZRANGE(%(expressions)s, '[)')"
-            ),
-            RangeOperators.OVERLAPS
-        ))
+        expressions.append((F("validity"), RangeOperators.OVERLAPS))
 
         return ExclusionConstraint(
             name=f"exclude_overlapping_{model_name}",
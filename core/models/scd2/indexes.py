@@ -0,0 +1,169 @@
+from abc import ABC, abstractmethod
+
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVector
+from django.db.backends.utils import names_digest
+from django.db.models import Index, Q
+
+# Django limits index names to 30 characters
+MAX_INDEX_NAME_LENGTH = Index.max_name_length
+
+
+def get_index_name(prefix: str, model_name: str) -> str:
+    """
+    `<prefix>_<model_name>`, shortened with a digest suffix when it exceeds the 30-character limit.
+    """
+    name = f"{prefix}_{model_name}"
+    if len(name) <= MAX_INDEX_NAME_LENGTH:
+        return name
+    digest = names_digest(name, length=8)
+    return f"{name[:MAX_INDEX_NAME_LENGTH - len(digest) - 1]}_{digest}"
+
+
+class SCD2IndexRecipe(ABC):
+    """
+    Declarative index recipe, listed in `SCD2ModelConfig(indexes=[...])` and turned into a Django index
+    by `get_scd2_index_list()`. `name` is the index name prefix; the model name is appended.
+    Subclasses implement `build`.
+    """
+    prefix: str = "idx"
+
+    def __init__(self, fields: list[str], name: str = None):
+        self.fields = fields
+        self.name = name or self.prefix
+
+    @abstractmethod
+    def build(self, model_name: str) -> Index:
+        """
+        Returns the index of the recipe for the model named `model_name`.
+        """
+
+
+class CurrentIndex(SCD2IndexRecipe):
+    """
+    Partial btree index over current rows only (`WHERE is_current`), optionally covering
+    `include` columns so that hot reads are answered with an index-only scan.
+
+    Example:
+        CurrentIndex(["id"], include=["uuid", "display_name"])
+    """
+    prefix = "idx_cur"
+
+    def __init__(self, fields: list[str], include: list[str] = None, name: str = None):
+        super().__init__(fields, name)
+        self.include = include
+
+    def build(self, model_name: str) -> Index:
+        return Index(
+            fields=self.fields,
+            include=self.include,
+            condition=Q(is_current=True),
+            name=get_index_name(self.name, model_name),
+        )
+
+
+class HistoryBrinIndex(SCD2IndexRecipe):
+    """
+    BRIN index for append-ordered history columns (`valid_from`, `valid_to`).
+    A few pages of summaries instead of a full btree; effective while rows are inserted in time order.
+    """
+    prefix = "idx_brin"
+
+    def __init__(self, fields: list[str] = None, pages_per_range: int = None, name: str = None):
+        super().__init__(fields or ["valid_from", "valid_to"], name)
+        self.pages_per_range = pages_per_range
+
+    def build(self, model_name: str) -> Index:
+        return BrinIndex(
+            fields=self.fields,
+            pages_per_range=self.pages_per_range,
+            name=get_index_name(self.name, model_name),
+        )
+
+
+class CurrentTrigramIndex(SCD2IndexRecipe):
+    """
+    Partial GiST trigram index (`gist_trgm_ops`) over current rows. Serves the similarity
+    operator `%` and, unlike GIN, ordered nearest-neighbour scans on the distance `<->`,
+    so top-K similarity searches stop after K index entries.
+
+    Example:
+        CurrentTrigramIndex(["display_name"])
+    """
+    prefix = "idx_cur_trgm"
+
+    def build(self, model_name: str) -> Index:
+        return GistIndex(
+            fields=self.fields,
+            opclasses=["gist_trgm_ops"] * len(self.fields),
+            condition=Q(is_current=True),
+            name=get_index_name(self.name, model_name),
+        )
+
+
+class CurrentSearchIndex(SCD2IndexRecipe):
+    """
+    Partial GIN index on the tsvector of `fields` over current rows, for full-text matches (`@@`).
+    Queries must use the same expression, `get_search_vector(fields, config)`.
+
+    Example:
+        CurrentSearchIndex(["value"], config="simple")
+    """
+    prefix = "idx_cur_fts"
+
+    def __init__(self, fields: list[str], config: str = "simple", name: str = None):
+        super().__init__(fields, name)
+        self.config = config
+
+    def build(self, model_name: str) -> Index:
+        return GinIndex(
+            get_search_vector(self.fields, self.config),
+            condition=Q(is_current=True),
+            name=get_index_name(self.name, model_name),
+        )
+
+
+def get_search_vector(fields: list[str], config: str) -> SearchVector:
+    return SearchVector(*fields, config=config)
+
+
+class ValidityIndex(SCD2IndexRecipe):
+    """
+    GiST index on the generated `validity` range, used by `as_of()` (`@>`) and `overlapping()` (`&&`).
+    Always part of `get_scd2_index_list()`.
+    """
+    prefix = "idx_valid_gist"
+
+    def __init__(self, name: str = None):
+        super().__init__(["validity"], name)
+
+    def build(self, model_name: str) -> Index:
+        return GistIndex(fields=self.fields, name=get_index_name(self.name, model_name))
+
+
+def get_validity_index(model_name: str) -> GistIndex:
+    return ValidityIndex().build(model_name)
+
+
+def get_scd2_index_list(model_name: str, recipes: list[SCD2IndexRecipe] = None) -> list[Index]:
+    """
+    Build the indexes of an SCD2 model: the validity GiST index plus the configured recipes.
+
+    Args:
+        model_name: `scd2_config.model_name`, used in index names.
+        recipes: `scd2_config.indexes`.
+    """
+    recipes = recipes or []
+    if not any(isinstance(recipe, ValidityIndex) for recipe in recipes):
+        recipes = [ValidityIndex(), *recipes]
+
+    indexes = [recipe.build(model_name) for recipe in recipes]
+
+    names = [index.name for index in indexes]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(
+            f"Duplicate SCD2 index names for '{model_name}': {', '.join(sorted(duplicates))}. "
+            f"Pass name= to the recipes."
+        )
+    return indexes
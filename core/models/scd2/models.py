@@ -1,10 +1,30 @@
-from typing import Self
+import copy
+from datetime import datetime, timezone as dt_timezone
+from typing import Iterable, Self
 
-from django.db import models, transaction
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
 from django.utils import timezone
 
-from core.models.base import BaseModel
-from core.models.scd2.constraints import get_scd2_constraint_list
+from core.metrics import SCD2_TRANSITIONS, get_model_label
+from core.models.base import BaseManager, BaseModel
+from core.models.scd2.bulk import SCD2BulkResult, bulk_close, bulk_new_versions
+from core.models.scd2.cache import invalidate_cache
+from core.models.scd2.changelog import write_change_log
+from core.models.scd2.concurrency import SCD2VersionConflict, is_version_conflict
+from core.models.scd2.partitions import PARTITION_INTERVALS
+from core.models.scd2.constraints import get_scd2_constraint_list, get_validity_range
+from core.models.scd2.snapshots import get_checkpoint_queryset, get_snapshot_model, invalidate_checkpoints
+from core.models.scd2.transition import TRANSITION_MODES, cte_transition
+
+
+# as_of(): look the checkpoint up
+_LOOKUP = object()
+# as_of(): replay all versions when no checkpoint precedes the timestamp
+_NO_CHECKPOINT = datetime.min.replace(tzinfo=dt_timezone.utc)
 
 
 class SCD2ModelConfig:
@@ -14,17 +34,117 @@ class SCD2ModelConfig:
             self,
             model_name: str = None,
             detection_fields: list[str] = None,
-            natural_key_fields: list[str] = None
+            natural_key_fields: list[str] = None,
+            change_log_model: str = None,
+            snapshot_model: str = None,
+            snapshot_interval: str = "daily",
+            indexes: list = None,
+            cache_namespace: str = None,
+            cache_key_field: str = None,
+            transition_mode: str = "orm",
+            partition_interval: str = None,
     ):
         self.model_name = model_name
         self.detection_fields = detection_fields
         self.natural_key_fields = natural_key_fields
+        # "app_label.ModelName" of a concrete SCD2ChangeLogBase model, written on every transition
+        self.change_log_model = change_log_model
+        # "app_label.ModelName" of a concrete SCD2SnapshotBase model used by as_of()
+        self.snapshot_model = snapshot_model
+        self.snapshot_interval = snapshot_interval
+        # SCD2IndexRecipe list turned into Meta.indexes by get_scd2_index_list()
+        self.indexes = indexes or []
+        # Versioned read cache: writes invalidate `cache_namespace` entries keyed by `cache_key_field`
+        self.cache_namespace = cache_namespace or model_name
+        self.cache_key_field = cache_key_field
+        # "orm": close UPDATE + INSERT (+ change log) statements;
+        # "cte": one `WITH closed AS (UPDATE ...) INSERT ...` statement timed by the database clock
+        if transition_mode not in TRANSITION_MODES:
+            raise ValueError(f"Unknown transition_mode '{transition_mode}'. Use one of: {', '.join(TRANSITION_MODES)}.")
+        self.transition_mode = transition_mode
+        # Range partitioning of closed versions by valid_to (see core.models.scd2.partitions); None: one table
+        if partition_interval is not None and partition_interval not in PARTITION_INTERVALS:
+            raise ValueError(
+                f"Unknown partition_interval '{partition_interval}'. Use one of: {', '.join(PARTITION_INTERVALS)}."
+            )
+        self.partition_interval = partition_interval
+
+    def natural_key(self, obj) -> tuple:
+        """
+        Return the natural key of the object as a tuple of `natural_key_fields` values.
+        """
+        return tuple(getattr(obj, field) for field in self.natural_key_fields)
+
+
+class SCD2QuerySet(models.QuerySet):
+    def current(self):
+        return self.filter(is_current=True)
+
+    def as_of(self, timestamp, checkpoint=_LOOKUP):
+        """
+        Versions valid at `timestamp`.
+
+        If the model has a snapshot_model, the result is the versions of the latest checkpoint at or
+        before `timestamp` still open at `timestamp`, plus the versions opened since the checkpoint
+        (all versions opened up to `timestamp` when there is none). The checkpoint is looked up by a
+        subquery, so the queryset stays lazy. Otherwise, `validity @> timestamp` is evaluated over
+        the full history (GiST index on `validity`).
+
+        `checkpoint` may be passed when already known (e.g. fetched asynchronously with
+        `get_checkpoint_queryset`); None skips the snapshot path.
+        """
+        replay_since = checkpoint
+        if checkpoint is _LOOKUP:
+            checkpoint_queryset = get_checkpoint_queryset(self.model, timestamp)
+            checkpoint = replay_since = None
+            if checkpoint_queryset is not None:
+                checkpoint = Subquery(checkpoint_queryset)
+                replay_since = Coalesce(checkpoint, Value(_NO_CHECKPOINT))
+
+        not_closed = Q(valid_to__isnull=True) | Q(valid_to__gt=timestamp)
+        if checkpoint is None:
+            return self.filter(validity__contains=timestamp, *self._prune(not_closed))
+
+        snapshot_ids = get_snapshot_model(self.model).objects.filter(taken_at=checkpoint).values("version_id")
+        replay_ids = (
+            self.model.objects
+            .filter(valid_from__gt=replay_since, valid_from__lte=timestamp)
+            .values("pk")
+        )
+        return self.filter(not_closed, pk__in=snapshot_ids.union(replay_ids, all=True))
+
+    def overlapping(self, start, end=None):
+        """
+        Versions whose validity overlaps `[start, end)` (`validity && range`); `end=None` is unbounded.
+        """
+        return self.filter(
+            *self._prune(Q(valid_to__isnull=True) | Q(valid_to__gt=start)),
+            validity__overlap=DateTimeTZRange(start, end, "[)"),
+        )
+
+    def _prune(self, condition: Q) -> list[Q]:
+        """
+        `condition` on the partition key, for partitioned models only: lets Postgres skip the partitions
+        closed before the queried time (the validity predicate alone does not prune).
+        """
+        return [condition] if self.model.scd2_config.partition_interval else []
+
+
+class SCD2Manager(BaseManager.from_queryset(SCD2QuerySet)):
+    pass
 
 
 class SCD2BaseModel(BaseModel):
     valid_from = models.DateTimeField(default=timezone.now)
     valid_to = models.DateTimeField(null=True, blank=True)
     is_current = models.BooleanField(default=True)
+    validity = models.GeneratedField(
+        expression=get_validity_range(),
+        output_field=DateTimeRangeField(),
+        db_persist=True,
+    )
+
+    objects = SCD2Manager()
 
     # Tech attributes (Not stored in DB)
     scd2_config: SCD2ModelConfig
@@ -53,41 +173,115 @@ class SCD2BaseModel(BaseModel):
     def new_version(self, save=True, with_transaction=True, *args, **kwargs) -> (Self, Self):
         timestamp = timezone.now()
 
-        old_version = self.__class__.objects.get(pk=self.pk)
+        old_version = self._get_loaded_version() or self.__class__.objects.get(pk=self.pk)
         old_version = old_version.close(timestamp=timestamp)
 
-        attrs = {**self.__dict__, **kwargs}
-        attrs.pop("id", None)
-        attrs.pop("_state", None)
+        # Copy loaded concrete field values only (skips pk, generated/deferred fields and caches)
+        attrs = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if not field.primary_key and not field.generated and field.attname in self.__dict__
+        }
+        attrs.update(kwargs)
         attrs["valid_from"] = timestamp
         attrs["valid_to"] = None
         attrs["is_current"] = True
         new_version = self.__class__(**attrs)
 
-        if save:
+        if save and self.scd2_config.transition_mode == "cte":
+            # A single statement is atomic on its own
+            cte_transition(new_version, old_version)
+        elif save:
             if with_transaction:
                 with transaction.atomic():
-                    old_version.save(
-                        new_version=False,
-                        update_fields=["valid_to", "is_current"]
-                    )
-                    new_version.save(new_version=False)
+                    self._save_transition(new_version, old_version, timestamp)
             else:
-                old_version.save(
-                    new_version=False,
-                    update_fields=["valid_to", "is_current"]
-                )
-                new_version.save(new_version=False)
+                self._save_transition(new_version, old_version, timestamp)
+
+        if save:
+            SCD2_TRANSITIONS.labels(get_model_label(self.__class__), self.scd2_config.transition_mode).inc()
 
         return new_version, old_version
 
+    @staticmethod
+    def _save_transition(new_version: Self, old_version: Self, timestamp) -> None:
+        """
+        Close the old version with a conditional `UPDATE ... WHERE id = ? AND is_current`, then insert the new one.
+
+        Raises:
+            SCD2VersionConflict: the old version was already closed, or a concurrent transition
+                of the same natural key won the current-version constraints.
+        """
+        model = new_version.__class__
+        if not bulk_close(model, [old_version.pk], timestamp):
+            raise SCD2VersionConflict(f"{model.__name__} {old_version.pk} is no longer the current version.")
+
+        try:
+            new_version.save(new_version=False)
+        except IntegrityError as error:
+            if is_version_conflict(model, error):
+                raise SCD2VersionConflict(str(error)) from error
+            raise
+        write_change_log(model, [(new_version, old_version)], timestamp)
+
+    @classmethod
+    def bulk_new_versions(
+            cls,
+            objs: Iterable[Self],
+            timestamp=None,
+            batch_size: int = None,
+            with_transaction: bool = True,
+    ) -> SCD2BulkResult:
+        """
+        Set-based counterpart of `new_version` for many incoming versions at once.
+        See `core.models.scd2.bulk.bulk_new_versions`.
+        """
+        return bulk_new_versions(
+            cls,
+            objs,
+            timestamp=timestamp,
+            batch_size=batch_size,
+            with_transaction=with_transaction,
+        )
+
+    @classmethod
+    def bulk_close(cls, ids: list[int], timestamp=None) -> int:
+        """
+        Close many current versions by primary key with a single UPDATE.
+        """
+        return bulk_close(cls, ids, timestamp or timezone.now())
+
+    @classmethod
+    def get_tracked_fields(cls) -> set[str]:
+        return super().get_tracked_fields() | set(cls.scd2_config.detection_fields or [])
+
+    def _get_loaded_version(self) -> Self | None:
+        """
+        The stored version of this row rebuilt in memory from the load-time values
+        of the tracked fields, or None when they are unknown.
+        """
+        loaded = self.get_loaded_values()
+        if loaded is None or any(field not in loaded for field in self.scd2_config.detection_fields or []):
+            return None
+
+        stored = copy.copy(self)
+        attnames = self._get_tracked_attnames()
+        for field, value in loaded.items():
+            setattr(stored, attnames[field], value)
+        return stored
+
     def _has_changes(self):
         """
         Check if any of the detection_fields have changed compared to the current DB version.
+        Uses the values captured at load time; falls back to re-reading the row.
         """
         if not self.pk or not self.scd2_config.detection_fields:
             return True  # new object or no detection fields → consider as changed
 
+        changed = self.has_changed(self.scd2_config.detection_fields)
+        if changed is not None:
+            return changed
+
         db_obj = self.__class__.objects.filter(pk=self.pk).first()
         if not db_obj:
             return True
@@ -101,4 +295,8 @@ class SCD2BaseModel(BaseModel):
     def save(self, new_version=True, with_transaction=False, *args, **kwargs):
         if self.pk and new_version and self._has_changes():
             return self.new_version(save=True, with_transaction=with_transaction, *args, **kwargs)
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        invalidate_cache(self.__class__, [self])
+        if adding:
+            invalidate_checkpoints(self.__class__, self.valid_from)
@@ -0,0 +1,472 @@
+"""
+Partitioning of SCD2 history: current versions apart, closed versions by range of `valid_to`.
+
+The table of a partitioned model is partitioned by list of `is_current`:
+    - `<table>_current`: the current versions. Queries on `is_current` only scan this partition,
+      and partition maintenance never locks it;
+    - `<table>_history`: the closed versions, itself partitioned by range of `valid_to`:
+        - `<table>_pYYYYMM`: closed versions with `valid_to` in `[start, end)` of one `partition_interval`;
+        - `<table>_default`: the DEFAULT partition, closed versions whose partition does not exist yet.
+
+Closing a version moves it from the current partition into the partition of its `valid_to`, so the
+hot current rows and their indexes stay small. `ensure_partitions` creates the partitions ahead of
+time and moves closed rows left in the default partition; `archive_partition` exports an old
+partition to a gzip CSV file, detaches it and drops it, so retention needs no mass DELETE.
+Both take their locks with a `lock_timeout`: attaching or detaching a partition locks the (normally
+empty) default partition exclusively, which briefly queues the queries over the history.
+
+Indexes are declared on the parent and cascade to every partition. Postgres only enforces unique
+and exclusion constraints across partitions when they include the partition key, so the primary key
+and the model's constraints (`get_scd2_constraint_list`) are created on each partition instead:
+current-version uniqueness holds because all current rows share the current partition; overlapping
+versions are excluded within a partition by the exclusion constraint, and across partitions by the
+`<table>_exclude_overlapping` trigger, which raises the same `exclude_overlapping_<model_name>` error.
+
+Setup:
+    1. `SCD2ModelConfig(partition_interval="monthly")`.
+    2. A migration with `PartitionSCD2History("<model_name>")`, which turns the existing table into
+       the default partition; only the current versions are copied (to the current partition).
+    3. `python manage.py scd2_partitions` from cron, before each interval starts.
+"""
+import gzip
+import os
+import re
+from datetime import datetime, timezone as dt_timezone
+from typing import NamedTuple
+
+from django.db import connection, transaction
+from django.db.migrations.operations.base import Operation
+
+# Months per partition
+PARTITION_INTERVALS = {
+    "monthly": 1,
+    "quarterly": 3,
+    "yearly": 12,
+}
+
+PARTITION_KEY = "valid_to"
+CURRENT_PARTITION_SUFFIX = "current"
+HISTORY_PARTITION_SUFFIX = "history"
+DEFAULT_PARTITION_SUFFIX = "default"
+
+# Wait at most this long for the locks of a partition attach / detach (Postgres interval)
+DEFAULT_LOCK_TIMEOUT = "2s"
+
+BOUNDS_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    # None for the default partition
+    start: datetime | None
+    end: datetime | None
+
+
+def add_months(start: datetime, months: int) -> datetime:
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def get_partition_start(interval: str, timestamp: datetime) -> datetime:
+    """
+    Start (UTC midnight of the first day) of the `interval` partition containing `timestamp`.
+    """
+    months = PARTITION_INTERVALS[interval]
+    timestamp = timestamp.astimezone(dt_timezone.utc)
+    index = (timestamp.year * 12 + timestamp.month - 1) // months * months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def get_partition_name(table: str, start: datetime) -> str:
+    return f"{table}_p{start:%Y%m}"
+
+
+def get_current_partition_name(table: str) -> str:
+    return f"{table}_{CURRENT_PARTITION_SUFFIX}"
+
+
+def get_history_partition_name(table: str) -> str:
+    return f"{table}_{HISTORY_PARTITION_SUFFIX}"
+
+
+def get_default_partition_name(table: str) -> str:
+    return f"{table}_{DEFAULT_PARTITION_SUFFIX}"
+
+
+def get_copy_columns(model) -> list[str]:
+    """
+    Stored columns in table order; generated columns (`validity`) are recomputed on insert.
+    """
+    return [field.column for field in model._meta.concrete_fields if not field.generated]
+
+
+def is_partitioned(model, using=connection) -> bool:
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+            [model._meta.db_table],
+        )
+        return cursor.fetchone()[0]
+
+
+def get_partitions(model, using=connection) -> list[Partition]:
+    """
+    Attached history partitions of the model's table, the default partition first, then by start.
+    """
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(%s)",
+            [get_history_partition_name(model._meta.db_table)],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUNDS_RE.search(bound)
+        if match is None:
+            partitions.append(Partition(name, None, None))
+        else:
+            start, end = (datetime.fromisoformat(value) for value in match.groups())
+            partitions.append(Partition(name, start, end))
+    return sorted(partitions, key=lambda partition: (partition.start is not None, partition.start))
+
+
+def get_table_indexes(cursor, table: str) -> list[tuple[str, str]]:
+    """
+    `(name, definition)` of the non-unique indexes of `table` that do not back a constraint.
+    """
+    cursor.execute(
+        "SELECT i.relname, pg_get_indexdef(x.indexrelid) FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = to_regclass(%s) AND NOT x.indisunique "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid) "
+        "ORDER BY i.relname",
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def get_foreign_keys(cursor, table: str) -> list[tuple[str, str]]:
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype = 'f' ORDER BY conname",
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def get_overlap_constraint(model):
+    """
+    The model's `exclude_overlapping_<model_name>` constraint, or None (read from `_meta` so that
+    historical models of migrations work too).
+    """
+    for constraint in model._meta.constraints:
+        if constraint.name.startswith("exclude_overlapping_"):
+            return constraint
+    return None
+
+
+def get_overlap_trigger_sql(model, schema_editor) -> list[str]:
+    """
+    Function and trigger rejecting a version that overlaps a version of the same natural key in any
+    partition, with the SQLSTATE and constraint name of the exclusion constraint (`is_version_conflict`).
+
+    The check takes the advisory lock of `concurrency.lock_natural_key` first: writers of the same key
+    are serialized, and the check (a new snapshot in READ COMMITTED) sees the versions they committed.
+    """
+    constraint = get_overlap_constraint(model)
+    if constraint is None:
+        return []
+
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    model_name = constraint.name[len("exclude_overlapping_"):]
+    key_fields = [model._meta.get_field(expression.name).column for expression, operator in constraint.expressions if operator == "="]
+    key_match = " AND ".join(f"t.{qn(column)} = NEW.{qn(column)}" for column in key_fields)
+    lock_name = " || '|' || ".join(f"NEW.{qn(column)}::text" for column in key_fields)
+    pk = qn(model._meta.pk.column)
+    key = qn(PARTITION_KEY)
+
+    return [
+        f"""CREATE FUNCTION {qn(f"{table}_exclude_overlapping")}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtextextended('{model_name}:' || {lock_name}, 0));
+    IF EXISTS (
+        SELECT 1 FROM {qn(table)} t
+        WHERE {key_match} AND t.{pk} <> NEW.{pk} AND t.validity && NEW.validity
+            AND (t.{key} IS NULL OR t.{key} > NEW.valid_from)
+    ) THEN
+        RAISE EXCEPTION 'conflicting key value violates exclusion constraint "{constraint.name}"'
+            USING ERRCODE = 'exclusion_violation', CONSTRAINT = '{constraint.name}', TABLE = '{table}';
+    END IF;
+    RETURN NULL;
+END
+$$""",
+        f"CREATE TRIGGER {qn(f'{table}_exclude_overlapping')} "
+        f"AFTER INSERT OR UPDATE OF valid_from, {key}, {', '.join(qn(column) for column in key_fields)} ON {qn(table)} "
+        f"FOR EACH ROW EXECUTE FUNCTION {qn(f'{table}_exclude_overlapping')}()",
+    ]
+
+
+def partition_table(model, schema_editor) -> None:
+    """
+    Turn the model's table into a table partitioned by `is_current`, then by range of `valid_to`
+    (see the module docstring). The existing table becomes the default history partition: only the
+    current versions are copied out, to the current partition. The indexes move to the parent (the
+    existing ones are attached, not rebuilt); the primary key and the constraints stay on the partitions.
+    """
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    current = get_current_partition_name(table)
+    history = get_history_partition_name(table)
+    default = get_default_partition_name(table)
+    pk = model._meta.pk.column
+    sequence = f"{table}_{pk}_seq"
+    columns = ", ".join(qn(column) for column in get_copy_columns(model))
+
+    with schema_editor.connection.cursor() as cursor:
+        indexes = get_table_indexes(cursor, table)
+        foreign_keys = get_foreign_keys(cursor, table)
+
+    schema_editor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(default)}")
+    for name, _ in indexes:
+        schema_editor.execute(f"ALTER INDEX {qn(name)} RENAME TO {qn(f'{name}_{DEFAULT_PARTITION_SUFFIX}')}")
+
+    # Partitioned tables cannot have identity columns before Postgres 17: the parent owns a sequence
+    schema_editor.execute(f"ALTER TABLE {qn(default)} ALTER COLUMN {qn(pk)} DROP IDENTITY IF EXISTS")
+    schema_editor.execute(
+        f"CREATE TABLE {qn(table)} (LIKE {qn(default)} INCLUDING DEFAULTS INCLUDING GENERATED) "
+        f"PARTITION BY LIST (is_current)"
+    )
+    schema_editor.execute(f"CREATE SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.{qn(pk)}")
+    schema_editor.execute(
+        f"SELECT setval(%s, COALESCE(MAX({qn(pk)}), 0) + 1, false) FROM {qn(default)}", [sequence]
+    )
+    schema_editor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN {qn(pk)} SET DEFAULT nextval('{qn(sequence)}'::regclass)")
+
+    schema_editor.execute(
+        f"CREATE TABLE {qn(history)} (LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING GENERATED) "
+        f"PARTITION BY RANGE ({qn(PARTITION_KEY)})"
+    )
+    schema_editor.execute(f"CREATE TABLE {qn(current)} (LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING GENERATED)")
+    schema_editor.execute(f"INSERT INTO {qn(current)} ({columns}) SELECT {columns} FROM {qn(default)} WHERE is_current")
+    schema_editor.execute(f"DELETE FROM {qn(default)} WHERE is_current")
+    for sql in get_partition_constraint_sql(model, schema_editor, current):
+        schema_editor.execute(sql)
+
+    schema_editor.execute(f"ALTER TABLE {qn(history)} ATTACH PARTITION {qn(default)} DEFAULT")
+    schema_editor.execute(f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(current)} FOR VALUES IN (true)")
+    schema_editor.execute(f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(history)} FOR VALUES IN (false)")
+    # Same definitions as before the rename: Postgres attaches the equivalent index of the partition
+    for _, definition in indexes:
+        schema_editor.execute(definition)
+    for name, definition in foreign_keys:
+        schema_editor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}")
+    for sql in get_overlap_trigger_sql(model, schema_editor):
+        schema_editor.execute(sql)
+
+
+def unpartition_table(model, schema_editor) -> None:
+    """
+    Reverse of `partition_table`: the rows of the other partitions are copied back into the default
+    partition, which becomes the plain table again.
+    """
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    default = get_default_partition_name(table)
+    pk = model._meta.pk.column
+    columns = ", ".join(qn(column) for column in get_copy_columns(model))
+
+    schema_editor.execute(f"ALTER TABLE {qn(get_history_partition_name(table))} DETACH PARTITION {qn(default)}")
+    schema_editor.execute(f"INSERT INTO {qn(default)} ({columns}) SELECT {columns} FROM {qn(table)}")
+    # Drops the partitions, the sequence and the overlap trigger with the table
+    schema_editor.execute(f"DROP TABLE {qn(table)}")
+    schema_editor.execute(f"DROP FUNCTION IF EXISTS {qn(f'{table}_exclude_overlapping')}()")
+    schema_editor.execute(f"ALTER TABLE {qn(default)} RENAME TO {qn(table)}")
+
+    suffix = f"_{DEFAULT_PARTITION_SUFFIX}"
+    with schema_editor.connection.cursor() as cursor:
+        indexes = get_table_indexes(cursor, table)
+    for name, _ in indexes:
+        if name.endswith(suffix):
+            schema_editor.execute(f"ALTER INDEX {qn(name)} RENAME TO {qn(name[:-len(suffix)])}")
+
+    schema_editor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN {qn(pk)} ADD GENERATED BY DEFAULT AS IDENTITY")
+    schema_editor.execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX({qn(pk)}), 0) + 1, false) FROM {qn(table)}",
+        [table, pk],
+    )
+
+
+class PartitionSCD2History(Operation):
+    """
+    Migration operation partitioning an SCD2 model's table by `valid_to` (see `partition_table`).
+    The model state is unchanged; reversible.
+    """
+    reversible = True
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def deconstruct(self):
+        return self.__class__.__name__, [self.model_name], {}
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        partition_table(to_state.apps.get_model(app_label, self.model_name), schema_editor)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        unpartition_table(to_state.apps.get_model(app_label, self.model_name), schema_editor)
+
+    def describe(self):
+        return f"Partition the history of {self.model_name} by valid_to"
+
+    @property
+    def migration_name_fragment(self):
+        return f"partition_{self.model_name.lower()}"
+
+
+def get_partition_constraint_sql(model, schema_editor, partition: str) -> list[str]:
+    """
+    The primary key and the model's constraints for one partition; names get the partition suffix.
+    """
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    suffix = partition[len(table):]
+
+    statements = [f"ALTER TABLE {qn(partition)} ADD PRIMARY KEY ({qn(model._meta.pk.column)})"]
+    for constraint in model._meta.constraints:
+        # Constraint (and index) names are unique per schema
+        constraint = constraint.clone()
+        constraint.name = f"{constraint.name}{suffix}"
+        statement = constraint.create_sql(model, schema_editor)
+        if statement is None:
+            continue
+        statement.rename_table_references(table, partition)
+        statements.append(str(statement))
+    return statements
+
+
+def set_lock_timeout(cursor, lock_timeout: str) -> None:
+    cursor.execute("SELECT set_config('lock_timeout', %s, true)", [lock_timeout])
+
+
+def create_partition(model, start: datetime, end: datetime, lock_timeout: str = DEFAULT_LOCK_TIMEOUT) -> int:
+    """
+    Create and attach the history partition `[start, end)`, moving its closed rows out of the default partition.
+
+    The default partition is locked first (ATTACH scans it under an ACCESS EXCLUSIVE lock), so the
+    move does not upgrade a weaker lock; the current partition is not locked.
+
+    Returns:
+        Number of rows moved.
+
+    Raises:
+        OperationalError: a lock was not granted within `lock_timeout` (e.g. a long-running query on
+            the history); nothing was changed, run again later.
+    """
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+    history = get_history_partition_name(table)
+    default = get_default_partition_name(table)
+    partition = get_partition_name(table, start)
+    columns = ", ".join(qn(column) for column in get_copy_columns(model))
+    key = qn(PARTITION_KEY)
+
+    schema_editor = connection.schema_editor()
+    with transaction.atomic(), connection.cursor() as cursor:
+        set_lock_timeout(cursor, lock_timeout)
+        cursor.execute(f"LOCK TABLE {qn(default)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"CREATE TABLE {qn(partition)} (LIKE {qn(history)} INCLUDING DEFAULTS INCLUDING GENERATED)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {qn(default)} WHERE {key} >= %s AND {key} < %s RETURNING {columns}) "
+            f"INSERT INTO {qn(partition)} ({columns}) SELECT {columns} FROM moved",
+            [start, end],
+        )
+        moved = cursor.rowcount
+        for sql in get_partition_constraint_sql(model, schema_editor, partition):
+            cursor.execute(sql)
+        # Indexes and foreign keys of the parent are created on the partition by ATTACH (DDL: no parameters)
+        cursor.execute(
+            f"ALTER TABLE {qn(history)} ATTACH PARTITION {qn(partition)} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    return moved
+
+
+def get_default_closed_range(model) -> tuple[datetime | None, datetime | None]:
+    """
+    Smallest and largest `valid_to` of the closed versions left in the default partition.
+    """
+    qn = connection.ops.quote_name
+    default = get_default_partition_name(model._meta.db_table)
+    key = qn(PARTITION_KEY)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM {qn(default)} WHERE {key} IS NOT NULL")
+        return cursor.fetchone()
+
+
+def ensure_partitions(
+    model, now: datetime, ahead: int = 2, lock_timeout: str = DEFAULT_LOCK_TIMEOUT
+) -> list[tuple[str, int]]:
+    """
+    Create the partitions of the model's `partition_interval` from the oldest closed row still in the
+    default partition up to `ahead` intervals after the one containing `now`. Existing partitions are kept.
+    Each partition is created in its own transaction (see `create_partition`).
+
+    Returns:
+        `(partition name, rows moved)` of the created partitions.
+    """
+    interval = model.scd2_config.partition_interval
+    months = PARTITION_INTERVALS[interval]
+    existing = [partition for partition in get_partitions(model) if partition.start is not None]
+
+    oldest, _ = get_default_closed_range(model)
+    start = get_partition_start(interval, min(oldest, now) if oldest else now)
+    last = add_months(get_partition_start(interval, now), months * ahead)
+
+    created = []
+    while start <= last:
+        end = add_months(start, months)
+        if not any(partition.start < end and start < partition.end for partition in existing):
+            moved = create_partition(model, start, end, lock_timeout=lock_timeout)
+            created.append((get_partition_name(model._meta.db_table, start), moved))
+        start = end
+    return created
+
+
+def archive_partition(
+    model, partition: Partition, directory: str, lock_timeout: str = DEFAULT_LOCK_TIMEOUT
+) -> tuple[str, int]:
+    """
+    Export `partition` to `<directory>/<partition>.csv.gz` (stored columns, with header), then detach
+    and drop it. Restore with `COPY <table> (<columns>) FROM ... (FORMAT csv, HEADER)`.
+
+    Returns:
+        (file path, rows exported)
+    """
+    qn = connection.ops.quote_name
+    columns = ", ".join(qn(column) for column in get_copy_columns(model))
+    path = os.path.join(directory, f"{partition.name}.csv.gz")
+    partial_path = f"{path}.partial"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        set_lock_timeout(cursor, lock_timeout)
+        # Closed partitions only receive rows when versions are closed at a past timestamp; keep them out
+        cursor.execute(f"LOCK TABLE {qn(partition.name)} IN SHARE MODE")
+        with gzip.open(partial_path, "wb") as file:
+            with cursor.copy(f"COPY {qn(partition.name)} ({columns}) TO STDOUT (FORMAT csv, HEADER)") as copy:
+                for data in copy:
+                    file.write(data)
+        rows = cursor.rowcount
+        os.replace(partial_path, path)
+
+        # Locks the default partition too
+        cursor.execute(
+            f"ALTER TABLE {qn(get_history_partition_name(model._meta.db_table))} DETACH PARTITION {qn(partition.name)}"
+        )
+        cursor.execute(f"DROP TABLE {qn(partition.name)}")
+    return path, rows
@@ -0,0 +1,58 @@
+"""
+Batched loading of SCD2 versions linked by natural key rather than by ForeignKey
+(e.g. `EntityDetail.entity_uuid` -> `Entity.uuid`), where `prefetch_related()` does not apply.
+
+One `field IN (...)` query per call; the matches are grouped in Python and attached to every
+instance as a list (`to_attr`), empty when nothing matched.
+
+Example:
+    prefetch_versions(page, EntityDetail.objects.current(), "entity_uuid", "current_details")
+"""
+from collections import defaultdict
+
+from django.db.models import QuerySet
+
+from core.utils.async_db import afetch_instances
+
+
+def get_prefetch_queryset(instances: list, queryset: QuerySet, field: str, key: str = "uuid") -> QuerySet:
+    """
+    `queryset` narrowed to the rows whose `field` matches the `key` of `instances`.
+    """
+    keys = {getattr(instance, key) for instance in instances}
+    return queryset.filter(**{f"{field}__in": keys}).order_by(field, "id")
+
+
+def attach_versions(instances: list, related: list, field: str, to_attr: str, key: str = "uuid") -> list:
+    grouped = defaultdict(list)
+    for obj in related:
+        grouped[getattr(obj, field)].append(obj)
+    for instance in instances:
+        setattr(instance, to_attr, grouped.get(getattr(instance, key), []))
+    return related
+
+
+def prefetch_versions(instances: list, queryset: QuerySet, field: str, to_attr: str, key: str = "uuid") -> list:
+    """
+    Attach the rows of `queryset` whose `field` equals `instance.<key>` to each instance as `to_attr`.
+
+    Args:
+        instances: model instances, e.g. a page of current entities.
+        queryset: rows to load, usually `Model.objects.current()` or `Model.objects.as_of(ts)`.
+        field: natural key column of `queryset` pointing at the instances.
+        to_attr: attribute set on each instance.
+        key: attribute of the instances matched against `field`.
+
+    Returns:
+        All loaded rows.
+    """
+    related = list(get_prefetch_queryset(instances, queryset, field, key)) if instances else []
+    return attach_versions(instances, related, field, to_attr, key)
+
+
+async def aprefetch_versions(instances: list, queryset: QuerySet, field: str, to_attr: str, key: str = "uuid") -> list:
+    """
+    `prefetch_versions` on the async pool.
+    """
+    related = await afetch_instances(get_prefetch_queryset(instances, queryset, field, key)) if instances else []
+    return attach_versions(instances, related, field, to_attr, key)
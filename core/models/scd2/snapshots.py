@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, models
+from django.db.models import Index
+from django.utils import timezone
+
+SNAPSHOT_INTERVALS = {
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+
+DEFAULT_SNAPSHOTS = {
+    # Seconds a boundary must be in the past before it is snapshotted; must exceed the longest write
+    # transaction, so versions opened before the boundary have committed when the checkpoint is taken
+    "SAFETY_LAG": 900,
+}
+
+
+def get_snapshot_settings() -> dict:
+    return {**DEFAULT_SNAPSHOTS, **getattr(settings, "SCD2_SNAPSHOTS", {})}
+
+
+def get_safety_lag() -> timedelta:
+    return timedelta(seconds=get_snapshot_settings()["SAFETY_LAG"])
+
+
+class SCD2SnapshotBase(models.Model):
+    """
+    Abstract as-of checkpoint table: the ids of the versions valid at `taken_at`.
+
+    Usage:
+        1. Define a concrete model in your app with a `version` key to the SCD2 model:
+            class EntitySnapshot(SCD2SnapshotBase):
+                version = models.ForeignKey(
+                    Entity, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name="+"
+                )
+
+                class Meta:
+                    indexes = [*get_snapshot_indexes("entity")]
+        2. Point the SCD2 config to it: `SCD2ModelConfig(snapshot_model="entities.EntitySnapshot")`.
+        3. Take checkpoints periodically: `python manage.py take_scd2_snapshots`.
+
+    `Model.objects.as_of(ts)` then reads the nearest earlier checkpoint and replays only
+    the versions opened since, instead of scanning validity predicates over the full history.
+
+    Checkpoints are only taken for boundaries older than the SAFETY_LAG of `settings.SCD2_SNAPSHOTS`,
+    and saves / bulk transitions of backdated versions delete the checkpoints taken at or after
+    their `valid_from` (`invalidate_checkpoints`), so a checkpoint never misses a version.
+    Raw `QuerySet.update()` calls of `valid_from` bypass invalidation.
+    """
+    # Fields
+    taken_at = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+
+def get_snapshot_indexes(model_name: str) -> list[Index]:
+    # (taken_at, version) lets a checkpoint be read with an index-only scan
+    return [Index(fields=["taken_at", "version"], name=f"idx_snap_{model_name}")]
+
+
+def get_snapshot_model(model):
+    label = model.scd2_config.snapshot_model
+    return apps.get_model(label) if label else None
+
+
+def get_checkpoint_queryset(model, timestamp: datetime):
+    """
+    Query of the latest checkpoint taken at or before `timestamp` (a `taken_at` values list),
+    or None when the model has no snapshot_model.
+    """
+    snapshot_model = get_snapshot_model(model)
+    if snapshot_model is None:
+        return None
+
+    return (
+        snapshot_model.objects
+        .filter(taken_at__lte=timestamp)
+        .order_by("-taken_at")
+        .values_list("taken_at", flat=True)[:1]
+    )
+
+
+def get_checkpoint_before(model, timestamp: datetime) -> datetime | None:
+    """
+    Returns the latest checkpoint taken at or before `timestamp`, or None.
+    """
+    queryset = get_checkpoint_queryset(model, timestamp)
+    return queryset.first() if queryset is not None else None
+
+
+def get_checkpoint_times(interval: str, until: datetime, count: int = 1) -> list[datetime]:
+    """
+    Returns the last `count` checkpoint boundaries of `interval` at or before `until`, oldest first.
+    Boundaries are aligned to the Unix epoch (midnight UTC for daily, Thursday for weekly).
+    """
+    if interval not in SNAPSHOT_INTERVALS:
+        raise ValueError(f"Unknown snapshot interval '{interval}'. Use one of: {', '.join(SNAPSHOT_INTERVALS)}.")
+
+    step = SNAPSHOT_INTERVALS[interval]
+    epoch = datetime(1970, 1, 1, tzinfo=until.tzinfo)
+    last = epoch + ((until - epoch) // step) * step
+
+    return [last - step * index for index in reversed(range(count))]
+
+
+def take_snapshot(model, taken_at: datetime) -> int:
+    """
+    Materialize the versions valid at `taken_at` with a single `INSERT ... SELECT`.
+    Idempotent: an existing checkpoint at `taken_at` is left untouched.
+
+    Returns:
+        int: number of snapshot rows written.
+
+    Raises:
+        ValueError: no snapshot_model, or `taken_at` is within the safety lag.
+    """
+    snapshot_model = get_snapshot_model(model)
+    if snapshot_model is None:
+        raise ValueError(f"{model.__name__} has no snapshot_model configured.")
+    if taken_at > timezone.now() - get_safety_lag():
+        raise ValueError(f"Checkpoint {taken_at.isoformat()} is within the snapshot safety lag; take it later.")
+
+    if snapshot_model.objects.filter(taken_at=taken_at).exists():
+        return 0
+
+    qn = connection.ops.quote_name
+    meta = model._meta
+    snapshot_meta = snapshot_model._meta
+    validity = qn(meta.get_field("validity").column)
+
+    sql = (
+        f"INSERT INTO {qn(snapshot_meta.db_table)} "
+        f"({qn(snapshot_meta.get_field('taken_at').column)}, {qn(snapshot_meta.get_field('version').column)}) "
+        f"SELECT %s, {qn(meta.pk.column)} FROM {qn(meta.db_table)} "
+        f"WHERE {validity} @> %s::timestamptz"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [taken_at, taken_at])
+        return cursor.rowcount
+
+
+def invalidate_checkpoints(model, valid_from: datetime) -> int:
+    """
+    Delete the checkpoints taken at or after `valid_from` when a version opened at `valid_from` was written:
+    they were materialized without it. Versions opened within the safety lag skip the query, as no
+    checkpoint is that recent. `take_scd2_snapshots` takes the deleted boundaries again (within `--backfill`);
+    until then `as_of` replays from an earlier checkpoint.
+
+    Returns:
+        int: number of snapshot rows deleted.
+    """
+    snapshot_model = get_snapshot_model(model)
+    if snapshot_model is None or valid_from > timezone.now() - get_safety_lag():
+        return 0
+    deleted, _ = snapshot_model.objects.filter(taken_at__gte=valid_from).delete()
+    return deleted
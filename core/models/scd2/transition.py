@@ -0,0 +1,144 @@
+from django.apps import apps
+from django.db import IntegrityError, OperationalError, connection
+
+from core.models.scd2.bulk import has_hash_diff
+from core.models.scd2.cache import invalidate_cache
+from core.models.scd2.changelog import get_changed_fields, get_natural_key_str
+from core.models.scd2.concurrency import SCD2VersionConflict, is_version_conflict
+
+TRANSITION_MODES = ("orm", "cte")
+
+
+def _get_insert_fields(model) -> list:
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and not field.generated
+    ]
+
+
+def cte_transition(new_version, old_version) -> None:
+    """
+    Close `old_version` and insert `new_version` (plus the change log rows) in one statement:
+
+        WITH closed AS (UPDATE ... WHERE id = %s AND is_current RETURNING ...),
+             inserted AS (INSERT ... SELECT ... FROM closed RETURNING ...),
+             log AS (INSERT INTO <change log> SELECT ... FROM inserted, closed, (VALUES ...))
+        SELECT ... FROM inserted
+
+    The transition time comes from the database clock, `GREATEST(statement_timestamp(), valid_from)`,
+    so the closed and the new version share exactly the same timestamp. `auto_now` / `auto_now_add`
+    fields of the affected rows get the same value. Parameters are cast explicitly to the column types.
+
+    On return `new_version` carries its pk and timestamps and `old_version` its `valid_to`.
+
+    Raises:
+        SCD2VersionConflict: `old_version` is no longer current, or a concurrent transition won.
+    """
+    model = new_version.__class__
+    config = model.scd2_config
+    meta = model._meta
+    qn = connection.ops.quote_name
+
+    def column(name: str) -> str:
+        return qn(meta.get_field(name).column)
+
+    table = qn(meta.db_table)
+    pk = qn(meta.pk.column)
+    auto_now_fields = [field for field in meta.concrete_fields if getattr(field, "auto_now", False)]
+    auto_now_add_fields = [field for field in meta.concrete_fields if getattr(field, "auto_now_add", False)]
+
+    if has_hash_diff(new_version):
+        new_version.hash_diff = new_version.compute_hash_diff()
+
+    params = []
+
+    # Close
+    close_assignments = [f"{column('valid_to')} = GREATEST(statement_timestamp(), {column('valid_from')})"]
+    close_assignments.append(f"{column('is_current')} = false")
+    close_assignments += [f"{qn(field.column)} = GREATEST(statement_timestamp(), {column('valid_from')})" for field in auto_now_fields]
+    closed_sql = (
+        f"UPDATE {table} SET {', '.join(close_assignments)} "
+        f"WHERE {pk} = %s AND {column('is_current')} "
+        f"RETURNING {pk} AS id, {column('valid_to')} AS valid_to"
+    )
+    params.append(old_version.pk)
+
+    # Insert, timestamps taken from the closed row
+    clock_fields = {"valid_from"} | {field.name for field in auto_now_fields + auto_now_add_fields}
+    insert_columns = []
+    select_values = []
+    for field in _get_insert_fields(model):
+        insert_columns.append(qn(field.column))
+        if field.name in clock_fields:
+            select_values.append("closed.valid_to")
+        elif field.name == "valid_to":
+            select_values.append("NULL")
+        elif field.name == "is_current":
+            select_values.append("true")
+        else:
+            select_values.append(f"%s::{field.db_type(connection)}")
+            params.append(field.get_db_prep_save(getattr(new_version, field.attname), connection))
+
+    inserted_sql = (
+        f"INSERT INTO {table} ({', '.join(insert_columns)}) "
+        f"SELECT {', '.join(select_values)} FROM closed "
+        f"RETURNING {pk} AS id, {column('valid_from')} AS valid_from"
+    )
+    ctes = [f"closed AS ({closed_sql})", f"inserted AS ({inserted_sql})"]
+
+    # Change log
+    changed, mask = get_changed_fields(new_version, old_version, config.detection_fields or [])
+    if config.change_log_model and changed:
+        log_model = apps.get_model(config.change_log_model)
+        log_meta = log_model._meta
+
+        def log_column(name: str) -> str:
+            return qn(log_meta.get_field(name).column)
+
+        log_columns = [
+            "model_name", "natural_key", "field", "old_value", "new_value",
+            "changed_at", "changed_mask", "version_id", "previous_version_id",
+        ]
+        changes_values = []
+        for field in changed:
+            changes_values.append("(%s::text, %s::text, %s::text)")
+            old_value, new_value = getattr(old_version, field), getattr(new_version, field)
+            params += [field, None if old_value is None else str(old_value), None if new_value is None else str(new_value)]
+
+        ctes.append(
+            f"log AS (INSERT INTO {qn(log_meta.db_table)} ({', '.join(log_column(name) for name in log_columns)}) "
+            f"SELECT %s, %s, changes.field, changes.old_value, changes.new_value, "
+            f"inserted.valid_from, %s, inserted.id, closed.id "
+            f"FROM inserted CROSS JOIN closed CROSS JOIN (VALUES {', '.join(changes_values)}) "
+            f"AS changes(field, old_value, new_value))"
+        )
+        # Placeholders of the SELECT list come after the VALUES ones in the statement text
+        values_params = params[-3 * len(changed):]
+        del params[-3 * len(changed):]
+        params += [config.model_name, get_natural_key_str(config.natural_key(new_version)), mask, *values_params]
+
+    sql = f"WITH {', '.join(ctes)} SELECT inserted.id, inserted.valid_from FROM inserted"
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except (IntegrityError, OperationalError) as error:
+        if is_version_conflict(model, error):
+            raise SCD2VersionConflict(str(error)) from error
+        raise
+
+    if row is None:
+        raise SCD2VersionConflict(f"{model.__name__} {old_version.pk} is no longer the current version.")
+
+    new_version.pk, timestamp = row
+    new_version.valid_from = timestamp
+    for field in auto_now_fields + auto_now_add_fields:
+        setattr(new_version, field.attname, timestamp)
+        if field in auto_now_fields:
+            setattr(old_version, field.attname, timestamp)
+    new_version._state.adding = False
+    new_version._capture_loaded_values()
+    old_version.valid_to = timestamp
+
+    invalidate_cache(model, [new_version])
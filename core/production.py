@@ -0,0 +1,140 @@
+"""
+Production settings layer shared by the services (`<app>/config/settings_production.py`).
+
+Databases are served from a psycopg3 connection pool per worker process (Django >= 5.1 `OPTIONS["pool"]`),
+with health checks on checkout and server-side parameter binding, so statements can be prepared
+by the server and reused across requests.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Pool per worker process: size it so that workers * max_size stays below the server's max_connections
+DATABASE_POOL = {
+    "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+    "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+    "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+    "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+    "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", 3600)),
+}
+
+DATABASE_OPTIONS = {
+    # Parameters bound by the server instead of interpolated on the client
+    "server_side_binding": os.environ.get("DB_SERVER_SIDE_BINDING", "true").lower() == "true",
+    # Prepare a statement after it was executed this many times on a connection (None disables)
+    "prepare_threshold": int(os.environ.get("DB_PREPARE_THRESHOLD", 5)),
+}
+
+
+# Per-request query instrumentation (core/middleware.py) is opt-in: it logs SQL and exposes timings to clients
+QUERY_INSTRUMENTATION = {
+    "ENABLED": os.environ.get("QUERY_INSTRUMENTATION", "false").lower() == "true",
+    "SERVER_TIMING": os.environ.get("QUERY_INSTRUMENTATION_SERVER_TIMING", "false").lower() == "true",
+    "LOG": os.environ.get("QUERY_INSTRUMENTATION_LOG", "false").lower() == "true",
+}
+
+
+# Prometheus multiprocess directory shared by the gunicorn workers and the management commands
+PROMETHEUS_MULTIPROC_DIR = "/tmp/prometheus-multiproc"
+
+
+def prepare_metrics_dir() -> str:
+    """
+    Point prometheus_client to the multiprocess directory (`PROMETHEUS_MULTIPROC_DIR`, created if missing).
+
+    Called from the settings, i.e. before the models import prometheus_client, so the workers and
+    `ingest_entities` runs of the profile all write there. Samples of earlier runs are only dropped
+    by gunicorn's `on_starting` hook (core/gunicorn.conf.py).
+    """
+    path = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", PROMETHEUS_MULTIPROC_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_metrics() -> dict:
+    """
+    `METRICS` of the production profile: `/metrics` is served on the public services, so it requires
+    the `METRICS_TOKEN` bearer token unless metrics are disabled (`METRICS_ENABLED=false`).
+    """
+    enabled = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+    token = os.environ.get("METRICS_TOKEN") or None
+    if enabled and token is None:
+        raise ImproperlyConfigured("Set METRICS_TOKEN (or METRICS_ENABLED=false) in the production profile.")
+    return {"ENABLED": enabled, "TOKEN": token}
+
+
+def get_secret_key() -> str:
+    """
+    `DJANGO_SECRET_KEY`, required: it signs sessions and the JWTs whose role claims are trusted
+    without a database lookup, so the development key of `core/settings.py` must never serve production.
+    """
+    secret_key = os.environ.get("DJANGO_SECRET_KEY", "")
+    if not secret_key or secret_key.startswith("django-insecure"):
+        raise ImproperlyConfigured("Set DJANGO_SECRET_KEY to a random secret in the production profile.")
+    return secret_key
+
+
+def get_allowed_hosts() -> list[str]:
+    hosts = [host.strip() for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",") if host.strip()]
+    if not hosts:
+        raise ImproperlyConfigured("Set DJANGO_ALLOWED_HOSTS (comma-separated) in the production profile.")
+    return hosts
+
+
+# Cache alias shared by all workers (and by management commands) for the SCD2 read cache
+SCD2_CACHE_ALIAS = "scd2"
+
+
+def get_caches(caches: dict) -> dict:
+    """
+    `caches` plus the shared "scd2" alias when `SCD2_CACHE_LOCATION` is set (e.g. `redis://redis:6379/0`),
+    served by `SCD2_CACHE_BACKEND` (default: Django's Redis backend, which needs the `redis` package).
+    """
+    location = os.environ.get("SCD2_CACHE_LOCATION")
+    if not location:
+        return caches
+    backend = os.environ.get("SCD2_CACHE_BACKEND", "django.core.cache.backends.redis.RedisCache")
+    return {**caches, SCD2_CACHE_ALIAS: {"BACKEND": backend, "LOCATION": location}}
+
+
+def get_scd2_cache(caches: dict) -> dict | None:
+    """
+    `SCD2_CACHE` of a multi-process profile: `DjangoCache` on the shared alias, or None (read cache disabled).
+
+    The in-process LRU is never used here: invalidation only reaches the process that wrote the version,
+    so other workers and `ingest_entities` runs would leave stale entries (and ETags) behind.
+    """
+    if SCD2_CACHE_ALIAS not in caches:
+        return None
+    return {
+        "BACKEND": "core.utils.cache.DjangoCache",
+        "OPTIONS": {"alias": SCD2_CACHE_ALIAS, "timeout": int(os.environ.get("SCD2_CACHE_TIMEOUT", 300))},
+    }
+
+
+def get_pooled_database(database: dict, pool: dict = None, options: dict = None) -> dict:
+    """
+    Copy of a `DATABASES` entry served from a connection pool.
+
+    Pooling replaces persistent connections, so `CONN_MAX_AGE` is 0; `CONN_HEALTH_CHECKS` makes the
+    pool check connections when they are handed out.
+    """
+    return {
+        **database,
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            **database.get("OPTIONS", {}),
+            **DATABASE_OPTIONS,
+            **(options or {}),
+            "pool": {**DATABASE_POOL, **(pool or {})},
+        },
+    }
+
+
+def configure(databases: dict) -> dict:
+    """
+    Usage:
+        DATABASES = configure(DATABASES)
+    """
+    return {alias: get_pooled_database(database) for alias, database in databases.items()}
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # Third-party
     "rest_framework",
@@ -47,6 +48,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Request latency histogram per route (core/metrics.py), see METRICS
+    "core.middleware.MetricsMiddleware",
+    # Query count / DB time per request (Server-Timing header + log line), see QUERY_INSTRUMENTATION
+    "core.middleware.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -131,3 +136,65 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+# Versioned read cache for SCD2 snapshots/history (core/utils/cache.py), None to disable.
+# The LRU backend is per process, so only fit for a single-process server (runserver): writes in another
+# process (a worker, ingest_entities) do not invalidate it. Multi-process profiles use "core.utils.cache.DjangoCache"
+# on a shared CACHES alias, or no read cache (core/production.py).
+SCD2_CACHE = {
+    "BACKEND": "core.utils.cache.LRUCache",
+    "OPTIONS": {
+        "maxsize": int(os.environ.get("SCD2_CACHE_MAXSIZE", 10000)),
+        "timeout": int(os.environ.get("SCD2_CACHE_TIMEOUT", 300)),
+    },
+}
+
+# As-of checkpoints (core/models/scd2/snapshots.py): boundaries are snapshotted once SAFETY_LAG seconds old,
+# which must exceed the longest write transaction
+SCD2_SNAPSHOTS = {
+    "SAFETY_LAG": int(os.environ.get("SCD2_SNAPSHOT_SAFETY_LAG", 900)),
+}
+
+# Concurrent SCD2 transitions (core/models/scd2/concurrency.py):
+# "retry" re-runs a conflicting transition, "lock" also serializes writers per natural key (advisory locks).
+SCD2_CONCURRENCY = {
+    "MODE": os.environ.get("SCD2_CONCURRENCY_MODE", "retry"),
+    "RETRIES": 3,
+    "BACKOFF": 0.02,
+}
+
+# Per-request query instrumentation (core/middleware.py); disable per deployment with QUERY_INSTRUMENTATION=false
+QUERY_INSTRUMENTATION = {
+    "ENABLED": os.environ.get("QUERY_INSTRUMENTATION", "true").lower() == "true",
+    "SERVER_TIMING": os.environ.get("QUERY_INSTRUMENTATION_SERVER_TIMING", "true").lower() == "true",
+    "LOG": os.environ.get("QUERY_INSTRUMENTATION_LOG", "true").lower() == "true",
+}
+
+# Snapshot and history bodies built by Postgres (core/utils/db_json.py) instead of DRF serializers
+DB_JSON_RENDERING = {
+    "ENABLED": os.environ.get("DB_JSON_RENDERING", "true").lower() == "true",
+}
+
+# Prometheus metrics (core/metrics.py), served at /metrics; set PROMETHEUS_MULTIPROC_DIR with several workers
+METRICS = {
+    "ENABLED": os.environ.get("METRICS_ENABLED", "true").lower() == "true",
+    "TOKEN": os.environ.get("METRICS_TOKEN") or None,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "plain": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "plain"},
+    },
+    "loggers": {
+        "core.middleware": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
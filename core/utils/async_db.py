@@ -0,0 +1,140 @@
+"""
+Native async query execution for ASGI views.
+
+Django's async ORM API (`aget`, `aiterator`, ...) still runs the synchronous database layer in a
+thread (`sync_to_async`), one query at a time per worker. Here querysets are only *compiled*
+by the ORM and executed on a psycopg3 `AsyncConnectionPool`, so a single worker process
+can keep many slow queries in flight.
+"""
+import asyncio
+import time
+from typing import AsyncIterator
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
+from psycopg_pool import AsyncConnectionPool
+
+from core.utils.instrumentation import record
+from core.utils.streaming import DEFAULT_CHUNK_SIZE
+
+DEFAULT_ASYNC_DB_POOL = {
+    "min_size": 2,
+    "max_size": 20,
+    "timeout": 30,
+}
+
+_pools: dict[str, AsyncConnectionPool] = {}
+_pools_lock = asyncio.Lock()
+
+
+def get_connection_kwargs(alias: str = "default") -> dict:
+    """
+    psycopg connection arguments of the Django database `alias` (autocommit, UTC session time zone,
+    same `prepare_threshold`).
+    """
+    params = connections[alias].get_connection_params()
+    for key in ("cursor_factory", "context", "server_side_binding"):
+        params.pop(key, None)
+    params["autocommit"] = True
+    params["options"] = f"{params.get('options', '')} -c TimeZone=UTC".strip()
+    return params
+
+
+async def get_async_pool(alias: str = "default") -> AsyncConnectionPool:
+    """
+    Process-wide async connection pool for the database `alias`, opened on first use.
+    Sized by `settings.ASYNC_DB_POOL` (min_size / max_size / timeout).
+    """
+    pool = _pools.get(alias)
+    if pool is None:
+        async with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                options = {**DEFAULT_ASYNC_DB_POOL, **getattr(settings, "ASYNC_DB_POOL", {})}
+                pool = AsyncConnectionPool(kwargs=get_connection_kwargs(alias), open=False, **options)
+                await pool.open()
+                _pools[alias] = pool
+    return pool
+
+
+async def close_async_pools() -> None:
+    while _pools:
+        _, pool = _pools.popitem()
+        await pool.close()
+
+
+async def afetch_rows(queryset: QuerySet) -> tuple[list[str], list[tuple]]:
+    """
+    Execute the SQL compiled for `queryset` on the async pool.
+
+    Returns:
+        (columns, rows)
+    """
+    sql, params = queryset.query.sql_with_params()
+    return await afetch_sql(sql, params, queryset.db)
+
+
+async def afetch_sql(sql: str, params, alias: str = "default") -> tuple[list[str], list[tuple]]:
+    """
+    Execute raw SQL on the async pool of `alias`.
+
+    Returns:
+        (columns, rows)
+    """
+    pool = await get_async_pool(alias)
+    async with pool.connection() as connection:
+        async with connection.cursor() as cursor:
+            start = time.perf_counter()
+            await cursor.execute(sql, params)
+            rows = await cursor.fetchall()
+            record(sql, time.perf_counter() - start)
+            columns = [column.name for column in cursor.description] if cursor.description else []
+    return columns, rows
+
+
+async def astream_rows(queryset: QuerySet, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[tuple]:
+    """
+    Rows of `queryset` through a server-side cursor on the async pool, fetched `chunk_size` at a time,
+    so memory stays flat regardless of size. The pool connection is held until the iteration ends
+    or the generator is closed.
+    """
+    sql, params = queryset.query.sql_with_params()
+    pool = await get_async_pool(queryset.db)
+    async with pool.connection() as connection:
+        # Pool connections are in autocommit; a server-side cursor lives in a transaction
+        async with connection.transaction():
+            async with connection.cursor(name="astream_rows") as cursor:
+                cursor.itersize = chunk_size
+                start = time.perf_counter()
+                await cursor.execute(sql, params)
+                record(sql, time.perf_counter() - start)
+                async for row in cursor:
+                    yield row
+
+
+async def afetch_dicts(queryset: QuerySet) -> list[dict]:
+    """
+    Rows of a `values()` queryset (or any queryset with named columns) as dicts.
+    """
+    columns, rows = await afetch_rows(queryset)
+    return [dict(zip(columns, row)) for row in rows]
+
+
+async def afetch_value(queryset: QuerySet):
+    """
+    First column of the first row, or None.
+    """
+    _, rows = await afetch_rows(queryset)
+    return rows[0][0] if rows else None
+
+
+async def afetch_instances(queryset: QuerySet) -> list:
+    """
+    Model instances for a plain model queryset: all concrete columns are selected by position
+    and the instances are built with `Model.from_db`, without touching Django's sync connection.
+    """
+    model = queryset.model
+    attnames = [field.attname for field in model._meta.concrete_fields]
+    _, rows = await afetch_rows(queryset.values_list(*attnames))
+    return [model.from_db(queryset.db, attnames, row) for row in rows]
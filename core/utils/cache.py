@@ -0,0 +1,207 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    In-process, thread-safe LRU cache with size-bounded eviction and an optional TTL.
+    Entries are local to the worker process.
+    """
+
+    def __init__(self, maxsize: int = 10000, timeout: float = None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.timeout if self.timeout else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DjangoCache:
+    """
+    Shared backend on top of a Django cache alias (e.g. Redis or Memcached), visible to all workers.
+    """
+
+    def __init__(self, alias: str = "default", timeout: float = None):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.cache.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        self.cache.set(key, value, self.timeout)
+
+    def delete(self, key: str) -> None:
+        self.cache.delete(key)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+class VersionedCache:
+    """
+    Read-through cache of values that only change when a new version of their key is written.
+
+    Every key has a generation token (the id of the latest version when known). Cached values
+    are stored under `(namespace, key, token)`; invalidation replaces the token, so stale entries
+    are never read again and age out of the backend.
+
+    Usage:
+        data = cache.get_or_set("entity", entity_uuid, "snapshot", lambda: build_snapshot(entity_uuid))
+        cache.invalidate("entity", entity_uuid, version_id=new_version.pk)
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    @staticmethod
+    def _token_key(namespace: str, key) -> str:
+        return f"scd2:{namespace}:{key}"
+
+    def get_token(self, namespace: str, key) -> str:
+        token_key = self._token_key(namespace, key)
+        token = self.backend.get(token_key)
+        if token is None:
+            token = uuid.uuid4().hex
+            self.backend.set(token_key, token)
+        return token
+
+    def get_or_set(self, namespace: str, key, name: str, func: Callable[[], Any]) -> Any:
+        value_key = f"{self._token_key(namespace, key)}:{self.get_token(namespace, key)}:{name}"
+
+        value = self.backend.get(value_key, _MISSING)
+        if value is _MISSING:
+            value = func()
+            self.backend.set(value_key, value)
+        return value
+
+    def get(self, namespace: str, key, name: str, default: Any = None) -> Any:
+        token = self.backend.get(self._token_key(namespace, key))
+        if token is None:
+            return default
+        return self.backend.get(f"{self._token_key(namespace, key)}:{token}:{name}", default)
+
+    def invalidate(self, namespace: str, key, version_id: int = None) -> None:
+        self.invalidate_many(namespace, {key: version_id})
+
+    def invalidate_many(self, namespace: str, keys: dict | Iterable) -> None:
+        """
+        Replace the generation tokens of `keys` (a `{key: latest_version_id}` mapping or plain keys)
+        now and again once the surrounding transaction commits, so values computed from
+        pre-commit reads in the meantime are discarded as well.
+        """
+        if not isinstance(keys, dict):
+            keys = dict.fromkeys(keys)
+        if not keys:
+            return
+
+        def _bump(with_versions=False):
+            for key, version_id in keys.items():
+                token = uuid.uuid4().hex
+                if with_versions and version_id:
+                    token = f"{version_id}-{token[:8]}"
+                self.backend.set(self._token_key(namespace, key), token)
+
+        _bump(with_versions=True)
+        transaction.on_commit(_bump)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+_cache: VersionedCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_versioned_cache() -> VersionedCache | None:
+    """
+    Return the process-wide VersionedCache configured by `settings.SCD2_CACHE`, or None when disabled.
+
+    Example:
+        SCD2_CACHE = {"BACKEND": "core.utils.cache.LRUCache", "OPTIONS": {"maxsize": 10000, "timeout": 300}}
+        SCD2_CACHE = {"BACKEND": "core.utils.cache.DjangoCache", "OPTIONS": {"alias": "default"}}
+    """
+    global _cache
+
+    config = getattr(settings, "SCD2_CACHE", None)
+    if not config:
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                backend_class = import_string(config["BACKEND"])
+                _cache = VersionedCache(backend_class(**config.get("OPTIONS", {})))
+    return _cache
+
+
+def _reset_versioned_cache(*, setting, **kwargs):
+    global _cache
+    if setting == "SCD2_CACHE":
+        _cache = None
+
+
+setting_changed.connect(_reset_versioned_cache)
+
+
+def get_or_set_cached(namespace: str, key, name: str, func: Callable[[], Any]) -> Any:
+    """
+    `VersionedCache.get_or_set` on the configured cache; calls `func` directly when caching is disabled.
+    """
+    cache = get_versioned_cache()
+    if cache is None:
+        return func()
+    return cache.get_or_set(namespace, key, name, func)
+
+
+def get_cached(namespace: str, key, name: str) -> Any:
+    """
+    Cached value of `name` for the current generation of `key`, or None (also when caching is disabled).
+    """
+    cache = get_versioned_cache()
+    if cache is None:
+        return None
+    return cache.get(namespace, key, name)
@@ -0,0 +1,177 @@
+"""
+Database-side JSON rendering: Postgres builds the response body with `json_build_object` / `json_agg`
+in one statement and the view passes the text through, without model instances, serializers or re-parsing.
+
+The output matches DRF serializers of the same fields: keys in the given order, uuids as strings,
+datetimes in ISO 8601 UTC with a `Z` suffix (microseconds only when non-zero).
+
+Example:
+    query = JSONQuery(
+        "json_build_object('entities', entity.data)",
+        entity=JSONRows(Entity.objects.current(), {"uuid": "uuid", "display_name": "display_name"}),
+    )
+    body, etag_rows = query.fetch()
+
+Toggled with `settings.DB_JSON_RENDERING`.
+"""
+from django.conf import settings
+from django.db import connections
+from django.db.models import DateTimeField, QuerySet
+
+from core.utils.async_db import afetch_sql
+from core.utils.etag import ETAG_FIELDS
+
+DEFAULT_DB_JSON_RENDERING = {
+    "ENABLED": True,
+}
+
+# DRF's DateTimeField output: isoformat() in UTC with "+00:00" written as "Z"
+ISO_DATETIME_SQL = (
+    "CASE WHEN mod(date_part('microseconds', {column})::bigint, 1000000) = 0 "
+    "THEN to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD\"T\"HH24:MI:SS\"Z\"') "
+    "ELSE to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD\"T\"HH24:MI:SS.US\"Z\"') END"
+)
+
+# Order of the ETag columns, as in `get_queryset_etag()`
+ETAG_ORDER = ("-valid_from", "-id")
+
+
+def get_db_json_settings() -> dict:
+    return {**DEFAULT_DB_JSON_RENDERING, **getattr(settings, "DB_JSON_RENDERING", {})}
+
+
+def is_db_json_enabled() -> bool:
+    return get_db_json_settings()["ENABLED"]
+
+
+class SQL(str):
+    """
+    Raw SQL expression used as a field value, e.g. a reference to another rows group: `SQL("detail.data -> 0")`.
+    """
+
+
+def get_order_sql(order_by) -> str:
+    return ", ".join(
+        f'r."{name[1:]}" DESC' if name.startswith("-") else f'r."{name}"'
+        for name in order_by
+    )
+
+
+class JSONRows:
+    """
+    The rows of `queryset` as a JSON array (`<name>.data` in the `JSONQuery` body), optionally with
+    the `(id, hash_diff, valid_to)` columns of the ETag.
+
+    Args:
+        queryset: rows to render; filters, annotations and subqueries are compiled by the ORM.
+        fields: `{json key: column}`, where a column is a model field (attname for foreign keys)
+            or an annotation of `queryset`. A dict value nests an object, an `SQL` value is used as is.
+        order_by: array order, column names with an optional "-" prefix.
+        etag: also aggregate the ETag columns.
+    """
+
+    def __init__(self, queryset: QuerySet, fields: dict, order_by=("id",), etag: bool = False):
+        self.queryset = queryset
+        self.fields = fields
+        self.order_by = list(order_by)
+        self.etag = etag
+
+    def get_columns(self, fields: dict = None) -> list[str]:
+        columns = []
+        for value in (fields or self.fields).values():
+            if isinstance(value, dict):
+                columns += self.get_columns(value)
+            elif not isinstance(value, SQL):
+                columns.append(value)
+        return columns
+
+    def get_output_field(self, column: str):
+        annotation = self.queryset.query.annotations.get(column)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(column)
+
+    def get_value_sql(self, value) -> str:
+        if isinstance(value, SQL):
+            return value
+        if isinstance(value, dict):
+            return self.get_object_sql(value)
+        column = f'r."{value}"'
+        if isinstance(self.get_output_field(value), DateTimeField):
+            return ISO_DATETIME_SQL.format(column=column)
+        return column
+
+    def get_object_sql(self, fields: dict) -> str:
+        members = ", ".join(f"'{key}', {self.get_value_sql(value)}" for key, value in fields.items())
+        return f"json_build_object({members})"
+
+    def get_sql(self, joins: list[str]) -> tuple[str, tuple]:
+        """
+        `SELECT ... FROM (<queryset>) AS r` aggregating all rows into one; `joins` are the groups defined before.
+        """
+        order_by = [*self.order_by, *(ETAG_ORDER if self.etag else ())]
+        columns = [*self.get_columns(), *(name.lstrip("-") for name in order_by), *(ETAG_FIELDS if self.etag else ())]
+        inner, params = self.queryset.order_by().values(*dict.fromkeys(columns)).query.sql_with_params()
+
+        select = [
+            f"COALESCE(json_agg({self.get_object_sql(self.fields)} ORDER BY {get_order_sql(self.order_by)}), "
+            f"'[]'::json) AS data"
+        ]
+        if self.etag:
+            order = get_order_sql(ETAG_ORDER)
+            select += [f'array_agg(r."{field}" ORDER BY {order}) AS etag_{field}' for field in ETAG_FIELDS]
+
+        from_sql = " CROSS JOIN ".join([f"({inner}) AS r", *joins])
+        return f"SELECT {', '.join(select)} FROM {from_sql}", tuple(params)
+
+
+class JSONQuery:
+    """
+    One statement rendering `body` (a JSON SQL expression over the `<name>.data` of the rows groups)
+    as text. Groups may reference groups defined before them with `SQL` field values.
+    """
+
+    def __init__(self, body: str, using: str = "default", **rows: JSONRows):
+        self.body = body
+        self.using = using
+        self.rows = rows
+
+    def get_sql(self) -> tuple[str, tuple]:
+        ctes, params, names = [], (), []
+        for name, rows in self.rows.items():
+            sql, rows_params = rows.get_sql(names)
+            ctes.append(f"{name} AS ({sql})")
+            params += rows_params
+            names.append(name)
+
+        etag_columns = [
+            f"{name}.etag_{field}" for name, rows in self.rows.items() if rows.etag for field in ETAG_FIELDS
+        ]
+        select = ", ".join([f"({self.body})::text", *etag_columns])
+        return f"WITH {', '.join(ctes)} SELECT {select} FROM {', '.join(names)}", params
+
+    def parse(self, row: tuple) -> tuple[str | None, dict[str, list[tuple]]]:
+        """
+        Returns:
+            (JSON text or None when `body` is NULL, `{name: ETag rows}` of the groups with `etag=True`)
+        """
+        body, *columns = row
+        etag_rows = {}
+        for name in (name for name, rows in self.rows.items() if rows.etag):
+            arrays = [columns.pop(0) or [] for _ in ETAG_FIELDS]
+            etag_rows[name] = list(zip(*arrays))
+        return body, etag_rows
+
+    def fetch(self) -> tuple[str | None, dict[str, list[tuple]]]:
+        sql, params = self.get_sql()
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(sql, params)
+            return self.parse(cursor.fetchone())
+
+    async def afetch(self) -> tuple[str | None, dict[str, list[tuple]]]:
+        """
+        `fetch` on the async pool.
+        """
+        sql, params = self.get_sql()
+        _, rows = await afetch_sql(sql, params, self.using)
+        return self.parse(rows[0])
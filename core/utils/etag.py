@@ -0,0 +1,115 @@
+import hashlib
+from typing import Any, Callable, Iterable
+
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+from core.utils.cache import get_cached, get_or_set_cached
+from core.utils.exceptions import PreconditionFailed
+
+# Version columns an ETag is built from: a new version changes `id`, a close changes `valid_to`
+ETAG_FIELDS = ("id", "hash_diff", "valid_to")
+
+
+def make_etag(*row_groups: Iterable[tuple]) -> str:
+    """
+    Strong ETag over groups of `(id, hash_diff, valid_to)` rows, e.g. entity versions and detail versions.
+    """
+    digest = hashlib.sha256()
+    for rows in row_groups:
+        for row in rows:
+            digest.update("|".join("" if value is None else str(value) for value in row).encode("utf-8"))
+            digest.update(b"\n")
+        digest.update(b"#")
+    return f'"{digest.hexdigest()[:40]}"'
+
+
+def get_objects_etag(*object_groups: Iterable) -> str:
+    return make_etag(*(
+        [tuple(getattr(obj, field) for field in ETAG_FIELDS) for obj in objects]
+        for objects in object_groups
+    ))
+
+
+def get_queryset_etag(*querysets: QuerySet) -> str | None:
+    """
+    ETag of the versions matched by `querysets`, read with narrow `values_list` queries.
+    Returns None when the first queryset is empty (nothing to validate against).
+    """
+    row_groups = [list(queryset.order_by("-valid_from", "-id").values_list(*ETAG_FIELDS)) for queryset in querysets]
+    if not row_groups or not row_groups[0]:
+        return None
+    return make_etag(*row_groups)
+
+
+def get_not_modified_response(request, etag: str):
+    """
+    304 response carrying `etag` when it matches the request's If-None-Match, otherwise None.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response["ETag"] = etag
+    return response
+
+
+def check_if_match(request, get_etag: Callable[[], str | None]) -> None:
+    """
+    Enforce an If-Match precondition against the current ETag (strong comparison).
+    Call it inside the write transaction so the check and the write see the same versions.
+
+    Raises:
+        PreconditionFailed: If-Match is present and does not match the current ETag.
+    """
+    header = request.headers.get("If-Match")
+    if not header:
+        return
+
+    etag = get_etag()
+    if etag is None:
+        raise PreconditionFailed()
+
+    etags = parse_etags(header)
+    if "*" not in etags and etag not in etags:
+        raise PreconditionFailed()
+
+
+def conditional_cached_response(
+        request,
+        namespace: str,
+        key,
+        name: str,
+        build: Callable[[], tuple[str, Any]],
+        get_etag: Callable[[], str | None],
+        raw: bool = False,
+):
+    """
+    Answer a read endpoint from the versioned cache with ETag / If-None-Match support.
+
+    Args:
+        build: returns `(etag, data)`; the pair is cached together.
+        get_etag: cheap ETag check used on cache misses when the client sent If-None-Match.
+        raw: `data` is a rendered JSON body (e.g. built by Postgres), sent as is.
+
+    Returns:
+        304 when the client's ETag is current, otherwise the (cached) data with its ETag.
+    """
+    cached = get_cached(namespace, key, name)
+    if cached is None and request.headers.get("If-None-Match"):
+        etag = get_etag()
+        if etag is not None:
+            not_modified = get_not_modified_response(request, etag)
+            if not_modified is not None:
+                return not_modified
+
+    etag, data = cached or get_or_set_cached(namespace, key, name, build)
+
+    not_modified = get_not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    if raw:
+        return HttpResponse(data, content_type="application/json", headers={"ETag": etag})
+    return Response(data, headers={"ETag": etag})
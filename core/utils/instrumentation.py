@@ -0,0 +1,90 @@
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+DEFAULT_QUERY_INSTRUMENTATION = {
+    "ENABLED": True,
+    # Add a Server-Timing header to responses
+    "SERVER_TIMING": True,
+    # Emit one structured log line per request
+    "LOG": True,
+    # Slowest statement is truncated to this many characters in the log
+    "MAX_SQL_LENGTH": 500,
+}
+
+_current_recorder: ContextVar["QueryRecorder | None"] = ContextVar("query_recorder", default=None)
+
+
+def get_instrumentation_settings() -> dict:
+    return {**DEFAULT_QUERY_INSTRUMENTATION, **getattr(settings, "QUERY_INSTRUMENTATION", {})}
+
+
+class QueryRecorder:
+    """
+    Collects the database statements of one request: count, total time and the slowest statement.
+
+    Activated per request (a context variable, so it follows the request into `sync_to_async` threads);
+    Django connections report to it through `record_query`, queries executed outside of them
+    (e.g. on the async pool) are added with `record()`.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add(sql, time.perf_counter() - start)
+
+    def add(self, sql: str, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        if duration >= self.slowest:
+            self.slowest = duration
+            self.slowest_sql = sql
+
+    def activate(self):
+        return _current_recorder.set(self)
+
+    @staticmethod
+    def deactivate(token) -> None:
+        _current_recorder.reset(token)
+
+
+def get_current_recorder() -> QueryRecorder | None:
+    return _current_recorder.get()
+
+
+def record(sql: str, duration: float) -> None:
+    """
+    Add a statement executed outside Django's connections to the current request's recorder, if any.
+    """
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.add(sql, duration)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    `execute_wrapper` of every Django connection (`install_query_recorder`): times the statement into
+    the recorder of the current request, if any.
+    """
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    """
+    Add `record_query` to a connection's wrappers once. Also a `connection_created` receiver, which
+    covers the connections of threads the middleware never runs in (sync views under ASGI).
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,128 @@
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+from rest_framework.response import Response
+
+from core.utils.async_db import afetch_instances
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination over a unique, indexed ordering.
+
+    Pages are fetched with `WHERE id > <cursor> ORDER BY id LIMIT n`, so page N costs
+    the same as page 1. The response body stays a plain list; navigation is exposed
+    through the `Link` header (rel="next" / rel="prev").
+
+    Query params:
+        - cursor: opaque cursor from the `Link` header.
+        - limit: page size (capped by `max_page_size`).
+    """
+    ordering = "id"
+    page_size = 100
+    page_size_query_param = "limit"
+    max_page_size = 1000
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Ordered, filtered and sliced queryset of the requested page plus one look-ahead row,
+        or None when pagination is disabled. Same cursor logic as `CursorPagination.paginate_queryset`.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            order = self.ordering[0]
+            is_reversed = order.startswith("-")
+            order_attr = order.lstrip("-")
+
+            if self.cursor.reverse != is_reversed:
+                queryset = queryset.filter(**{f"{order_attr}__lt": current_position})
+            else:
+                queryset = queryset.filter(**{f"{order_attr}__gt": current_position})
+
+        return queryset[offset:offset + self.page_size + 1]
+
+    def set_page(self, results: list) -> list:
+        """
+        Cut the fetched rows down to the page and set the next / previous positions.
+        """
+        offset, reverse, current_position = self.cursor or (0, False, None)
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        `paginate_queryset` for async views; the page is fetched on the async connection pool.
+        """
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page(await afetch_instances(page_queryset))
+
+    def get_links(self) -> dict[str, str]:
+        links = {}
+        next_link = self.get_next_link()
+        previous_link = self.get_previous_link()
+        if next_link:
+            links["next"] = next_link
+        if previous_link:
+            links["prev"] = previous_link
+        return links
+
+    def get_headers(self) -> dict[str, str]:
+        links = self.get_links()
+        headers = {}
+        if links:
+            headers["Link"] = ", ".join(f'<{url}>; rel="{rel}"' for rel, url in links.items())
+        return headers
+
+    def get_paginated_response(self, data):
+        return Response(data, headers=self.get_headers())
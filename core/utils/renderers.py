@@ -0,0 +1,26 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` on orjson, for the default compact UTF-8 output (`COMPACT_JSON`, `UNICODE_JSON`).
+
+    datetimes and uuids are written by orjson in DRF's formats (ISO 8601, UTC as `Z`); other types
+    (decimals, lazy strings, ...) go through DRF's `JSONEncoder.default`. Indented output
+    (browsable API, `Accept: application/json; indent=4`) falls back to `JSONRenderer`.
+    Unlike `JSONRenderer`, U+2028 / U+2029 are not escaped (valid JSON either way).
+    """
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return orjson.dumps(data, default=self.encoder.default, option=self.options)
@@ -0,0 +1,71 @@
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+import orjson
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+from core.utils.renderers import ORJSONRenderer
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def iter_row_records(queryset: QuerySet, row_serializer, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Iterate a queryset through a server-side cursor, one `values_list()` row per record, mapped by
+    a `core.utils.rows.RowSerializer`. Rows are fetched `chunk_size` at a time and no model instances
+    or serializers are built, so memory stays flat regardless of size.
+
+    Yields:
+        dict: `{key: <serialized row>}`
+    """
+    for data in row_serializer.iter_values(queryset, chunk_size=chunk_size):
+        yield {key: data}
+
+
+async def aiter_row_records(
+        queryset: QuerySet,
+        row_serializer,
+        key: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[dict]:
+    """
+    `iter_row_records` through a server-side cursor on the async pool (`core.utils.async_db`).
+    """
+    async for data in row_serializer.aiter_values(queryset, chunk_size=chunk_size):
+        yield {key: data}
+
+
+def iter_ndjson(records: Iterable[dict]) -> Iterator[bytes]:
+    default = ORJSONRenderer.encoder.default
+    options = ORJSONRenderer.options | orjson.OPT_APPEND_NEWLINE
+    for record in records:
+        yield orjson.dumps(record, default=default, option=options)
+
+
+def ndjson_response(*sources: Iterable[dict]) -> StreamingHttpResponse:
+    """
+    Stream records from one or more sources as newline-delimited JSON.
+    """
+    def records():
+        for source in sources:
+            yield from source
+
+    return StreamingHttpResponse(iter_ndjson(records()), content_type=NDJSON_CONTENT_TYPE)
+
+
+def andjson_response(*sources: AsyncIterable[dict]) -> StreamingHttpResponse:
+    """
+    `ndjson_response` over async sources: the response content is an async iterator, so ASGI servers
+    send every line as it is produced instead of buffering a sync iterator in a thread.
+    """
+    default = ORJSONRenderer.encoder.default
+    options = ORJSONRenderer.options | orjson.OPT_APPEND_NEWLINE
+
+    async def lines():
+        for source in sources:
+            async for record in source:
+                yield orjson.dumps(record, default=default, option=options)
+
+    return StreamingHttpResponse(lines(), content_type=NDJSON_CONTENT_TYPE)
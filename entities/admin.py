@@ -40,3 +40,17 @@ class EntityDetailAdmin(SCD2ModelAdmin):
     search_fields = ("detail_code", "entity_uuid")
     ordering = ("detail_code",)
     readonly_fields = ("detail_code", "valid_from", "valid_to", "is_current", "hash_diff")
+
+
+@admin.register(models.EntityChangeLog)
+class EntityChangeLogAdmin(BaseModelAdmin):
+    list_display = ("changed_at", "model_name", "natural_key", "field", "old_value", "new_value")
+    list_filter = ("model_name", "field")
+    search_fields = ("natural_key",)
+    ordering = ("-changed_at",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
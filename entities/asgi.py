@@ -0,0 +1,13 @@
+"""
+ASGI entry point of the entities service (async read endpoints).
+
+    uvicorn entities.asgi:application --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "entities.config.settings_asgi")
+
+application = get_asgi_application()
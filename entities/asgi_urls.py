@@ -0,0 +1,9 @@
+from django.urls import path, include
+
+from entities.urls import urlpatterns as sync_urlpatterns
+
+# Async entity endpoints first; auth and docs routes are served by the sync views
+urlpatterns = [
+    path("api/v1/", include("entities.v1.async_urls")),
+    *sync_urlpatterns,
+]
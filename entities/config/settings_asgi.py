@@ -0,0 +1,16 @@
+from entities.config.settings import *
+from core import production
+
+# ASGI profile: entity reads are served by the async views (entities.v1.async_views)
+ROOT_URLCONF = "entities.asgi_urls"
+
+# psycopg AsyncConnectionPool used by the async views, per worker process
+ASYNC_DB_POOL = {
+    "min_size": int(os.environ.get("ASYNC_DB_POOL_MIN_SIZE", 2)),
+    "max_size": int(os.environ.get("ASYNC_DB_POOL_MAX_SIZE", 20)),
+    "timeout": float(os.environ.get("ASYNC_DB_POOL_TIMEOUT", 30)),
+}
+
+# Served by several uvicorn workers (docker-compose): the read cache needs a backend shared by all of them
+CACHES = production.get_caches(CACHES)
+SCD2_CACHE = production.get_scd2_cache(CACHES)
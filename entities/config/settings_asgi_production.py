@@ -0,0 +1,2 @@
+from entities.config.settings_production import *
+from entities.config.settings_asgi import ROOT_URLCONF, ASYNC_DB_POOL
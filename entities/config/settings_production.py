@@ -0,0 +1,18 @@
+from entities.config.settings import *
+from core import production
+
+# Production profile: pooled database connections, served by gunicorn (core/gunicorn.conf.py)
+DEBUG = False
+SECRET_KEY = production.get_secret_key()
+ALLOWED_HOSTS = production.get_allowed_hosts()
+QUERY_INSTRUMENTATION = production.QUERY_INSTRUMENTATION
+
+# Metrics of all workers and of the management commands, aggregated by the token-protected /metrics
+production.prepare_metrics_dir()
+METRICS = production.get_metrics()
+
+DATABASES = production.configure(DATABASES)
+
+# Several worker processes: the read cache needs a backend shared by all of them (SCD2_CACHE_LOCATION)
+CACHES = production.get_caches(CACHES)
+SCD2_CACHE = production.get_scd2_cache(CACHES)
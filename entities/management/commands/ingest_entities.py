@@ -0,0 +1,112 @@
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from entities.ingestion import FORMATS, IngestionError, apply_chunk, get_entity_types, get_format, read_rows
+
+COUNTERS = ("rows", "inserted", "closed", "skipped", "rejected")
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream Entity / EntityDetail versions from a JSONL or CSV file and apply them "
+        "as SCD2 transitions in chunks. Columns: uuid, entity_type_code, display_name, "
+        "detail_code, value. uuid (and detail_code with a value) are required, so re-running a file is a no-op; "
+        "invalid rows (including malformed JSON lines) are counted as rejected. "
+        "Progress is checkpointed after every chunk, so an interrupted run resumes where it stopped. "
+        "With the production settings, ingest_* metrics are written to the services' PROMETHEUS_MULTIPROC_DIR."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="Path to a .jsonl or .csv file.")
+        parser.add_argument("--format", choices=FORMATS, help="Input format (default: from file extension).")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per transaction (default: 5000).")
+        parser.add_argument(
+            "--checkpoint",
+            help="Checkpoint file (default: <file>.checkpoint.json). Removed after a successful run.",
+        )
+        parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint.")
+
+    def handle(self, *args, **options):
+        path = os.path.abspath(options["file"])
+        chunk_size = options["chunk_size"]
+        checkpoint_path = options["checkpoint"] or f"{path}.checkpoint.json"
+
+        if not os.path.isfile(path):
+            raise CommandError(f"File not found: {path}")
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        try:
+            fmt = get_format(path, options["format"])
+        except IngestionError as error:
+            raise CommandError(str(error))
+
+        state = self._load_checkpoint(checkpoint_path, path, restart=options["restart"])
+        if state["offset"]:
+            self.stdout.write(f"Resuming after {state['rows']} rows (chunk {state['chunks']}).")
+
+        # EntityType is a small lookup table: resolve codes once per run
+        entity_types = get_entity_types()
+
+        rows = read_rows(path, fmt, offset=state["offset"])
+        started = time.monotonic()
+        processed = 0
+
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            entity_result, detail_result, rejected = apply_chunk([row for row, _ in chunk], entity_types)
+
+            state["offset"] = chunk[-1][1]
+            state["chunks"] += 1
+            state["rows"] += len(chunk)
+            state["inserted"] += entity_result.inserted + detail_result.inserted
+            state["closed"] += entity_result.closed + detail_result.closed
+            state["skipped"] += entity_result.skipped + detail_result.skipped
+            state["rejected"] += rejected
+            self._save_checkpoint(checkpoint_path, state)
+
+            processed += len(chunk)
+            self.stdout.write(f"chunk {state['chunks']}: {self._format_stats(state, processed, started)}")
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {self._format_stats(state, processed, started)}"))
+
+    @staticmethod
+    def _format_stats(state: dict, processed: int, started: float) -> str:
+        elapsed = max(time.monotonic() - started, 1e-9)
+        counters = " ".join(f"{name}={state[name]}" for name in COUNTERS)
+        return f"{counters} rows/sec={processed / elapsed:.0f}"
+
+    @staticmethod
+    def _load_checkpoint(checkpoint_path: str, path: str, restart: bool = False) -> dict:
+        state = {"path": path, "offset": 0, "chunks": 0, **{name: 0 for name in COUNTERS}}
+        if restart or not os.path.exists(checkpoint_path):
+            return state
+
+        with open(checkpoint_path) as fh:
+            saved = json.load(fh)
+
+        if saved.get("path") != path:
+            raise CommandError(f"Checkpoint {checkpoint_path} belongs to {saved.get('path')}. Use --restart.")
+        if saved.get("offset", 0) > os.path.getsize(path):
+            raise CommandError(f"Checkpoint {checkpoint_path} is past the end of the file. Use --restart.")
+
+        state.update(saved)
+        return state
+
+    @staticmethod
+    def _save_checkpoint(checkpoint_path: str, state: dict) -> None:
+        # Write-then-rename, so an interrupted write never leaves a broken checkpoint
+        tmp_path = f"{checkpoint_path}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(state, fh)
+        os.replace(tmp_path, checkpoint_path)
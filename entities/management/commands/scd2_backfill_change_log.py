@@ -0,0 +1,40 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models.scd2.changes import DEFAULT_BACKFILL_BATCH_SIZE, backfill_change_log
+from core.models.scd2.models import SCD2BaseModel
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the change log records of the transitions that have none (e.g. versions saved before "
+        "change_log_model was configured), for every SCD2 model with a change log. The diff endpoint reads "
+        "the change log, so run this once after configuring it. Logged transitions are skipped; safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", action="append", help="Limit to app_label.ModelName (repeatable).")
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BACKFILL_BATCH_SIZE,
+            help=f"Transitions per insert (default: {DEFAULT_BACKFILL_BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        for model in self._get_models(options["model"]):
+            written = backfill_change_log(model, batch_size=options["batch_size"])
+            self.stdout.write(f"{model._meta.label}: {written} change records written")
+
+    @staticmethod
+    def _get_models(labels: list[str] = None) -> list[type[SCD2BaseModel]]:
+        if labels:
+            try:
+                models = [apps.get_model(label) for label in labels]
+            except (LookupError, ValueError) as error:
+                raise CommandError(str(error))
+        else:
+            models = [model for model in apps.get_models() if issubclass(model, SCD2BaseModel)]
+
+        return [model for model in models if getattr(model.scd2_config, "change_log_model", None)]
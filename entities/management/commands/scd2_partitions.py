@@ -0,0 +1,105 @@
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+from django.utils import timezone
+
+from core.models.scd2.models import SCD2BaseModel
+from core.models.scd2.partitions import (
+    DEFAULT_LOCK_TIMEOUT,
+    archive_partition,
+    ensure_partitions,
+    get_partitions,
+    is_partitioned,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Maintain the history partitions of every SCD2 model with a partition_interval configured: "
+        "create the partitions up to --ahead intervals in advance and move closed versions left in the "
+        "default partition into them. With --archive-before, partitions ending at or before that date are "
+        "exported to <archive-dir>/<partition>.csv.gz, detached and dropped. Safe to run from cron: a partition "
+        "whose locks are not granted within --lock-timeout is skipped until the next run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", action="append", help="Limit to app_label.ModelName (repeatable).")
+        parser.add_argument(
+            "--ahead", type=int, default=2, help="Intervals to create after the current one (default: 2).",
+        )
+        parser.add_argument("--archive-before", help="Archive partitions ending at or before this ISO date.")
+        parser.add_argument("--archive-dir", help="Directory of the archive files (required with --archive-before).")
+        parser.add_argument("--dry-run", action="store_true", help="List the partitions to archive, change nothing.")
+        parser.add_argument(
+            "--lock-timeout", default=DEFAULT_LOCK_TIMEOUT,
+            help=f"Postgres lock_timeout of each partition attach / detach (default: {DEFAULT_LOCK_TIMEOUT}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["ahead"] < 0:
+            raise CommandError("--ahead must not be negative.")
+
+        archive_before = None
+        if options["archive_before"]:
+            try:
+                archive_before = datetime.fromisoformat(options["archive_before"])
+            except ValueError:
+                raise CommandError("--archive-before must be an ISO 8601 date or timestamp.")
+            if timezone.is_naive(archive_before):
+                archive_before = timezone.make_aware(archive_before, dt_timezone.utc)
+            if not options["archive_dir"]:
+                raise CommandError("--archive-dir is required with --archive-before.")
+            if not os.path.isdir(options["archive_dir"]):
+                raise CommandError(f"Directory not found: {options['archive_dir']}")
+
+        lock_timeout = options["lock_timeout"]
+        failed = []
+        for model in self._get_models(options["model"]):
+            label = model._meta.label
+            if not is_partitioned(model):
+                raise CommandError(f"{label} is not partitioned; apply its PartitionSCD2History migration first.")
+
+            if not options["dry_run"]:
+                try:
+                    for name, moved in ensure_partitions(
+                        model, timezone.now(), ahead=options["ahead"], lock_timeout=lock_timeout
+                    ):
+                        self.stdout.write(f"{label}: created {name} ({moved} rows moved)")
+                except OperationalError as error:
+                    failed.append(label)
+                    self.stderr.write(f"{label}: partitions not created: {error}")
+                    continue
+
+            if archive_before is None:
+                continue
+            for partition in get_partitions(model):
+                if partition.end is None or partition.end > archive_before:
+                    continue
+                if options["dry_run"]:
+                    self.stdout.write(f"{label}: would archive {partition.name}")
+                    continue
+                try:
+                    path, rows = archive_partition(model, partition, options["archive_dir"], lock_timeout=lock_timeout)
+                except OperationalError as error:
+                    failed.append(label)
+                    self.stderr.write(f"{label}: {partition.name} not archived: {error}")
+                    continue
+                self.stdout.write(f"{label}: archived {partition.name} to {path} ({rows} rows)")
+
+        if failed:
+            raise CommandError(f"Partition maintenance incomplete for {', '.join(sorted(set(failed)))}; run again.")
+
+    @staticmethod
+    def _get_models(labels: list[str] = None) -> list[type[SCD2BaseModel]]:
+        if labels:
+            try:
+                models = [apps.get_model(label) for label in labels]
+            except (LookupError, ValueError) as error:
+                raise CommandError(str(error))
+        else:
+            models = [model for model in apps.get_models() if issubclass(model, SCD2BaseModel)]
+
+        return [model for model in models if getattr(model.scd2_config, "partition_interval", None)]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entities', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntityChangeLog',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('model_name', models.CharField(max_length=100)),
+                (
+                    'natural_key',
+                    models.CharField(
+                        help_text="Natural key values joined with '|'.", max_length=255
+                    ),
+                ),
+                ('field', models.CharField(max_length=100)),
+                ('old_value', models.TextField(blank=True, null=True)),
+                ('new_value', models.TextField(blank=True, null=True)),
+                ('changed_at', models.DateTimeField()),
+                (
+                    'changed_mask',
+                    models.BigIntegerField(
+                        help_text='Bitmask of changed fields, bit N = scd2_config.detection_fields[N].'
+                    ),
+                ),
+                (
+                    'version_id',
+                    models.BigIntegerField(help_text='Primary key of the new version.'),
+                ),
+                (
+                    'previous_version_id',
+                    models.BigIntegerField(
+                        help_text='Primary key of the closed version.'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Entity Change Log',
+                'verbose_name_plural': 'Entity Change Log',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='entitychangelog',
+            index=models.Index(fields=['changed_at'], name='idx_chlog_time_entity'),
+        ),
+        migrations.AddIndex(
+            model_name='entitychangelog',
+            index=models.Index(
+                fields=['model_name', 'natural_key', 'changed_at'],
+                name='idx_chlog_key_entity',
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entities', '0003_entitychangelog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntityDetailSnapshot',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('taken_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Entity Detail Snapshot',
+                'verbose_name_plural': 'Entity Detail Snapshots',
+            },
+        ),
+        migrations.CreateModel(
+            name='EntitySnapshot',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('taken_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Entity Snapshot',
+                'verbose_name_plural': 'Entity Snapshots',
+            },
+        ),
+        migrations.AddField(
+            model_name='entitydetailsnapshot',
+            name='version',
+            field=models.ForeignKey(
+                db_constraint=False,
+                db_index=False,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name='+',
+                to='entities.entitydetail',
+            ),
+        ),
+        migrations.AddField(
+            model_name='entitysnapshot',
+            name='version',
+            field=models.ForeignKey(
+                db_constraint=False,
+                db_index=False,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name='+',
+                to='entities.entity',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='entitydetailsnapshot',
+            index=models.Index(
+                fields=['taken_at', 'version'], name='idx_snap_entity_detail'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='entitysnapshot',
+            index=models.Index(fields=['taken_at', 'version'], name='idx_snap_entity'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:43
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entities', '0004_entity_snapshots'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='entity',
+            name='exclude_overlapping_entity',
+        ),
+        migrations.RemoveConstraint(
+            model_name='entitydetail',
+            name='exclude_overlapping_entity_detail',
+        ),
+        migrations.AddField(
+            model_name='entity',
+            name='validity',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Func(
+                    models.F('valid_from'),
+                    models.F('valid_to'),
+                    function='TSTZRANGE',
+                    template="TSTZRANGE(%(expressions)s, '[)')",
+                ),
+                output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name='entitydetail',
+            name='validity',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Func(
+                    models.F('valid_from'),
+                    models.F('valid_to'),
+                    function='TSTZRANGE',
+                    template="TSTZRANGE(%(expressions)s, '[)')",
+                ),
+                output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='entity',
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=['validity'], name='idx_valid_gist_entity'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='entitydetail',
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=['validity'], name='idx_valid_gist_entity_detail'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='entity',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[(models.F('uuid'), '='), (models.F('validity'), '&&')],
+                name='exclude_overlapping_entity',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='entitydetail',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    (models.F('entity_uuid'), '='),
+                    (models.F('detail_code'), '='),
+                    (models.F('validity'), '&&'),
+                ],
+                name='exclude_overlapping_entity_detail',
+            ),
+        ),
+    ]
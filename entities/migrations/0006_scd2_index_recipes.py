@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:47
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entities', '0005_validity_range'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entity',
+            index=models.Index(
+                condition=models.Q(('is_current', True)),
+                fields=['id'],
+                include=('uuid', 'display_name', 'entity_type'),
+                name='idx_cur_entity',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='entity',
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=['valid_from', 'valid_to'], name='idx_brin_entity'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='entitydetail',
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=['valid_from', 'valid_to'], name='idx_brin_entity_detail'
+            ),
+        ),
+    ]
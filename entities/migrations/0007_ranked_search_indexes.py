@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:33
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entities', '0006_scd2_index_recipes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entity',
+            index=django.contrib.postgres.indexes.GistIndex(
+                condition=models.Q(('is_current', True)),
+                fields=['display_name'],
+                name='idx_cur_trgm_entity',
+                opclasses=['gist_trgm_ops'],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='entitydetail',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector('value', config='simple'),
+                condition=models.Q(('is_current', True)),
+                name='idx_cur_fts_entity_detail',
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:40
+
+from django.db import migrations
+
+import core.models.scd2.partitions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entities', '0007_ranked_search_indexes'),
+    ]
+
+    operations = [
+        core.models.scd2.partitions.PartitionSCD2History('entity'),
+        core.models.scd2.partitions.PartitionSCD2History('entitydetail'),
+    ]
@@ -7,8 +7,11 @@ from django.db.models import UniqueConstraint, Q, Index, UUIDField
 from core.models.base import BaseModel
 from core.models.hashdiff.models import HashDiffMixin
 from core.models.mixins import TimeStampMixin
+from core.models.scd2.changelog import SCD2ChangeLogBase, get_change_log_indexes
 from core.models.scd2.constraints import get_scd2_constraint_list
+from core.models.scd2.indexes import get_scd2_index_list
 from core.models.scd2.models import SCD2BaseModel
+from core.models.scd2.snapshots import SCD2SnapshotBase, get_snapshot_indexes
 from core.models.uuid import get_uuid_index
 from entities.models_config import EntityConfig, EntityDetailConfig
 
@@ -52,7 +55,8 @@ class Entity(TimeStampMixin, HashDiffMixin, SCD2BaseModel):
         verbose_name_plural = "Entities"
         indexes = [
             get_uuid_index("entity"),
-            GinIndex(fields=['display_name'], name='entity_display_name_gin', opclasses=['gin_trgm_ops'])
+            GinIndex(fields=['display_name'], name='entity_display_name_gin', opclasses=['gin_trgm_ops']),
+            *get_scd2_index_list(EntityConfig.scd2.model_name, EntityConfig.scd2.indexes),
         ]
         constraints = [
             *get_scd2_constraint_list(
@@ -87,6 +91,7 @@ class EntityDetail(TimeStampMixin, HashDiffMixin, SCD2BaseModel):
         indexes = [
             get_uuid_index("entity_detail", fields=["detail_code", "entity_uuid"]),
             Index(fields=['detail_code']),
+            *get_scd2_index_list(EntityDetailConfig.scd2.model_name, EntityDetailConfig.scd2.indexes),
         ]
         constraints = [
             *get_scd2_constraint_list(
@@ -94,3 +99,51 @@ class EntityDetail(TimeStampMixin, HashDiffMixin, SCD2BaseModel):
                 EntityDetailConfig.scd2.natural_key_fields
             ),
         ]
+
+
+class EntityChangeLog(SCD2ChangeLogBase):
+    """
+    Append-only change log of Entity and EntityDetail transitions.
+    Written by SCD2BaseModel in the same transaction as the versions themselves.
+    """
+
+    class Meta:
+        verbose_name = "Entity Change Log"
+        verbose_name_plural = "Entity Change Log"
+        indexes = [
+            *get_change_log_indexes("entity"),
+        ]
+
+
+class EntitySnapshot(SCD2SnapshotBase):
+    """
+    As-of checkpoints of Entity: ids of the versions valid at `taken_at`.
+    """
+    # Keys
+    version = models.ForeignKey(
+        Entity, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name="+"
+    )
+
+    class Meta:
+        verbose_name = "Entity Snapshot"
+        verbose_name_plural = "Entity Snapshots"
+        indexes = [
+            *get_snapshot_indexes("entity"),
+        ]
+
+
+class EntityDetailSnapshot(SCD2SnapshotBase):
+    """
+    As-of checkpoints of EntityDetail: ids of the versions valid at `taken_at`.
+    """
+    # Keys
+    version = models.ForeignKey(
+        EntityDetail, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name="+"
+    )
+
+    class Meta:
+        verbose_name = "Entity Detail Snapshot"
+        verbose_name_plural = "Entity Detail Snapshots"
+        indexes = [
+            *get_snapshot_indexes("entity_detail"),
+        ]
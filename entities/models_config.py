@@ -1,4 +1,5 @@
 from core.models.hashdiff.models import HashDiffConfig
+from core.models.scd2.indexes import CurrentIndex, CurrentSearchIndex, CurrentTrigramIndex, HistoryBrinIndex
 from core.models.scd2.models import SCD2ModelConfig
 
 
@@ -7,6 +8,20 @@ class EntityConfig:
         model_name="entity",
         detection_fields=["display_name"],
         natural_key_fields=["uuid"],
+        change_log_model="entities.EntityChangeLog",
+        snapshot_model="entities.EntitySnapshot",
+        snapshot_interval="daily",
+        cache_namespace="entity",
+        cache_key_field="uuid",
+        transition_mode="cte",
+        partition_interval="monthly",
+        indexes=[
+            # Keyset-paginated list of current entities
+            CurrentIndex(["id"], include=["uuid", "display_name", "entity_type"]),
+            # Ranked name search (`%` / `<->`)
+            CurrentTrigramIndex(["display_name"]),
+            HistoryBrinIndex(),
+        ],
     )
     hash_diff = HashDiffConfig(
         fields=["display_name", "is_current"]
@@ -17,7 +32,20 @@ class EntityDetailConfig:
     scd2 = SCD2ModelConfig(
         model_name="entity_detail",
         detection_fields=["value"],
-        natural_key_fields=["entity_uuid", "detail_code"]
+        natural_key_fields=["entity_uuid", "detail_code"],
+        change_log_model="entities.EntityChangeLog",
+        snapshot_model="entities.EntityDetailSnapshot",
+        snapshot_interval="daily",
+        # Details are cached as part of their entity's snapshot and history
+        cache_namespace="entity",
+        cache_key_field="entity_uuid",
+        transition_mode="cte",
+        partition_interval="monthly",
+        indexes=[
+            # Ranked full-text search over current values
+            CurrentSearchIndex(["value"], config="simple"),
+            HistoryBrinIndex(),
+        ],
     )
     hash_diff = HashDiffConfig(
         fields=["value", "is_current"]
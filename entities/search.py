@@ -0,0 +1,104 @@
+"""
+Ranked entity search (`GET /api/v1/entities/?search=...&search_mode=ranked`).
+
+Two top-K candidate lists, each answered from a partial index over current rows:
+    - names: trigram similarity `display_name % term`, ordered by the distance `<->`
+      (KNN scan of `idx_cur_trgm_entity`, pg_trgm's `similarity_threshold` applies);
+    - detail values: full-text match `to_tsvector('simple', value) @@ websearch_to_tsquery('simple', term)`,
+      ordered by `ts_rank` (`idx_cur_fts_entity_detail`).
+
+The lists are merged with reciprocal rank fusion, so neither score scale dominates,
+and the best `limit` entities are returned.
+"""
+from uuid import UUID
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramDistance
+from django.db.models import Exists, OuterRef, QuerySet
+
+from core.models.scd2.indexes import get_search_vector
+from core.utils.async_db import afetch_instances, afetch_rows
+from entities.models import Entity, EntityDetail
+
+# Must match the `CurrentSearchIndex` recipe of EntityDetail
+SEARCH_CONFIG = "simple"
+SEARCH_FIELDS = ["value"]
+
+DEFAULT_RANKED_LIMIT = 20
+MAX_RANKED_LIMIT = 100
+
+# Reciprocal rank fusion constant: score = sum(1 / (RRF_K + rank))
+RRF_K = 60
+
+
+def get_name_matches(entities: QuerySet, term: str, limit: int) -> QuerySet:
+    """
+    Top `limit` entities of `entities` by trigram similarity of `display_name`.
+    """
+    return (
+        entities
+        .filter(display_name__trigram_similar=term)
+        .order_by(TrigramDistance("display_name", term), "id")[:limit]
+    )
+
+
+def get_value_matches(entities: QuerySet, term: str, limit: int) -> QuerySet:
+    """
+    `entity_uuid` of the top `limit` current details matching `term` (websearch syntax),
+    restricted to `entities`.
+    """
+    vector = get_search_vector(SEARCH_FIELDS, SEARCH_CONFIG)
+    query = SearchQuery(term, config=SEARCH_CONFIG, search_type="websearch")
+    return (
+        EntityDetail.objects.current()
+        .annotate(search=vector)
+        .filter(search=query)
+        .filter(Exists(entities.filter(uuid=OuterRef("entity_uuid"))))
+        .order_by(SearchRank(vector, query).desc(), "id")
+        .values_list("entity_uuid", flat=True)[:limit]
+    )
+
+
+def rank_uuids(*rankings: list[UUID], limit: int) -> list[UUID]:
+    """
+    Merge ranked uuid lists by reciprocal rank fusion; duplicates within a list count once.
+    """
+    scores: dict[UUID, float] = {}
+    for ranking in rankings:
+        for rank, uuid in enumerate(dict.fromkeys(ranking), start=1):
+            scores[uuid] = scores.get(uuid, 0.0) + 1 / (RRF_K + rank)
+    return sorted(scores, key=lambda uuid: -scores[uuid])[:limit]
+
+
+def order_entities(entities: list[Entity], uuids: list[UUID]) -> list[Entity]:
+    by_uuid = {entity.uuid: entity for entity in entities}
+    return [by_uuid[uuid] for uuid in uuids if uuid in by_uuid]
+
+
+def search_entities(entities: QuerySet, term: str, limit: int = DEFAULT_RANKED_LIMIT) -> list[Entity]:
+    """
+    Best `limit` entities of `entities` (current versions) for `term`, best match first.
+    """
+    name_matches = list(get_name_matches(entities, term, limit))
+    value_matches = list(get_value_matches(entities, term, limit))
+    uuids = rank_uuids([entity.uuid for entity in name_matches], value_matches, limit=limit)
+
+    found = {entity.uuid for entity in name_matches}
+    missing = [uuid for uuid in uuids if uuid not in found]
+    if missing:
+        name_matches += list(entities.filter(uuid__in=missing))
+    return order_entities(name_matches, uuids)
+
+
+async def asearch_entities(entities: QuerySet, term: str, limit: int = DEFAULT_RANKED_LIMIT) -> list[Entity]:
+    """
+    `search_entities` on the async pool.
+    """
+    name_matches = await afetch_instances(get_name_matches(entities, term, limit))
+    _, rows = await afetch_rows(get_value_matches(entities, term, limit))
+    uuids = rank_uuids([entity.uuid for entity in name_matches], [row[0] for row in rows], limit=limit)
+
+    found = {entity.uuid for entity in name_matches}
+    missing = [uuid for uuid in uuids if uuid not in found]
+    if missing:
+        name_matches += await afetch_instances(entities.filter(uuid__in=missing))
+    return order_entities(name_matches, uuids)
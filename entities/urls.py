@@ -1,10 +1,12 @@
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from core.metrics import metrics_view
 
 urlpatterns = [
     path("api/auth/", include("auth.urls")),
-    path("api/v1/", include("entities.v1.urls"))
+    path("api/v1/", include("entities.v1.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 
@@ -0,0 +1,10 @@
+from django.urls import path
+from entities.v1 import async_views
+
+urlpatterns = [
+    path("entities/", async_views.AsyncEntitiesView.as_view(), name="entity"),
+    path("entities/<uuid:entity_uuid>", async_views.AsyncEntitySnapshotView.as_view(), name="entity-snapshot"),
+    path("entities/<uuid:entity_uuid>/history", async_views.AsyncEntityHistoryView.as_view(), name="entity-history"),
+    path("entities/entities-asof", async_views.AsyncEntityAsOfView.as_view(), name="entities-asof"),
+    path("entities/diff", async_views.AsyncEntityDiffView.as_view(), name="entities-diff")
+]
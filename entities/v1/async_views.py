@@ -0,0 +1,289 @@
+"""
+Async read endpoints of the entities API, served by the ASGI profile (`entities.config.settings_asgi`).
+
+Same URLs, parameters and response bodies as `entities.v1.views`. Reads run on the async psycopg pool
+(`core.utils.async_db`), authentication and role checks use the access token claims only, so a GET never
+touches Django's synchronous connection. Writes (POST / PATCH) are delegated to the sync DRF views.
+"""
+from datetime import datetime, timezone
+
+from asgiref.sync import sync_to_async
+from django.db.models import Exists, OuterRef
+from django.http import Http404, HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions as drf_exc
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from core.models.scd2.changelog import has_change_log
+from core.models.scd2.changes import (
+    fill_dict_with_log_changes,
+    fill_dict_with_row_changes,
+    get_log_changes_queryset,
+    get_window_changes_queryset,
+)
+from core.models.scd2.prefetch import aprefetch_versions
+from core.models.scd2.snapshots import get_checkpoint_queryset
+from core.utils.async_db import afetch_dicts, afetch_instances, afetch_value
+from core.utils.db_json import is_db_json_enabled
+from core.utils.etag import ETAG_FIELDS, get_not_modified_response, get_objects_etag, make_etag
+from core.utils.pagination import KeysetPagination
+from core.utils.renderers import ORJSONRenderer
+from core.utils.streaming import aiter_row_records, andjson_response
+from entities.models import Entity, EntityDetail, EntityType
+from entities.search import asearch_entities
+from entities.v1 import views
+from . import serializers as sz
+from .json_queries import get_history_query, get_snapshot_query
+
+
+class AsyncEntitiesAPIView(View):
+    """
+    Async counterpart of `EntitiesAPIView`: token authentication, role permission and
+    DRF-shaped error responses around async handlers.
+    """
+    authentication = JWTStatelessUserAuthentication()
+    permission_class = views.EntitiesAPIView.permission_classes[0]
+    renderer = ORJSONRenderer()
+
+    # Methods handled by the sync DRF view
+    sync_view = None
+    sync_methods: tuple[str, ...] = ()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token-authenticated API, like DRF's APIView
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        if method in self.sync_methods:
+            return await sync_to_async(self.sync_view.as_view())(request, *args, **kwargs)
+
+        handler = getattr(self, method, None)
+        if handler is None or method not in self.http_method_names:
+            return await self.http_method_not_allowed(request, *args, **kwargs)
+
+        try:
+            self.check_permissions(request)
+            return await handler(request, *args, **kwargs)
+        except (drf_exc.NotAuthenticated, drf_exc.AuthenticationFailed) as exc:
+            headers = {"WWW-Authenticate": self.authentication.authenticate_header(request)}
+            return self.render({"detail": exc.detail}, status=exc.status_code, headers=headers)
+        except drf_exc.APIException as exc:
+            return self.render({"detail": exc.detail}, status=exc.status_code)
+        except Http404:
+            return self.render({"detail": "No Entity matches the given query."}, status=404)
+
+    def check_permissions(self, request) -> None:
+        result = self.authentication.authenticate(request)
+        if result is None:
+            raise drf_exc.NotAuthenticated()
+
+        request.user, _ = result
+        if not self.permission_class().has_permission(request, self):
+            raise drf_exc.PermissionDenied()
+
+    def render(self, data, status: int = 200, headers: dict = None) -> HttpResponse:
+        return HttpResponse(
+            self.renderer.render(data),
+            status=status,
+            content_type="application/json",
+            headers=headers,
+        )
+
+    @staticmethod
+    def render_json(request, body: str, etag: str) -> HttpResponse:
+        """
+        A JSON body rendered by Postgres (`core.utils.db_json`), or 304 when `etag` is current.
+        """
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return HttpResponse(body, content_type="application/json", headers={"ETag": etag})
+
+
+def parse_date(request, param: str, error_key: str):
+    try:
+        return datetime.strptime(request.GET.get(param), "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise drf_exc.ValidationError({error_key: "Invalid date format. Use YYYY-MM-DD."})
+
+
+async def aget_current_entity(entity_uuid) -> Entity:
+    entities = await afetch_instances(Entity.objects.current().filter(uuid=entity_uuid))
+    if not entities:
+        raise Http404
+    return entities[0]
+
+
+class AsyncEntitiesView(AsyncEntitiesAPIView):
+    sync_view = views.EntitiesView
+    sync_methods = ("post",)
+
+    async def get(self, request):
+        search_term = request.GET.get("search")
+        type_code = request.GET.get("type")
+        detail_code = request.GET.get("detail_code")
+        search_mode = views.get_search_mode(request.GET)
+        includes = views.get_includes(request.GET)
+
+        entities = Entity.objects.current()
+
+        if search_term and search_mode == "contains":
+            entities = entities.filter(display_name__icontains=search_term)
+        if type_code:
+            entities = entities.filter(entity_type__code=type_code)
+
+        if detail_code:
+            entity_details = EntityDetail.objects.current().filter(detail_code=detail_code)
+            entities = (
+                entities
+                .annotate(has_detail=Exists(entity_details.filter(entity_uuid=OuterRef("uuid"))))
+                .filter(has_detail=True)
+            )
+
+        if search_term and search_mode == "ranked":
+            return await self.get_ranked(request, entities, search_term, includes)
+
+        paginator = KeysetPagination()
+        page = await paginator.apaginate_queryset(entities, Request(request), view=self)
+        etag = await self.get_page_etag(page, includes)
+
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        data = views.get_list_data(page, includes)
+        return self.render(data, headers={**paginator.get_headers(), "ETag": etag})
+
+    @staticmethod
+    async def get_page_etag(page: list[Entity], includes: set[str]) -> str:
+        if "details" not in includes:
+            return get_objects_etag(page)
+        details = await aprefetch_versions(page, EntityDetail.objects.current(), "entity_uuid", "current_details")
+        return get_objects_etag(page, details)
+
+    async def get_ranked(self, request, entities, search_term, includes) -> HttpResponse:
+        ranked = await asearch_entities(entities, search_term, views.get_ranked_limit(request.GET))
+        etag = await self.get_page_etag(ranked, includes)
+
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        data = views.get_list_data(ranked, includes)
+        return self.render(data, headers={"ETag": etag})
+
+
+class AsyncEntitySnapshotView(AsyncEntitiesAPIView):
+    sync_view = views.EntitySnapshotView
+    sync_methods = ("patch",)
+
+    async def get(self, request, entity_uuid):
+        if is_db_json_enabled():
+            body, etag_rows = await get_snapshot_query(entity_uuid).afetch()
+            if body is None:
+                raise Http404
+            return self.render_json(request, body, make_etag(etag_rows["entity"], etag_rows["detail"]))
+
+        entity = await aget_current_entity(entity_uuid)
+        details = await afetch_instances(
+            EntityDetail.objects.current().filter(entity_uuid=entity_uuid).order_by("-valid_from", "-id")
+        )
+
+        etag = get_objects_etag([entity], details)
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        entity_types = await afetch_instances(EntityType.objects.filter(pk=entity.entity_type_id))
+        entity.entity_type = entity_types[0]
+
+        details.sort(key=lambda detail: detail.id)
+        data = sz.EntitySnapshotSerializer(entity).data
+        data["detail"] = sz.EntityDetailSerializer(details[0]).data if details else None
+        data["details"] = sz.EntityDetailSerializer(details, many=True).data
+        return self.render(data, headers={"ETag": etag})
+
+
+class AsyncEntityHistoryView(AsyncEntitiesAPIView):
+    async def get(self, request, entity_uuid):
+        if is_db_json_enabled():
+            body, etag_rows = await get_history_query(entity_uuid).afetch()
+            if not any(valid_to is None for _, _, valid_to in etag_rows["entity"]):
+                raise Http404
+            return self.render_json(request, body, make_etag(etag_rows["entity"], etag_rows["detail"]))
+
+        entity_history, entity_etag_rows = await sz.entity_history_rows.avalues_with(
+            Entity.objects.filter(uuid=entity_uuid).order_by("-valid_from", "-id"), ETAG_FIELDS
+        )
+        if not any(valid_to is None for _, _, valid_to in entity_etag_rows):
+            raise Http404
+        entity_detail_history, detail_etag_rows = await sz.entity_detail_history_rows.avalues_with(
+            EntityDetail.objects.filter(entity_uuid=entity_uuid).order_by("-valid_from", "-id"), ETAG_FIELDS
+        )
+
+        etag = make_etag(entity_etag_rows, detail_etag_rows)
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        return self.render(
+            {
+                "entity_history": entity_history,
+                "entity_detail_history": entity_detail_history,
+            },
+            headers={"ETag": etag},
+        )
+
+
+class AsyncEntityAsOfView(AsyncEntitiesAPIView):
+    """
+    As-of snapshot; `stream=true` streams NDJSON from server-side cursors on the async pool.
+    """
+    async def get(self, request):
+        as_of_date = parse_date(request, "as_of", "as_of")
+        as_of_datetime = datetime.combine(as_of_date, datetime.min.time(), tzinfo=timezone.utc)
+
+        querysets = []
+        for model in (Entity, EntityDetail):
+            checkpoint_queryset = get_checkpoint_queryset(model, as_of_datetime)
+            checkpoint = await afetch_value(checkpoint_queryset) if checkpoint_queryset is not None else None
+            querysets.append(model.objects.as_of(as_of_datetime, checkpoint=checkpoint).order_by("id"))
+
+        if request.GET.get("stream", "").lower() in ("1", "true", "ndjson"):
+            return andjson_response(
+                aiter_row_records(querysets[0], sz.entity_history_rows, "entity"),
+                aiter_row_records(querysets[1], sz.entity_detail_history_rows, "entity_detail"),
+            )
+
+        return self.render({
+            "entities": await sz.entity_history_rows.avalues(querysets[0]),
+            "entity_details": await sz.entity_detail_history_rows.avalues(querysets[1]),
+        })
+
+
+class AsyncEntityDiffView(AsyncEntitiesAPIView):
+    async def get(self, request):
+        from_date = parse_date(request, "from", "from_date")
+        to_date = parse_date(request, "to", "from_date")
+
+        from_dt = datetime.combine(from_date, datetime.min.time(), tzinfo=timezone.utc)
+        to_dt = datetime.combine(to_date, datetime.max.time(), tzinfo=timezone.utc)
+
+        entity_changes: dict = {}
+        for model, key_field, second_key_name in (
+                (Entity, "uuid", "entity_history"),
+                (EntityDetail, "entity_uuid", "entity_detail_history"),
+        ):
+            # Same sources as `fill_dict_with_transitions`: the change log, or windows over the versions
+            if has_change_log(model):
+                rows = await afetch_dicts(get_log_changes_queryset(model, from_dt, to_dt))
+                fill_dict_with_log_changes(entity_changes, model, rows, key_field, second_key_name)
+            else:
+                rows = await afetch_dicts(get_window_changes_queryset(model, from_dt, to_dt))
+                fill_dict_with_row_changes(entity_changes, model, rows, key_field, second_key_name)
+
+        return self.render({"entity_changes": entity_changes})
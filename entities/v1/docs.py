@@ -2,15 +2,62 @@ from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, OpenApiExample, OpenApiResponse
 from . import serializers as sz
 
+IF_NONE_MATCH = OpenApiParameter(
+    "If-None-Match",
+    str,
+    OpenApiParameter.HEADER,
+    description="ETag of a previous response; 304 Not Modified is returned while it is still current",
+)
+IF_MATCH = OpenApiParameter(
+    "If-Match",
+    str,
+    OpenApiParameter.HEADER,
+    description="ETag of the snapshot the update is based on; 412 Precondition Failed if it is no longer current",
+)
+NOT_MODIFIED = OpenApiResponse(description="Not modified: the ETag sent in If-None-Match is current")
+
 
 class EntitiesViewDoc:
     get = {
         "parameters": [
             OpenApiParameter("search", str, description="Search term"),
+            OpenApiParameter(
+                "search_mode",
+                str,
+                enum=["contains", "ranked"],
+                description=(
+                    "`contains` (default): case-insensitive substring of the display name. "
+                    "`ranked`: top matches by display name similarity and current detail values, best first"
+                ),
+            ),
             OpenApiParameter("type", str, description="Entity type code"),
             OpenApiParameter("detail_code", str, description="Detail code filter"),
+            OpenApiParameter(
+                "include",
+                str,
+                enum=["details"],
+                description="`details`: nest the current details of every listed entity (one batched query)",
+            ),
+            OpenApiParameter("cursor", str, description="Pagination cursor taken from the `Link` header"),
+            OpenApiParameter(
+                "limit",
+                int,
+                description="Page size (default 100, max 1000); number of matches with `search_mode=ranked` (default 20, max 100)",
+            ),
+            IF_NONE_MATCH,
         ],
-        "responses": sz.EntitySerializer(many=True)
+        "responses": {
+            200: OpenApiResponse(
+                sz.EntityWithDetailsSerializer(many=True),
+                description="`details` is only present with `include=details`",
+            ),
+            304: NOT_MODIFIED,
+        },
+        "description": (
+            "List current entities ordered by id. Keyset-paginated: the next/previous "
+            "pages are returned in the `Link` header (rel=\"next\" / rel=\"prev\"). "
+            "With `search_mode=ranked` the best matches are returned, best first, without pagination."
+        ),
     }
     post = {
         "request": sz.EntityCreateSerializer,
@@ -32,13 +79,24 @@ class EntitiesViewDoc:
 
 class EntitySnapshotViewDoc:
     get = {
-        "responses": sz.EntitySnapshotSerializer
+        "parameters": [IF_NONE_MATCH],
+        "responses": {
+            200: sz.EntitySnapshotResponseSerializer,
+            304: NOT_MODIFIED,
+        },
+        "description": (
+            "Current version of an Entity with its entity type, `detail` (first current detail, "
+            "null when there is none) and `details` (all current details)."
+        ),
     }
     patch = {
+        "parameters": [IF_MATCH],
         "request": sz.EntityUpdateSerializer,
         "responses": {
             200: sz.EntitySerializer,
-            404: OpenApiResponse(description="Entity not found")
+            404: OpenApiResponse(description="Entity not found"),
+            409: OpenApiResponse(description="Concurrent update still conflicting after retries"),
+            412: OpenApiResponse(description="If-Match does not match the current snapshot ETag"),
         },
         "description": "Update an Entity and its details by UUID"
     }
@@ -46,7 +104,9 @@ class EntitySnapshotViewDoc:
 
 class EntityHistoryViewDoc:
     get = {
+        "parameters": [IF_NONE_MATCH],
         "responses": {
+            304: NOT_MODIFIED,
             200: OpenApiResponse(
                 response=OpenApiTypes.OBJECT,
                 description="SCD2 history for Entity and EntityDetails",
@@ -84,7 +144,16 @@ class EntityAsOfViewDoc:
                         value="2025-09-01"
                     )
                 ]
-            )
+            ),
+            OpenApiParameter(
+                name="stream",
+                type=bool,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "Stream the result as NDJSON (application/x-ndjson): one "
+                    "`{\"entity\": {...}}` or `{\"entity_detail\": {...}}` object per line"
+                ),
+            ),
         ],
         "description": (
             "Fetch a snapshot of all entities and their details "
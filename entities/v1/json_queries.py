@@ -0,0 +1,68 @@
+"""
+Single-statement JSON bodies of the snapshot and history endpoints (`core.utils.db_json`),
+with the same fields as their serializers.
+"""
+from django.db.models import F
+
+from core.utils.db_json import SQL, JSONQuery, JSONRows
+from entities.models import Entity, EntityDetail
+from . import serializers as sz
+
+
+def get_serializer_fields(serializer_class, **overrides) -> dict:
+    """
+    `{field: column}` of a ModelSerializer's `Meta.fields` (attname for foreign keys); `overrides` replace or add keys.
+    """
+    model = serializer_class.Meta.model
+    fields = {name: model._meta.get_field(name).attname for name in serializer_class.Meta.fields}
+    return {**fields, **overrides}
+
+
+def get_snapshot_query(entity_uuid) -> JSONQuery:
+    """
+    Current entity with its entity type and current details; NULL body when the entity does not exist.
+    `detail` is the first current detail (by id), `details` all of them.
+    """
+    entities = (
+        Entity.objects.current()
+        .filter(uuid=entity_uuid)
+        .annotate(entity_type_code=F("entity_type__code"), entity_type_name=F("entity_type__name"))
+    )
+    details = EntityDetail.objects.current().filter(entity_uuid=entity_uuid)
+
+    return JSONQuery(
+        "entity.data -> 0",
+        detail=JSONRows(details, get_serializer_fields(sz.EntityDetailSerializer), etag=True),
+        entity=JSONRows(
+            entities,
+            get_serializer_fields(
+                sz.EntitySnapshotSerializer,
+                entity_type={"id": "entity_type_id", "code": "entity_type_code", "name": "entity_type_name"},
+                detail=SQL("detail.data -> 0"),
+                details=SQL("detail.data"),
+            ),
+            etag=True,
+        ),
+    )
+
+
+def get_history_query(entity_uuid) -> JSONQuery:
+    """
+    All versions of the entity and its details, newest first.
+    """
+    order_by = ("-valid_from", "-id")
+    return JSONQuery(
+        "json_build_object('entity_history', entity.data, 'entity_detail_history', detail.data)",
+        entity=JSONRows(
+            Entity.objects.filter(uuid=entity_uuid),
+            get_serializer_fields(sz.EntityHistorySerializer),
+            order_by=order_by,
+            etag=True,
+        ),
+        detail=JSONRows(
+            EntityDetail.objects.filter(entity_uuid=entity_uuid),
+            get_serializer_fields(sz.EntityDetailHistorySerializer),
+            order_by=order_by,
+            etag=True,
+        ),
+    )
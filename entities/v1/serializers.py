@@ -2,6 +2,7 @@ from django.core.exceptions import MultipleObjectsReturned
 from rest_framework import serializers
 
 from core.utils.orm import get_one_or_none
+from core.utils.rows import RowSerializer
 from entities.models import Entity, EntityDetail
 from entities.models import EntityType
 
@@ -56,6 +57,17 @@ class EntityDetailSerializer(serializers.ModelSerializer):
         fields = ["detail_code", "value"]
 
 
+class EntityWithDetailsSerializer(EntitySerializer):
+    """
+    Entity list row with its current details nested (`include=details`).
+    """
+    # Attached by prefetch_versions(..., to_attr="current_details")
+    details = EntityDetailSerializer(source="current_details", many=True, required=False)
+
+    class Meta(EntitySerializer.Meta):
+        fields = [*EntitySerializer.Meta.fields, "details"]
+
+
 class EntityTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = EntityType
@@ -77,6 +89,17 @@ class EntitySnapshotSerializer(serializers.ModelSerializer):
         ]
 
 
+class EntitySnapshotResponseSerializer(EntitySnapshotSerializer):
+    """
+    Schema of the snapshot response: the views add the current details to `EntitySnapshotSerializer` data.
+    """
+    detail = EntityDetailSerializer(read_only=True, allow_null=True, help_text="First current detail (by id).")
+    details = EntityDetailSerializer(many=True, read_only=True, help_text="All current details.")
+
+    class Meta(EntitySnapshotSerializer.Meta):
+        fields = [*EntitySnapshotSerializer.Meta.fields, "detail", "details"]
+
+
 class EntityHistorySerializer(serializers.ModelSerializer):
     entity_type = serializers.PrimaryKeyRelatedField(read_only=True)
     valid_from = serializers.DateTimeField(read_only=True)
@@ -131,3 +154,10 @@ class EntityUpdateSerializer(serializers.ModelSerializer):
 class EntityAsOfSerializer(serializers.ModelSerializer):
     entities = EntityHistorySerializer(many=True)
     entity_details = EntityDetailHistorySerializer(many=True)
+
+
+# Precompiled read paths (core.utils.rows), same output as the serializers above
+entity_rows = RowSerializer(EntitySerializer)
+entity_detail_rows = RowSerializer(EntityDetailSerializer)
+entity_history_rows = RowSerializer(EntityHistorySerializer)
+entity_detail_history_rows = RowSerializer(EntityDetailHistorySerializer)
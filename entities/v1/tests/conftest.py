@@ -0,0 +1,74 @@
+import pytest
+from django.contrib.auth.models import User, Group
+from rest_framework.test import APIClient
+
+from core.utils.cache import get_versioned_cache
+from entities.models import Entity, EntityType, EntityDetail
+
+
+@pytest.fixture(autouse=True)
+def clear_versioned_cache():
+    # Test transactions are rolled back, cached reads are not
+    cache = get_versioned_cache()
+    if cache is not None:
+        cache.clear()
+
+
+@pytest.fixture
+def create_user():
+    def _create(username, groups=None, is_superuser=False):
+        user = User.objects.create_user(username=username, password="password", is_superuser=is_superuser)
+        if groups:
+            for group_name in groups:
+                group, _ = Group.objects.get_or_create(name=group_name)
+                user.groups.add(group)
+        user.save()
+        return user
+    return _create
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def entity_type():
+    return EntityType.objects.create(code="INSTITUTION", name="Institution")
+
+
+@pytest.fixture
+def entity(entity_type):
+    return Entity.objects.create(display_name="MyEntity", entity_type=entity_type)
+
+
+@pytest.fixture
+def entity_detail(entity):
+    return EntityDetail.objects.create(entity_uuid=entity.uuid, value="InitialValue")
+
+
+@pytest.fixture
+def users():
+    anon = None
+
+    authenticated = User.objects.create_user(username="auth_user", password="password")
+
+    cockpit_group, _ = Group.objects.get_or_create(name="cockpit_admin")
+    cockpit_admin = User.objects.create_user(username="cockpit_admin_user", password="password")
+    cockpit_admin.groups.add(cockpit_group)
+    cockpit_admin.save()
+
+    entity_group, _ = Group.objects.get_or_create(name="entity_admin")
+    entity_admin = User.objects.create_user(username="entity_admin_user", password="password")
+    entity_admin.groups.add(entity_group)
+    entity_admin.save()
+
+    superuser = User.objects.create_superuser(username="superuser", password="password")
+
+    return {
+        "anon": anon,
+        "authenticated": authenticated,
+        "cockpit_admin": cockpit_admin,
+        "entity_admin": entity_admin,
+        "superuser": superuser,
+    }
@@ -1,74 +1,15 @@
+import json
+
 import pytest
-from django.contrib.auth.models import User, Group
-from rest_framework.test import APIClient
-from entities.models import Entity, EntityType, EntityDetail
 from django.urls import reverse
+from core.utils.cache import get_versioned_cache
+from entities.models import Entity
 from rest_framework import status
 from datetime import datetime, timedelta, timezone
 
 pytestmark = pytest.mark.django_db
 
 
-@pytest.fixture
-def create_user():
-    def _create(username, groups=None, is_superuser=False):
-        user = User.objects.create_user(username=username, password="password", is_superuser=is_superuser)
-        if groups:
-            for group_name in groups:
-                group, _ = Group.objects.get_or_create(name=group_name)
-                user.groups.add(group)
-        user.save()
-        return user
-    return _create
-
-
-@pytest.fixture
-def api_client():
-    return APIClient()
-
-
-@pytest.fixture
-def entity_type():
-    return EntityType.objects.create(code="INSTITUTION", name="Institution")
-
-
-@pytest.fixture
-def entity(entity_type):
-    return Entity.objects.create(display_name="MyEntity", entity_type=entity_type)
-
-
-@pytest.fixture
-def entity_detail(entity):
-    return EntityDetail.objects.create(entity_uuid=entity.uuid, value="InitialValue")
-
-
-@pytest.fixture
-def users():
-    anon = None
-
-    authenticated = User.objects.create_user(username="auth_user", password="password")
-
-    cockpit_group, _ = Group.objects.get_or_create(name="cockpit_admin")
-    cockpit_admin = User.objects.create_user(username="cockpit_admin_user", password="password")
-    cockpit_admin.groups.add(cockpit_group)
-    cockpit_admin.save()
-
-    entity_group, _ = Group.objects.get_or_create(name="entity_admin")
-    entity_admin = User.objects.create_user(username="entity_admin_user", password="password")
-    entity_admin.groups.add(entity_group)
-    entity_admin.save()
-
-    superuser = User.objects.create_superuser(username="superuser", password="password")
-
-    return {
-        "anon": anon,
-        "authenticated": authenticated,
-        "cockpit_admin": cockpit_admin,
-        "entity_admin": entity_admin,
-        "superuser": superuser,
-    }
-
-
 def _authenticate_user(self, api_client, users, user_key, force_auth):
     api_client.force_authenticate(user=None)
     user = users[user_key]
@@ -142,8 +83,8 @@ class TestEntitiesAPI:
         response = api_client.get(url)
         assert response.status_code == expected_status_get
         if expected_status_get == status.HTTP_200_OK:
-            assert response.data["uuid"] == str(entity.uuid)
-            assert response.data["detail"]["value"] == entity_detail.value
+            assert response.json()["uuid"] == str(entity.uuid)
+            assert response.json()["detail"]["value"] == entity_detail.value
 
     def test_patch_entity_and_create_new_version(
             self, api_client, users, entity, entity_detail, user_key, force_auth,
@@ -225,6 +166,29 @@ def test_patch_entity_idempotent(api_client, users, entity, entity_detail):
     assert response2.status_code in (status.HTTP_200_OK, status.HTTP_204_NO_CONTENT)
 
 
+def test_patch_retries_concurrent_first_detail(api_client, users, entity, entity_detail, monkeypatch):
+    from entities.v1 import views
+
+    get_one_or_none = views.get_one_or_none
+    calls = []
+
+    def stale_get_one_or_none(*args, **kwargs):
+        # The first attempt reads before a concurrent request created the detail
+        calls.append(args)
+        return None if len(calls) == 1 else get_one_or_none(*args, **kwargs)
+
+    monkeypatch.setattr(views, "get_one_or_none", stale_get_one_or_none)
+    api_client.force_authenticate(user=users["superuser"])
+
+    url = reverse("entity-snapshot", args=[entity.uuid])
+    payload = {"detail": {"detail_code": str(entity_detail.detail_code), "value": "Concurrent"}}
+    response = api_client.patch(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(calls) == 2
+    assert [detail["value"] for detail in response.json()["detail"]] == ["Concurrent"]
+
+
 def test_create_entity_with_invalid_type(api_client, users):
     user = users["superuser"]
     api_client.force_authenticate(user=user)
@@ -252,3 +216,143 @@ def test_create_entity_without_required_field(api_client, users, entity_type):
     response = api_client.post(url, payload, format="json")
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
+
+
+def test_list_entities_keyset_pagination(api_client, users, entity_type):
+    user = users["superuser"]
+    api_client.force_authenticate(user=user)
+
+    created = [
+        Entity.objects.create(display_name=f"Entity {index}", entity_type=entity_type)
+        for index in range(5)
+    ]
+
+    url = reverse("entity")
+    response = api_client.get(url, {"limit": 2})
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.data] == [e.id for e in created[:2]]
+
+    seen = [item["id"] for item in response.data]
+    while "next" in response.headers.get("Link", ""):
+        next_url = response.headers["Link"].split(";")[0].strip("<>")
+        response = api_client.get(next_url)
+        assert response.status_code == status.HTTP_200_OK
+        seen += [item["id"] for item in response.data]
+
+    assert seen == [e.id for e in created]
+
+
+def test_entities_as_of_stream(api_client, users, entity, entity_detail):
+    user = users["superuser"]
+    api_client.force_authenticate(user=user)
+
+    tomorrow = datetime.now(timezone.utc).date() + timedelta(days=1)
+    url = reverse("entities-asof")
+    response = api_client.get(url, {"as_of": tomorrow.strftime("%Y-%m-%d"), "stream": "true"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/x-ndjson"
+
+    lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+    assert lines == [
+        {"entity": {
+            "id": entity.id,
+            "uuid": str(entity.uuid),
+            "display_name": entity.display_name,
+            "entity_type": entity.entity_type_id,
+            "valid_from": lines[0]["entity"]["valid_from"],
+            "valid_to": None,
+            "is_current": True,
+        }},
+        {"entity_detail": {
+            "id": entity_detail.id,
+            "detail_code": str(entity_detail.detail_code),
+            "value": entity_detail.value,
+            "valid_from": lines[1]["entity_detail"]["valid_from"],
+            "valid_to": None,
+            "is_current": True,
+        }},
+    ]
+
+
+def test_snapshot_and_history_cached_until_new_version(
+        api_client, users, entity_type, entity, entity_detail, django_assert_num_queries
+):
+    api_client.force_authenticate(user=users["superuser"])
+    snapshot_url = reverse("entity-snapshot", args=[entity.uuid])
+    history_url = reverse("entity-history", args=[entity.uuid])
+
+    assert api_client.get(snapshot_url).json()["display_name"] == "MyEntity"
+    assert len(api_client.get(history_url).json()["entity_history"]) == 1
+
+    with django_assert_num_queries(0):
+        assert api_client.get(snapshot_url).json()["display_name"] == "MyEntity"
+        assert len(api_client.get(history_url).json()["entity_history"]) == 1
+
+    api_client.patch(snapshot_url, {"detail": {"value": "Patched"}}, format="json")
+    assert api_client.get(snapshot_url).json()["detail"]["value"] == "Patched"
+    assert len(api_client.get(history_url).json()["entity_detail_history"]) == 2
+
+    Entity.bulk_new_versions([Entity(uuid=entity.uuid, display_name="Bulk", entity_type=entity_type)])
+    assert api_client.get(snapshot_url).json()["display_name"] == "Bulk"
+    assert len(api_client.get(history_url).json()["entity_history"]) == 2
+
+
+@pytest.mark.parametrize("url_name", ["entity-snapshot", "entity-history"])
+def test_etag_not_modified(api_client, users, entity, entity_detail, url_name, django_assert_max_num_queries):
+    api_client.force_authenticate(user=users["superuser"])
+    url = reverse(url_name, args=[entity.uuid])
+
+    response = api_client.get(url)
+    etag = response["ETag"]
+    assert response.status_code == status.HTTP_200_OK and etag.startswith('"')
+
+    # Cache hit
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+
+    # Cache miss: answered from the narrow version check alone
+    get_versioned_cache().clear()
+    with django_assert_max_num_queries(2):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    api_client.patch(reverse("entity-snapshot", args=[entity.uuid]), {"display_name": "Changed"}, format="json")
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+
+
+def test_list_etag_not_modified(api_client, users, entity):
+    api_client.force_authenticate(user=users["superuser"])
+    url = reverse("entity")
+
+    etag = api_client.get(url)["ETag"]
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    entity.display_name = "Changed"
+    entity.save()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+
+def test_patch_if_match(api_client, users, entity, entity_detail):
+    api_client.force_authenticate(user=users["superuser"])
+    url = reverse("entity-snapshot", args=[entity.uuid])
+    etag = api_client.get(url)["ETag"]
+
+    response = api_client.patch(url, {"display_name": "First"}, format="json", HTTP_IF_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+
+    # The same precondition is stale now
+    response = api_client.patch(url, {"display_name": "Second"}, format="json", HTTP_IF_MATCH=etag)
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert Entity.objects.current().get(uuid=entity.uuid).display_name == "First"
+
+
+def test_snapshot_schema_declares_details(api_client):
+    schema = api_client.get(reverse("schema"), {"format": "json"}).json()
+    snapshot = schema["components"]["schemas"]["EntitySnapshotResponse"]
+
+    assert {"detail", "details"} <= set(snapshot["properties"])
+    assert snapshot["properties"]["details"]["type"] == "array"
@@ -0,0 +1,78 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from auth.tokens import GROUPS_CLAIM, SUPERUSER_CLAIM, ClaimsTokenUser
+from entities.v1.views import EntitiesView
+
+pytestmark = pytest.mark.django_db
+
+
+def get_token_pair(api_client, username) -> dict:
+    response = api_client.post(reverse("token_obtain_pair"), {"username": username, "password": "password"})
+    assert response.status_code == 200
+    return response.data
+
+
+def get_access_token(api_client, username):
+    return get_token_pair(api_client, username)["access"]
+
+
+@pytest.mark.parametrize("username, allowed", [
+    ("auth_user", False),
+    ("cockpit_admin_user", True),
+    ("entity_admin_user", True),
+    ("superuser", True),
+])
+def test_roles_are_resolved_from_token_claims(api_client, users, username, allowed, django_assert_num_queries):
+    token = get_access_token(api_client, username)
+    request = APIRequestFactory().get("/api/v1/entities", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    with django_assert_num_queries(0):
+        user, _ = JWTStatelessUserAuthentication().authenticate(request)
+        request.user = user
+        permissions = [permission() for permission in EntitiesView.permission_classes]
+        assert all(permission.has_permission(request, None) for permission in permissions) == allowed
+
+    assert isinstance(user, ClaimsTokenUser)
+
+
+def test_api_call_with_token(api_client, users, entity):
+    token = get_access_token(api_client, "entity_admin_user")
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    response = api_client.get(reverse("entity"))
+
+    assert response.status_code == 200
+    assert response.data[0]["uuid"] == str(entity.uuid)
+
+
+def test_refresh_re_reads_roles(api_client, users, django_assert_num_queries):
+    refresh = get_token_pair(api_client, "entity_admin_user")["refresh"]
+    users["entity_admin"].groups.clear()
+    users["entity_admin"].is_superuser = True
+    users["entity_admin"].save()
+
+    with django_assert_num_queries(1):
+        response = api_client.post(reverse("token_refresh"), {"refresh": refresh})
+
+    assert response.status_code == 200
+    token = AccessToken(response.data["access"])
+    assert token[GROUPS_CLAIM] == []
+    assert token[SUPERUSER_CLAIM] is True
+
+
+@pytest.mark.parametrize("change", ["deactivate", "delete"])
+def test_refresh_rejects_inactive_or_deleted_users(api_client, users, change):
+    refresh = get_token_pair(api_client, "entity_admin_user")["refresh"]
+    if change == "deactivate":
+        users["entity_admin"].is_active = False
+        users["entity_admin"].save()
+    else:
+        users["entity_admin"].delete()
+
+    response = api_client.post(reverse("token_refresh"), {"refresh": refresh})
+
+    assert response.status_code == 401
@@ -0,0 +1,76 @@
+import json
+import uuid
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from entities.models import EntityDetail
+
+pytestmark = pytest.mark.django_db
+
+
+def get_both(api_client, url, params=None):
+    """
+    Responses of the serializer path and of the DB-rendered path.
+    """
+    responses = []
+    for enabled in (False, True):
+        with override_settings(DB_JSON_RENDERING={"ENABLED": enabled}):
+            response = api_client.get(url, params or {})
+        assert response.status_code == 200
+        responses.append(response)
+    return responses
+
+
+@pytest.mark.parametrize("url_name", ["entity-snapshot", "entity-history"])
+def test_db_json_matches_serializers(api_client, users, entity, entity_detail, url_name):
+    api_client.force_authenticate(users["entity_admin"])
+    entity.new_version(save=True, display_name="Renamed")
+    EntityDetail.objects.create(entity_uuid=entity.uuid, value="Second")
+
+    serialized, rendered = get_both(api_client, reverse(url_name, args=[entity.uuid]))
+
+    assert rendered["Content-Type"] == "application/json"
+    assert json.loads(rendered.content) == json.loads(serialized.content)
+    assert rendered.get("ETag") == serialized.get("ETag")
+
+
+def test_db_json_leaves_unbounded_as_of_to_serializers(api_client, users, entity, entity_detail):
+    api_client.force_authenticate(users["entity_admin"])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse("entities-asof"), {"as_of": "2100-01-01"})
+
+    assert response.status_code == 200
+    assert [row["uuid"] for row in json.loads(response.content)["entities"]] == [str(entity.uuid)]
+    assert not any("json_agg" in query["sql"] for query in queries)
+
+
+def test_db_json_snapshot_is_one_statement(api_client, users, entity, entity_detail):
+    api_client.force_authenticate(users["entity_admin"])
+    url = reverse("entity-snapshot", args=[entity.uuid])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url)
+
+    data = json.loads(response.content)
+    # Besides the role check of the session user
+    assert len([query for query in queries if "auth_" not in query["sql"]]) == 1
+    assert data["entity_type"]["code"] == "INSTITUTION"
+    assert data["detail"]["value"] == "InitialValue"
+    assert [detail["value"] for detail in data["details"]] == ["InitialValue"]
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+
+
+def test_db_json_snapshot_without_details_and_unknown_entity(api_client, users, entity):
+    api_client.force_authenticate(users["entity_admin"])
+
+    serialized, rendered = get_both(api_client, reverse("entity-snapshot", args=[entity.uuid]))
+    assert json.loads(rendered.content)["detail"] is None
+    assert json.loads(rendered.content) == json.loads(serialized.content)
+
+    for url_name in ("entity-snapshot", "entity-history"):
+        assert api_client.get(reverse(url_name, args=[uuid.uuid4()])).status_code == 404
@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from entities.models import Entity, EntityDetail
+
+pytestmark = pytest.mark.django_db
+
+
+def create_entities(entity_type, count: int) -> list[Entity]:
+    entities = [Entity.objects.create(display_name=f"Entity {i}", entity_type=entity_type) for i in range(count)]
+    for entity in entities:
+        EntityDetail.objects.create(entity_uuid=entity.uuid, value=f"{entity.display_name} value")
+    return entities
+
+
+def list_entities(api_client, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse("entity"), params)
+    assert response.status_code == 200
+    return response, len(queries)
+
+
+def test_include_details_nests_current_details(api_client, users, entity_type):
+    api_client.force_authenticate(users["entity_admin"])
+    first, second = create_entities(entity_type, 2)
+    detail = EntityDetail.objects.current().get(entity_uuid=first.uuid)
+    detail.new_version(save=True, value="Updated")
+
+    response, _ = list_entities(api_client, include="details")
+
+    details = {item["uuid"]: item["details"] for item in response.data}
+    assert details[str(first.uuid)] == [{"detail_code": str(detail.detail_code), "value": "Updated"}]
+    assert [item["value"] for item in details[str(second.uuid)]] == ["Entity 1 value"]
+    assert "details" not in list_entities(api_client)[0].data[0]
+
+
+def test_include_details_is_one_batched_query(api_client, users, entity_type):
+    api_client.force_authenticate(users["entity_admin"])
+    create_entities(entity_type, 2)
+    _, plain = list_entities(api_client)
+    _, small = list_entities(api_client, include="details")
+
+    create_entities(entity_type, 10)
+    _, large = list_entities(api_client, include="details")
+
+    assert small == large == plain + 1
+
+
+def test_include_details_etag_covers_details(api_client, users, entity, entity_detail):
+    api_client.force_authenticate(users["entity_admin"])
+    response, _ = list_entities(api_client, include="details")
+    etag = response["ETag"]
+
+    assert api_client.get(reverse("entity"), {"include": "details"}, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    entity_detail.new_version(save=True, value="Changed")
+    assert api_client.get(reverse("entity"), {"include": "details"}, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_include_unknown(api_client, users, entity):
+    api_client.force_authenticate(users["entity_admin"])
+
+    assert api_client.get(reverse("entity"), {"include": "details,history"}).status_code == 400
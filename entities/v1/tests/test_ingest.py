@@ -0,0 +1,122 @@
+import json
+import uuid
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from core.models.scd2.concurrency import SCD2VersionConflict
+from entities.ingestion import apply_chunk, get_entity_types
+from entities.models import Entity, EntityDetail
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def jsonl_file(tmp_path, entity_type):
+    rows = [
+        {
+            "uuid": str(uuid.uuid4()),
+            "entity_type_code": entity_type.code,
+            "display_name": f"Entity {index}",
+            "detail_code": str(uuid.uuid4()),
+            "value": f"value {index}",
+        }
+        for index in range(5)
+    ]
+    rows.append({"entity_type_code": "NOT_EXIST", "display_name": "Rejected"})
+
+    path = tmp_path / "entities.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in rows) + "\n")
+    return path
+
+
+def test_ingest_entities_jsonl_is_idempotent(jsonl_file):
+    out = StringIO()
+    call_command("ingest_entities", str(jsonl_file), "--chunk-size", "2", stdout=out)
+
+    assert "inserted=10 closed=0 skipped=0 rejected=1" in out.getvalue()
+    assert Entity.objects.current().count() == 5
+    assert EntityDetail.objects.current().count() == 5
+    assert not (jsonl_file.parent / "entities.jsonl.checkpoint.json").exists()
+
+    out = StringIO()
+    call_command("ingest_entities", str(jsonl_file), stdout=out)
+
+    assert "inserted=0 closed=0 skipped=10 rejected=1" in out.getvalue()
+    assert Entity.objects.count() == 5
+
+
+def test_ingest_entities_csv_closes_changed_versions(tmp_path, entity, entity_detail):
+    path = tmp_path / "entities.csv"
+    path.write_text(
+        "uuid,entity_type_code,display_name,detail_code,value\n"
+        f"{entity.uuid},{entity.entity_type.code},Renamed,{entity_detail.detail_code},\"multi\nline\"\n"
+    )
+
+    out = StringIO()
+    call_command("ingest_entities", str(path), stdout=out)
+
+    assert "inserted=2 closed=2 skipped=0" in out.getvalue()
+    assert Entity.objects.current().get(uuid=entity.uuid).display_name == "Renamed"
+    assert EntityDetail.objects.current().get(detail_code=entity_detail.detail_code).value == "multi\nline"
+
+
+def test_ingest_entities_resumes_from_checkpoint(jsonl_file):
+    first_line = jsonl_file.read_bytes().split(b"\n")[0]
+    checkpoint = jsonl_file.parent / "entities.jsonl.checkpoint.json"
+    checkpoint.write_text(json.dumps({
+        "path": str(jsonl_file),
+        "offset": len(first_line) + 1,
+        "chunks": 1,
+        "rows": 1,
+        "inserted": 0,
+        "closed": 0,
+        "skipped": 0,
+        "rejected": 0,
+    }))
+
+    out = StringIO()
+    call_command("ingest_entities", str(jsonl_file), stdout=out)
+
+    assert "Resuming after 1 rows" in out.getvalue()
+    assert "rows=6 inserted=8" in out.getvalue()
+    assert Entity.objects.current().count() == 4
+
+
+def test_ingest_entities_rejects_malformed_rows(tmp_path, entity_type):
+    valid = {"uuid": str(uuid.uuid4()), "entity_type_code": entity_type.code, "display_name": "Valid"}
+    path = tmp_path / "entities.jsonl"
+    path.write_text("\n".join([
+        "{not json",
+        "[1, 2]",
+        json.dumps({"entity_type_code": entity_type.code, "display_name": "Without uuid"}),
+        json.dumps({**valid, "uuid": str(uuid.uuid4()), "value": "Without detail_code"}),
+        json.dumps(valid),
+    ]) + "\n")
+
+    out = StringIO()
+    call_command("ingest_entities", str(path), stdout=out)
+
+    assert "rows=5 inserted=1 closed=0 skipped=0 rejected=4" in out.getvalue()
+    assert Entity.objects.get().display_name == "Valid"
+
+
+def test_apply_chunk_retries_version_conflicts(monkeypatch, entity_type):
+    bulk_new_versions = Entity.bulk_new_versions
+    calls = []
+
+    def conflicting(objs, **kwargs):
+        calls.append(objs)
+        if len(calls) == 1:
+            raise SCD2VersionConflict("closed concurrently")
+        return bulk_new_versions(objs, **kwargs)
+
+    monkeypatch.setattr(Entity, "bulk_new_versions", conflicting)
+    row = {"uuid": str(uuid.uuid4()), "entity_type_code": entity_type.code, "display_name": "Retried"}
+
+    entity_result, _, rejected = apply_chunk([json.dumps(row)], get_entity_types())
+
+    assert len(calls) == 2
+    assert (entity_result.inserted, rejected) == (1, 0)
+    assert Entity.objects.current().get().display_name == "Retried"
@@ -0,0 +1,37 @@
+import json
+import logging
+import re
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+pytestmark = pytest.mark.django_db
+
+
+def test_server_timing_counts_request_queries(api_client, users, entity, entity_detail, caplog):
+    api_client.force_authenticate(users["entity_admin"])
+
+    with caplog.at_level(logging.INFO, logger="core.middleware"):
+        response = api_client.get(reverse("entity-history", args=[entity.uuid]))
+
+    assert response.status_code == 200
+    match = re.match(r'db;desc="(\d+) queries";dur=[\d.]+, db-slowest;dur=[\d.]+, total;dur=[\d.]+$', response["Server-Timing"])
+    assert match
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["path"] == reverse("entity-history", args=[entity.uuid])
+    assert record["status"] == 200
+    assert record["db_queries"] == int(match.group(1)) > 0
+    assert record["db_slowest_sql"].startswith(("SELECT", "WITH"))
+
+
+def test_instrumentation_disabled(users, entity):
+    with override_settings(QUERY_INSTRUMENTATION={"ENABLED": False}):
+        client = APIClient()
+        client.force_authenticate(users["entity_admin"])
+        response = client.get(reverse("entity"))
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response
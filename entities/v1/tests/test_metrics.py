@@ -0,0 +1,49 @@
+import pytest
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from entities.models import Entity
+
+pytestmark = pytest.mark.django_db
+
+
+def get_sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_scd2_metrics(entity):
+    transitions = get_sample("scd2_transitions_total", model="entities.entity", path="cte")
+    skips = get_sample("scd2_hash_diff_skips_total", model="entities.entity", reason="unchanged")
+
+    entity.new_version(save=True, display_name="Renamed")
+    current = Entity.objects.current().get(uuid=entity.uuid)
+    current.save()
+
+    assert get_sample("scd2_transitions_total", model="entities.entity", path="cte") == transitions + 1
+    assert get_sample("scd2_hash_diff_skips_total", model="entities.entity", reason="unchanged") == skips + 1
+
+
+def test_metrics_endpoint_reports_request_latency(api_client, users, entity, entity_detail):
+    api_client.force_authenticate(users["entity_admin"])
+    labels = {"method": "GET", "route": "api/v1/entities/<uuid:entity_uuid>", "status": "200"}
+    count = get_sample("http_request_duration_seconds_count", **labels)
+
+    assert api_client.get(reverse("entity-snapshot", args=[entity.uuid])).status_code == 200
+    response = api_client.get(reverse("metrics"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    assert get_sample("http_request_duration_seconds_count", **labels) == count + 1
+    assert b"scd2_transitions_total" in response.content
+
+
+def test_metrics_endpoint_requires_the_configured_token(api_client, settings):
+    settings.METRICS = {"TOKEN": "scrape-secret"}
+
+    assert api_client.get(reverse("metrics")).status_code == 401
+    assert api_client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong").status_code == 401
+    response = api_client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-secret")
+    assert response.status_code == 200
+
+    settings.METRICS = {"ENABLED": False}
+    assert api_client.get(reverse("metrics")).status_code == 404
@@ -0,0 +1,118 @@
+import csv
+import gzip
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from core.models.scd2.concurrency import is_version_conflict
+from core.models.scd2.partitions import (
+    ensure_partitions,
+    get_partition_name,
+    get_partition_start,
+    get_partitions,
+    is_partitioned,
+)
+from entities.models import Entity
+
+pytestmark = pytest.mark.django_db
+
+FEBRUARY = datetime(2025, 2, 1, tzinfo=dt_timezone.utc)
+
+
+def get_partition_of(obj) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT tableoid::regclass::text FROM {obj._meta.db_table} WHERE id = %s", [obj.pk])
+        return cursor.fetchone()[0]
+
+
+def create_closed(entity, valid_from, valid_to) -> Entity:
+    return Entity.objects.create(
+        uuid=entity.uuid,
+        display_name="Old",
+        entity_type=entity.entity_type,
+        valid_from=valid_from,
+        valid_to=valid_to,
+        is_current=False,
+    )
+
+
+def test_closed_versions_move_to_their_partition(entity):
+    assert is_partitioned(Entity)
+    now = timezone.now()
+    start = get_partition_start("monthly", now)
+
+    created = ensure_partitions(Entity, now, ahead=1)
+
+    assert created[0] == (get_partition_name("entities_entity", start), 0)
+    assert len(created) == 2
+    new_version, old_version = entity.new_version(display_name="Renamed")
+    assert get_partition_of(old_version) == get_partition_name("entities_entity", start)
+    assert get_partition_of(new_version) == "entities_entity_current"
+    assert Entity.objects.current().get().pk == new_version.pk
+
+
+def test_current_queries_only_scan_the_current_partition(entity):
+    ensure_partitions(Entity, timezone.now(), ahead=0)
+
+    plan = Entity.objects.current().filter(display_name="Acme").explain()
+
+    assert "entities_entity_current" in plan
+    assert "entities_entity_default" not in plan
+    assert "entities_entity_p" not in plan
+
+
+def test_ensure_partitions_moves_rows_out_of_default(entity):
+    old = create_closed(entity, datetime(2025, 1, 10, tzinfo=dt_timezone.utc), datetime(2025, 2, 10, tzinfo=dt_timezone.utc))
+    assert get_partition_of(old) == "entities_entity_default"
+
+    created = dict(ensure_partitions(Entity, timezone.now(), ahead=0))
+
+    assert created["entities_entity_p202502"] == 1
+    assert get_partition_of(old) == "entities_entity_p202502"
+    assert get_partitions(Entity)[0].start is None
+    # Existing partitions are kept
+    assert ensure_partitions(Entity, timezone.now(), ahead=0) == []
+    assert list(Entity.objects.as_of(datetime(2025, 1, 20, tzinfo=dt_timezone.utc), checkpoint=None)) == [old]
+
+
+def test_partitions_keep_scd2_constraints(entity):
+    ensure_partitions(Entity, FEBRUARY, ahead=0)
+    create_closed(entity, datetime(2025, 2, 1, tzinfo=dt_timezone.utc), datetime(2025, 2, 10, tzinfo=dt_timezone.utc))
+
+    with pytest.raises(IntegrityError) as error, transaction.atomic():
+        create_closed(entity, datetime(2025, 2, 5, tzinfo=dt_timezone.utc), datetime(2025, 2, 20, tzinfo=dt_timezone.utc))
+    assert is_version_conflict(Entity, error.value)
+
+
+def test_partitions_exclude_overlap_across_partitions(entity):
+    Entity.objects.filter(pk=entity.pk).update(valid_from=datetime(2025, 2, 5, tzinfo=dt_timezone.utc))
+    ensure_partitions(Entity, FEBRUARY, ahead=0)
+
+    # Closed version in entities_entity_p202502 overlapping the current version in entities_entity_current
+    with pytest.raises(IntegrityError) as error, transaction.atomic():
+        create_closed(entity, datetime(2025, 2, 1, tzinfo=dt_timezone.utc), datetime(2025, 2, 10, tzinfo=dt_timezone.utc))
+    assert error.value.__cause__.diag.constraint_name == "exclude_overlapping_entity"
+    assert is_version_conflict(Entity, error.value)
+
+    create_closed(entity, datetime(2025, 2, 1, tzinfo=dt_timezone.utc), datetime(2025, 2, 5, tzinfo=dt_timezone.utc))
+    assert Entity.objects.filter(uuid=entity.uuid).count() == 2
+
+
+def test_archive_partitions(entity, tmp_path):
+    old = create_closed(entity, datetime(2025, 1, 10, tzinfo=dt_timezone.utc), datetime(2025, 2, 10, tzinfo=dt_timezone.utc))
+
+    call_command(
+        "scd2_partitions", "--model", "entities.Entity", "--ahead", "0",
+        "--archive-before", "2025-03-01", "--archive-dir", str(tmp_path),
+    )
+
+    with gzip.open(tmp_path / "entities_entity_p202502.csv.gz", "rt") as file:
+        rows = list(csv.DictReader(file))
+    assert [(row["id"], row["display_name"]) for row in rows] == [(str(old.pk), "Old")]
+    assert "validity" not in rows[0]
+    assert not Entity.objects.filter(pk=old.pk).exists()
+    assert "entities_entity_p202502" not in [partition.name for partition in get_partitions(Entity)]
+    assert Entity.objects.current().get().pk == entity.pk
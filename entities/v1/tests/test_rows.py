@@ -0,0 +1,61 @@
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.utils.renderers import ORJSONRenderer
+from core.utils.rows import RowSerializer
+from entities.models import Entity, EntityDetail
+from entities.v1 import serializers as sz
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize("rows, serializer_class, model", [
+    (sz.entity_rows, sz.EntitySerializer, Entity),
+    (sz.entity_history_rows, sz.EntityHistorySerializer, Entity),
+    (sz.entity_detail_rows, sz.EntityDetailSerializer, EntityDetail),
+    (sz.entity_detail_history_rows, sz.EntityDetailHistorySerializer, EntityDetail),
+])
+def test_row_serializer_matches_serializer(entity, entity_detail, rows, serializer_class, model):
+    entity.new_version(save=True, display_name="Renamed")
+    queryset = model.objects.order_by("id")
+    expected = serializer_class(queryset, many=True).data
+
+    assert rows.values(queryset) == expected
+    assert list(rows.iter_values(queryset)) == expected
+    assert rows.objects(queryset) == expected
+    assert [list(item) for item in rows.values(queryset)] == [list(item) for item in expected]
+
+
+def test_row_serializer_uses_current_timezone(entity):
+    queryset = Entity.objects.order_by("id")
+    with timezone.override("Europe/Zurich"):
+        expected = sz.EntityHistorySerializer(queryset, many=True).data
+        assert sz.entity_history_rows.values(queryset) == expected
+    assert expected[0]["valid_from"].endswith(("+01:00", "+02:00"))
+
+
+def test_row_serializer_rejects_nested_fields():
+    with pytest.raises(ImproperlyConfigured):
+        RowSerializer(sz.EntitySnapshotSerializer).columns
+
+
+def test_orjson_renderer_matches_json_renderer(entity, entity_detail):
+    data = {
+        "entities": sz.EntityHistorySerializer(Entity.objects.all(), many=True).data,
+        "raw": [uuid.uuid4(), Decimal("1.50"), entity.valid_from, "Zürich"],
+    }
+
+    rendered = ORJSONRenderer().render(data)
+
+    assert json.loads(rendered) == json.loads(JSONRenderer().render(data))
+    assert "Zürich".encode() in rendered
+    assert ORJSONRenderer().render(data, "application/json; indent=4", {}) == JSONRenderer().render(
+        data, "application/json; indent=4", {}
+    )
+
@@ -0,0 +1,306 @@
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models.scd2.changelog import get_change_log
+from core.models.scd2.concurrency import SCD2VersionConflict, run_transition
+from core.models.scd2.changes import fill_dict_with_transitions, fill_dict_with_window_changes, get_window_changes
+from core.models.scd2.indexes import CurrentIndex, HistoryBrinIndex, get_scd2_index_list
+from core.models.scd2.snapshots import take_snapshot
+from entities.models import Entity, EntityChangeLog, EntityDetail, EntityDetailSnapshot, EntitySnapshot
+
+pytestmark = pytest.mark.django_db
+
+
+def test_bulk_new_versions_inserts_closes_and_skips(entity_type, entity):
+    new_uuid = uuid.uuid4()
+    incoming = [
+        Entity(uuid=entity.uuid, display_name="Renamed", entity_type=entity_type),
+        Entity(uuid=new_uuid, display_name="Fresh", entity_type=entity_type),
+    ]
+
+    result = Entity.bulk_new_versions(incoming)
+
+    assert (result.inserted, result.closed, result.skipped) == (2, 1, 0)
+    assert Entity.objects.filter(uuid=entity.uuid).count() == 2
+    current = Entity.objects.current().get(uuid=entity.uuid)
+    assert current.display_name == "Renamed"
+    closed = Entity.objects.get(pk=entity.pk)
+    assert not closed.is_current
+    assert closed.valid_to == current.valid_from
+    assert Entity.objects.current().get(uuid=new_uuid).hash_diff
+
+
+def test_bulk_new_versions_is_idempotent(entity_type, entity):
+    payload = [Entity(uuid=entity.uuid, display_name="Renamed", entity_type=entity_type)]
+    Entity.bulk_new_versions(payload)
+
+    payload = [Entity(uuid=entity.uuid, display_name="Renamed", entity_type=entity_type)]
+    result = Entity.bulk_new_versions(payload)
+
+    assert (result.inserted, result.closed, result.skipped) == (0, 0, 1)
+    assert Entity.objects.filter(uuid=entity.uuid).count() == 2
+
+
+def test_bulk_new_versions_composite_natural_key(entity, entity_detail, django_assert_max_num_queries):
+    other_detail = EntityDetail.objects.create(entity_uuid=entity.uuid, value="Other")
+    incoming = [
+        EntityDetail(entity_uuid=entity.uuid, detail_code=entity_detail.detail_code, value="Changed"),
+        EntityDetail(entity_uuid=entity.uuid, detail_code=other_detail.detail_code, value="Other"),
+    ]
+
+    # select current + savepoint + update + insert + change log + release
+    with django_assert_max_num_queries(6):
+        result = EntityDetail.bulk_new_versions(incoming)
+
+    assert (result.inserted, result.closed, result.skipped) == (1, 1, 1)
+    assert EntityDetail.objects.current().get(detail_code=entity_detail.detail_code).value == "Changed"
+
+
+def test_get_window_changes_reads_only_transitions(entity_type, entity, entity_detail):
+    untouched = Entity.objects.create(display_name="Untouched", entity_type=entity_type)
+    entity.display_name = "Renamed"
+    entity.save()
+    entity_detail.value = "Changed"
+    entity_detail.save()
+
+    now = timezone.now()
+    from_dt, to_dt = now - timedelta(hours=1), now + timedelta(hours=1)
+
+    entity_changes = list(get_window_changes(Entity, from_dt, to_dt))
+    assert [(row["uuid"], changes) for row, changes in entity_changes] == [
+        (entity.uuid, [{"display_name": {"old_value": "MyEntity", "new_value": "Renamed"}}]),
+    ]
+    assert untouched.uuid not in {row["uuid"] for row, _ in entity_changes}
+
+    detail_changes = {}
+    fill_dict_with_window_changes(detail_changes, EntityDetail, from_dt, to_dt, "entity_uuid", "entity_detail_history")
+    [changes] = detail_changes[str(entity.uuid)]["entity_detail_history"].values()
+    assert changes == [{"value": {"old_value": "InitialValue", "new_value": "Changed"}}]
+
+    assert list(get_window_changes(Entity, now + timedelta(days=1), now + timedelta(days=2))) == []
+
+
+def test_diff_reads_the_change_log(entity, entity_detail):
+    entity.new_version(save=True, display_name="Renamed")
+    EntityDetail.objects.current().get().new_version(save=True, value="Changed")
+    now = timezone.now()
+    from_dt, to_dt = now - timedelta(hours=1), now + timedelta(hours=1)
+
+    expected = {}
+    fill_dict_with_window_changes(expected, Entity, from_dt, to_dt, "uuid", "entity_history")
+    fill_dict_with_window_changes(expected, EntityDetail, from_dt, to_dt, "entity_uuid", "entity_detail_history")
+
+    changes = {}
+    with CaptureQueriesContext(connection) as queries:
+        fill_dict_with_transitions(changes, Entity, from_dt, to_dt, "uuid", "entity_history")
+        fill_dict_with_transitions(changes, EntityDetail, from_dt, to_dt, "entity_uuid", "entity_detail_history")
+    assert changes == expected
+    assert all("entities_entitychangelog" in query["sql"] and "LAG(" not in query["sql"] for query in queries)
+
+    # Transitions saved before the change log existed are logged by the backfill, once
+    EntityChangeLog.objects.all().delete()
+    out = StringIO()
+    call_command("scd2_backfill_change_log", stdout=out)
+    call_command("scd2_backfill_change_log", stdout=out)
+    assert out.getvalue().split("\n")[:2] == [
+        "entities.Entity: 1 change records written", "entities.EntityDetail: 1 change records written",
+    ]
+    assert EntityChangeLog.objects.count() == 2
+    changes = {}
+    fill_dict_with_transitions(changes, Entity, from_dt, to_dt, "uuid", "entity_history")
+    fill_dict_with_transitions(changes, EntityDetail, from_dt, to_dt, "entity_uuid", "entity_detail_history")
+    assert changes == expected
+
+
+def test_transitions_write_change_log(api_client, users, entity_type, entity, entity_detail):
+    api_client.force_authenticate(user=users["superuser"])
+    url = reverse("entity-snapshot", args=[entity.uuid])
+    api_client.patch(url, {"display_name": "Patched", "detail": {"value": "PatchedValue"}}, format="json")
+
+    Entity.bulk_new_versions([Entity(uuid=entity.uuid, display_name="Bulk", entity_type=entity_type)])
+
+    now = timezone.now()
+    entity_log = get_change_log(Entity, now - timedelta(hours=1), now, natural_key=(entity.uuid,))
+    assert [(log.field, log.old_value, log.new_value, log.changed_mask) for log in entity_log] == [
+        ("display_name", "MyEntity", "Patched", 1),
+        ("display_name", "Patched", "Bulk", 1),
+    ]
+    current = Entity.objects.current().get(uuid=entity.uuid)
+    assert entity_log.last().version_id == current.pk
+
+    [detail_log] = get_change_log(EntityDetail, now - timedelta(hours=1), now)
+    assert detail_log.natural_key == f"{entity.uuid}|{entity_detail.detail_code}"
+    assert (detail_log.old_value, detail_log.new_value) == ("InitialValue", "PatchedValue")
+
+
+def test_as_of_replays_from_snapshot(entity_type, entity, entity_detail):
+    two_hours_ago = timezone.now() - timedelta(hours=2)
+    Entity.objects.update(valid_from=two_hours_ago)
+    EntityDetail.objects.update(valid_from=two_hours_ago)
+    entity.refresh_from_db()
+
+    call_command("take_scd2_snapshots", "--interval", "hourly", stdout=StringIO())
+    taken_at = EntitySnapshot.objects.get(version=entity).taken_at
+    assert EntityDetailSnapshot.objects.filter(taken_at=taken_at, version=entity_detail).exists()
+
+    # Idempotent per checkpoint
+    call_command("take_scd2_snapshots", "--interval", "hourly", stdout=StringIO())
+    assert EntitySnapshot.objects.count() == 1
+
+    # Versions opened after the checkpoint are replayed on top of it
+    before_change = timezone.now()
+    created = Entity.objects.create(display_name="Created", entity_type=entity_type)
+    entity.display_name = "Renamed"
+    entity.save()
+    after_change = timezone.now()
+
+    assert set(Entity.objects.as_of(before_change).values_list("display_name", flat=True)) == {"MyEntity"}
+    assert set(Entity.objects.as_of(after_change).values_list("display_name", flat=True)) == {"Renamed", "Created"}
+    assert Entity.objects.as_of(after_change).filter(uuid=created.uuid).count() == 1
+    assert list(EntityDetail.objects.as_of(after_change)) == [entity_detail]
+
+    # Same answer as the full-history predicate
+    EntitySnapshot.objects.all().delete()
+    assert set(Entity.objects.as_of(after_change).values_list("display_name", flat=True)) == {"Renamed", "Created"}
+
+
+
+def test_as_of_is_lazy(entity, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        queryset = Entity.objects.as_of(timezone.now())
+
+    with django_assert_num_queries(1):
+        assert list(queryset) == [entity]
+
+
+def test_backdated_versions_invalidate_checkpoints(entity_type, entity):
+    three_hours_ago = timezone.now() - timedelta(hours=3)
+    Entity.objects.update(valid_from=three_hours_ago)
+    call_command("take_scd2_snapshots", "--interval", "hourly", "--backfill", "2", stdout=StringIO())
+    [older, latest] = sorted(set(EntitySnapshot.objects.values_list("taken_at", flat=True)))
+
+    # Committed after the checkpoints were taken, but valid at both of them
+    backdated = Entity(display_name="Backdated", entity_type=entity_type)
+    Entity.bulk_new_versions([backdated], timestamp=older - timedelta(minutes=1))
+
+    assert not EntitySnapshot.objects.exists()
+    assert set(Entity.objects.as_of(latest).values_list("display_name", flat=True)) == {"MyEntity", "Backdated"}
+
+    # Boundaries within the safety lag are not taken
+    with pytest.raises(ValueError):
+        take_snapshot(Entity, timezone.now())
+
+
+def test_validity_range_queries(entity_type, entity):
+    entity.display_name = "Renamed"
+    entity.save()
+    closed = Entity.objects.get(pk=entity.pk)
+    current = Entity.objects.current().get(uuid=entity.uuid)
+
+    assert closed.validity.lower == closed.valid_from
+    assert closed.validity.upper == current.valid_from == current.validity.lower
+    assert current.validity.upper is None
+
+    assert list(Entity.objects.as_of(closed.valid_from)) == [closed]
+    assert list(Entity.objects.as_of(current.valid_from)) == [current]
+    assert set(Entity.objects.overlapping(closed.valid_from)) == {closed, current}
+    assert list(Entity.objects.overlapping(current.valid_from, current.valid_from + timedelta(days=1))) == [current]
+    assert not Entity.objects.overlapping(closed.valid_from - timedelta(days=1), closed.valid_from).exists()
+
+
+def test_scd2_index_recipes():
+    indexes = get_scd2_index_list(
+        "very_long_tethered_model_name",
+        [CurrentIndex(["id"], include=["uuid"]), HistoryBrinIndex(pages_per_range=32)],
+    )
+
+    assert [type(index).__name__ for index in indexes] == ["GistIndex", "Index", "BrinIndex"]
+    assert all(len(index.name) <= 30 for index in indexes)
+    assert len({index.name for index in indexes}) == 3
+    assert indexes[1].include == ("uuid",) and indexes[1].condition is not None
+
+    with pytest.raises(ValueError):
+        get_scd2_index_list("entity", [CurrentIndex(["id"]), CurrentIndex(["uuid"])])
+
+
+def test_stale_transition_raises_version_conflict(entity_type, entity, monkeypatch):
+    stale = Entity.objects.get(pk=entity.pk)
+    entity.new_version(display_name="Winner")
+
+    with pytest.raises(SCD2VersionConflict):
+        stale.new_version(display_name="Loser")
+
+    # Bulk path that loaded the current versions before the concurrent transition
+    monkeypatch.setattr(
+        "core.models.scd2.bulk.get_current_by_natural_key", lambda model, keys: {(entity.uuid,): stale}
+    )
+    with pytest.raises(SCD2VersionConflict):
+        Entity.bulk_new_versions([Entity(uuid=entity.uuid, display_name="Bulk", entity_type=entity_type)])
+
+    assert list(Entity.objects.current().filter(uuid=entity.uuid).values_list("display_name", flat=True)) == ["Winner"]
+
+
+@pytest.mark.parametrize("mode", ["retry", "lock"])
+def test_run_transition_retries_conflicts(entity, mode):
+    attempts = []
+
+    def apply():
+        attempts.append(1)
+        current = Entity.objects.current().get(uuid=entity.uuid)
+        if len(attempts) == 1:
+            # A concurrent writer wins the first attempt
+            Entity.objects.get(pk=current.pk).new_version(display_name="Concurrent")
+            current.new_version(display_name="Mine")
+        return current.new_version(display_name="Mine")[0]
+
+    with override_settings(SCD2_CONCURRENCY={"MODE": mode, "RETRIES": 2, "BACKOFF": 0}):
+        result = run_transition(apply, model=Entity, key=(entity.uuid,))
+
+    assert len(attempts) == 2
+    assert result.display_name == "Mine"
+    assert Entity.objects.filter(uuid=entity.uuid).count() == 2
+
+
+@pytest.mark.parametrize("mode, queries", [("orm", 3), ("cte", 1)])
+def test_transition_uses_load_time_values(entity, mode, queries, monkeypatch, django_assert_num_queries):
+    monkeypatch.setattr(Entity.scd2_config, "transition_mode", mode)
+    loaded = Entity.objects.get(pk=entity.pk)
+    assert loaded.get_loaded_values() == {"display_name": "MyEntity", "is_current": True}
+
+    # No re-read of the stored row. orm: close UPDATE + INSERT + change log; cte: one statement
+    loaded.display_name = "Renamed"
+    with django_assert_num_queries(queries):
+        loaded.save()
+
+    closed = Entity.objects.get(pk=entity.pk)
+    current = Entity.objects.current().get(uuid=entity.uuid)
+    assert (closed.display_name, closed.is_current, closed.valid_to) == ("MyEntity", False, current.valid_from)
+    assert current.display_name == "Renamed"
+
+    # Saving an unchanged instance writes nothing
+    with django_assert_num_queries(0):
+        current.save()
+        current.save()
+
+
+def test_cte_transition_shares_database_timestamp(entity, entity_detail):
+    new_detail, old_detail = entity_detail.new_version(value="Changed")
+
+    closed = EntityDetail.objects.get(pk=old_detail.pk)
+    current = EntityDetail.objects.current().get(entity_uuid=entity.uuid)
+    assert current.pk == new_detail.pk
+    assert closed.valid_to == current.valid_from == current.created_at == closed.updated_at
+    assert current.hash_diff == current.compute_hash_diff()
+
+    [log] = get_change_log(EntityDetail, current.valid_from, current.valid_from)
+    assert (log.field, log.old_value, log.new_value) == ("value", "InitialValue", "Changed")
+    assert (log.version_id, log.previous_version_id) == (current.pk, closed.pk)
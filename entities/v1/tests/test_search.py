@@ -0,0 +1,54 @@
+import pytest
+from django.urls import reverse
+
+from entities.models import Entity, EntityDetail
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def entities(entity_type):
+    names = ["Northwind Traders", "Northwind Trading Company", "Contoso Bank", "Fabrikam"]
+    return {name: Entity.objects.create(display_name=name, entity_type=entity_type) for name in names}
+
+
+def search(api_client, users, **params):
+    api_client.force_authenticate(users["entity_admin"])
+    return api_client.get(reverse("entity"), {"search_mode": "ranked", **params})
+
+
+def test_ranked_search_orders_by_name_similarity(api_client, users, entities):
+    response = search(api_client, users, search="Northwind Tradrs")
+
+    assert response.status_code == 200
+    assert "Link" not in response
+    assert [item["display_name"] for item in response.data] == ["Northwind Traders", "Northwind Trading Company"]
+
+
+def test_ranked_search_matches_current_detail_values(api_client, users, entities):
+    contoso = entities["Contoso Bank"]
+    detail = EntityDetail.objects.create(entity_uuid=contoso.uuid, value="IBAN DE44 5001 0517")
+    EntityDetail.objects.create(entity_uuid=entities["Fabrikam"].uuid, value="iban FR76 3000")
+
+    response = search(api_client, users, search="DE44")
+    assert [item["uuid"] for item in response.data] == [str(contoso.uuid)]
+
+    # Closed versions are not searched
+    detail.new_version(save=True, value="IBAN NL91 ABNA")
+    assert search(api_client, users, search="DE44").data == []
+    assert len(search(api_client, users, search="iban").data) == 2
+
+
+def test_ranked_search_applies_filters_and_limit(api_client, users, entities):
+    response = search(api_client, users, search="Northwind", limit=1)
+    assert len(response.data) == 1
+
+    response = search(api_client, users, search="Northwind Traders", type="OTHER")
+    assert response.data == []
+
+
+@pytest.mark.parametrize("params", [{"search_mode": "fuzzy"}, {"limit": "0"}])
+def test_ranked_search_invalid_params(api_client, users, entities, params):
+    response = search(api_client, users, search="Northwind", **params)
+
+    assert response.status_code == 400
@@ -1,7 +1,8 @@
 from datetime import datetime, timezone
 
-from django.db import transaction
-from django.db.models import OuterRef, Exists, Q
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Exists
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema
 from rest_framework import exceptions as drf_exc
@@ -10,11 +11,80 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from auth.permissions import AccessPermissionFactory
-from core.models.scd2.changes import map_by_field, fill_dict_with_changes
+from core.models.scd2.changes import fill_dict_with_transitions
+from core.models.scd2.concurrency import SCD2VersionConflict, is_version_conflict, run_transition
+from core.models.scd2.prefetch import prefetch_versions
+from core.utils.db_json import is_db_json_enabled
+from core.utils.etag import (
+    ETAG_FIELDS,
+    check_if_match,
+    conditional_cached_response,
+    get_not_modified_response,
+    get_objects_etag,
+    get_queryset_etag,
+    make_etag,
+)
+from core.utils.exceptions import Conflict
 from core.utils.orm import get_one_or_fail, get_one_or_none
+from core.utils.pagination import KeysetPagination
+from core.utils.streaming import iter_row_records, ndjson_response
 from entities.models import Entity, EntityDetail
+from entities.models_config import EntityConfig
+from entities.search import DEFAULT_RANKED_LIMIT, MAX_RANKED_LIMIT, search_entities
 from . import docs
 from . import serializers as sz
+from .json_queries import get_history_query, get_snapshot_query
+
+
+def get_entity_not_found() -> Http404:
+    return Http404("No Entity matches the given query.")
+
+
+def get_snapshot_etag(entity_uuid) -> str | None:
+    return get_queryset_etag(
+        Entity.objects.current().filter(uuid=entity_uuid),
+        EntityDetail.objects.current().filter(entity_uuid=entity_uuid),
+    )
+
+
+SEARCH_MODES = ("contains", "ranked")
+INCLUDES = ("details",)
+
+
+def get_search_mode(params) -> str:
+    search_mode = params.get("search_mode", "contains")
+    if search_mode not in SEARCH_MODES:
+        raise drf_exc.ValidationError({"search_mode": f"Use one of: {', '.join(SEARCH_MODES)}."})
+    return search_mode
+
+
+def get_ranked_limit(params) -> int:
+    try:
+        limit = int(params.get("limit", DEFAULT_RANKED_LIMIT))
+    except ValueError:
+        raise drf_exc.ValidationError({"limit": "A positive integer is required."})
+    if limit < 1:
+        raise drf_exc.ValidationError({"limit": "A positive integer is required."})
+    return min(limit, MAX_RANKED_LIMIT)
+
+
+def get_includes(params) -> set[str]:
+    includes = {name.strip() for name in params.get("include", "").split(",") if name.strip()}
+    unknown = includes.difference(INCLUDES)
+    if unknown:
+        raise drf_exc.ValidationError({"include": f"Unknown: {', '.join(sorted(unknown))}. Use: {', '.join(INCLUDES)}."})
+    return includes
+
+
+def get_list_data(entities: list, includes: set[str]) -> list[dict]:
+    """
+    `EntitySerializer` / `EntityWithDetailsSerializer` output of the listed entities, mapped by the row serializers.
+    """
+    data = sz.entity_rows.objects(entities)
+    if "details" in includes:
+        for item, entity in zip(data, entities):
+            item["details"] = sz.entity_detail_rows.objects(entity.current_details)
+    return data
 
 
 class EntitiesAPIView(APIView):
@@ -28,15 +98,19 @@ class EntitiesAPIView(APIView):
 
 
 class EntitiesView(EntitiesAPIView):
+    pagination_class = KeysetPagination
+
     @extend_schema(**docs.EntitiesViewDoc.get)
     def get(self, request):
         search_term = request.query_params.get("search")
         type_code = request.query_params.get("type")
         detail_code = request.query_params.get("detail_code")
+        search_mode = get_search_mode(request.query_params)
+        includes = get_includes(request.query_params)
 
         entities = Entity.objects.current()
 
-        if search_term:
+        if search_term and search_mode == "contains":
             entities = entities.filter(display_name__icontains=search_term)
         if type_code:
             entities = entities.filter(entity_type__code=type_code)
@@ -51,8 +125,45 @@ class EntitiesView(EntitiesAPIView):
                 .filter(has_detail=True)
             )
 
-        serializer = sz.EntitySerializer(entities, many=True)
-        return Response(serializer.data)
+        if search_term and search_mode == "ranked":
+            return self.get_ranked(request, entities, search_term, includes)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(entities, request, view=self)
+        etag = self.get_page_etag(page, includes)
+
+        # Unchanged page: answer 304 before serialization
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = paginator.get_paginated_response(get_list_data(page, includes))
+        response["ETag"] = etag
+        return response
+
+    @staticmethod
+    def get_page_etag(page: list[Entity], includes: set[str]) -> str:
+        """
+        ETag of the listed entities; with `include=details` their current details are
+        loaded in one batched query and part of the ETag.
+        """
+        if "details" not in includes:
+            return get_objects_etag(page)
+        details = prefetch_versions(page, EntityDetail.objects.current(), "entity_uuid", "current_details")
+        return get_objects_etag(page, details)
+
+    def get_ranked(self, request, entities, search_term, includes) -> Response:
+        """
+        Top-K entities ranked by name similarity and detail value matches, best first (not paginated).
+        """
+        ranked = search_entities(entities, search_term, get_ranked_limit(request.query_params))
+        etag = self.get_page_etag(ranked, includes)
+
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        return Response(get_list_data(ranked, includes), headers={"ETag": etag})
 
     @extend_schema(**docs.EntitiesViewDoc.post)
     def post(self, request):
@@ -85,68 +196,90 @@ class EntitySnapshotView(EntitiesAPIView):
     """
     @extend_schema(**docs.EntitySnapshotViewDoc.get)
     def get(self, request, entity_uuid):
+        db_json = is_db_json_enabled()
+        return conditional_cached_response(
+            request,
+            EntityConfig.scd2.cache_namespace,
+            entity_uuid,
+            "snapshot:json" if db_json else "snapshot",
+            build=lambda: self.render_snapshot(entity_uuid) if db_json else self.get_snapshot(entity_uuid),
+            get_etag=lambda: get_snapshot_etag(entity_uuid),
+            raw=db_json,
+        )
+
+    @staticmethod
+    def get_snapshot(entity_uuid) -> tuple[str, dict]:
         entity = get_object_or_404(
             Entity.objects.current(),
             uuid=entity_uuid
         )
-
-        details_qs = get_one_or_fail(
-            EntityDetail.objects.current().filter(entity_uuid=entity.uuid),
-            rest=True,
-        )
+        details = list(EntityDetail.objects.current().filter(entity_uuid=entity.uuid).order_by("id"))
 
         serializer = sz.EntitySnapshotSerializer(entity)
         data = serializer.data
-        data["detail"] = sz.EntityDetailSerializer(details_qs, many=False).data
-
-        return Response(data, status=status.HTTP_200_OK)
+        data["detail"] = sz.EntityDetailSerializer(details[0]).data if details else None
+        data["details"] = sz.EntityDetailSerializer(details, many=True).data
+
+        # ETag rows in get_queryset_etag() order
+        details.sort(key=lambda detail: (detail.valid_from, detail.id), reverse=True)
+        return get_objects_etag([entity], details), data
+
+    @staticmethod
+    def render_snapshot(entity_uuid) -> tuple[str, str]:
+        """
+        `get_snapshot` as one statement rendered by Postgres.
+        """
+        body, etag_rows = get_snapshot_query(entity_uuid).fetch()
+        if body is None:
+            raise get_entity_not_found()
+        return make_etag(etag_rows["entity"], etag_rows["detail"]), body
 
     @extend_schema(**docs.EntitySnapshotViewDoc.patch)
     def patch(self, request, entity_uuid):
-        save_list = []  # Order makes sense
-
-        # Entity flow: process entity data only after ensuring it exists
-        entity: Entity = get_one_or_fail(
-            Entity.objects.current().filter(uuid=entity_uuid),
-            rest=True,
-        )
-
         entity_data = dict(request.data)
         entity_data.pop("detail", None)
-
-        if entity.check_fields_change(entity_data):
-            entity_nv, entity_ov = entity.new_version(**entity_data, save=False)
-            save_list.append(entity_ov)  # Close old version first
-            save_list.append(entity_nv)
-
-            entity = entity_nv
-
-        # Detail flow: only fetch entity detail if detail data is provided
         detail_data = request.data.get("detail", [])
 
-        if detail_data:
-            entity_detail: EntityDetail = get_one_or_none(
-                EntityDetail.objects.current().filter(entity_uuid=entity_uuid),
+        def apply() -> Entity:
+            # Entity flow: (re-)read the current version on every attempt
+            entity: Entity = get_one_or_fail(
+                Entity.objects.current().filter(uuid=entity_uuid),
                 rest=True,
             )
+            check_if_match(request, lambda: get_snapshot_etag(entity_uuid))
 
-            if entity_detail:
-                if entity_detail.check_fields_change(detail_data):
-                    detail_nv, detail_ov = entity_detail.new_version(**detail_data)
-                    save_list.append(detail_ov)  # Close old version first
-                    save_list.append(detail_nv)
-            else:
-                entity_detail = EntityDetail(
-                    entity_uuid=entity_uuid,
-                    **detail_data
+            # Transitions close the old version (conditionally), open a new one and write the change log
+            if entity.check_fields_change(entity_data):
+                entity, _ = entity.new_version(save=True, with_transaction=False, **entity_data)
+
+            # Detail flow: only fetch entity detail if detail data is provided
+            if detail_data:
+                entity_detail: EntityDetail = get_one_or_none(
+                    EntityDetail.objects.current().filter(entity_uuid=entity_uuid),
+                    rest=True,
                 )
-                # entity_detail.save()
-                save_list.append(entity_detail)
 
-        # Commit
-        with transaction.atomic():
-            for instance in save_list:
-                instance.save()
+                if entity_detail:
+                    if entity_detail.check_fields_change(detail_data):
+                        entity_detail.new_version(save=True, with_transaction=False, **detail_data)
+                else:
+                    try:
+                        EntityDetail(
+                            entity_uuid=entity_uuid,
+                            **detail_data
+                        ).save()
+                    except IntegrityError as error:
+                        # A concurrent request created the first detail: retry, which transitions it instead
+                        if is_version_conflict(EntityDetail, error):
+                            raise SCD2VersionConflict(str(error)) from error
+                        raise
+
+            return entity
+
+        try:
+            entity = run_transition(apply, model=Entity, key=(entity_uuid,))
+        except SCD2VersionConflict:
+            raise Conflict()
 
         entity_serialized = sz.EntitySerializer(entity).data
         entity_detail_serialized = sz.EntityDetailSerializer(
@@ -167,26 +300,55 @@ class EntityHistoryView(EntitiesAPIView):
     """
     @extend_schema(**docs.EntityHistoryViewDoc.get)
     def get(self, request, entity_uuid):
-        get_object_or_404(Entity.objects.current(), uuid=entity_uuid)
+        db_json = is_db_json_enabled()
+        return conditional_cached_response(
+            request,
+            EntityConfig.scd2.cache_namespace,
+            entity_uuid,
+            "history:json" if db_json else "history",
+            build=lambda: self.render_history(entity_uuid) if db_json else self.get_history(entity_uuid),
+            get_etag=lambda: get_queryset_etag(
+                Entity.objects.filter(uuid=entity_uuid),
+                EntityDetail.objects.filter(entity_uuid=entity_uuid),
+            ),
+            raw=db_json,
+        )
 
-        entity_history = Entity.objects.filter(uuid=entity_uuid).order_by("-valid_from")
-        entity_history = sz.EntityHistorySerializer(entity_history, many=True).data
+    @staticmethod
+    def get_history(entity_uuid) -> tuple[str, dict]:
+        entity_history, entity_etag_rows = sz.entity_history_rows.values_with(
+            Entity.objects.filter(uuid=entity_uuid).order_by("-valid_from", "-id"), ETAG_FIELDS
+        )
+        # Current version: open validity
+        if not any(valid_to is None for _, _, valid_to in entity_etag_rows):
+            raise get_entity_not_found()
+        entity_detail_history, detail_etag_rows = sz.entity_detail_history_rows.values_with(
+            EntityDetail.objects.filter(entity_uuid=entity_uuid).order_by("-valid_from", "-id"), ETAG_FIELDS
+        )
 
-        entity_detail_history = EntityDetail.objects.filter(entity_uuid=entity_uuid).order_by("-valid_from")
-        entity_detail_history = sz.EntityDetailHistorySerializer(entity_detail_history, many=True).data
+        etag = make_etag(entity_etag_rows, detail_etag_rows)
+        return etag, {
+            "entity_history": entity_history,
+            "entity_detail_history": entity_detail_history,
+        }
 
-        return Response(
-            {
-                "entity_history": entity_history,
-                "entity_detail_history": entity_detail_history
-            }
-        )
+    @staticmethod
+    def render_history(entity_uuid) -> tuple[str, str]:
+        """
+        `get_history` as one statement rendered by Postgres.
+        """
+        body, etag_rows = get_history_query(entity_uuid).fetch()
+        # Current version: open validity
+        if not any(valid_to is None for _, _, valid_to in etag_rows["entity"]):
+            raise get_entity_not_found()
+        return make_etag(etag_rows["entity"], etag_rows["detail"]), body
 
 
 class EntityAsOfView(EntitiesAPIView):
     """
-    GET /api/v1/entities-asof?as_of=YYYY-MM-DD
+    GET /api/v1/entities-asof?as_of=YYYY-MM-DD[&stream=true]
     Returns a snapshot of all Entities and their Details valid at the specified date. Uses SCD2 logic.
+    With `stream=true` rows are streamed as NDJSON through server-side cursors.
     """
     @extend_schema(**docs.EntityAsOfViewDoc.get)
     def get(self, request):
@@ -199,17 +361,17 @@ class EntityAsOfView(EntitiesAPIView):
 
         as_of_datetime = datetime.combine(as_of_date, datetime.min.time(), tzinfo=timezone.utc)
 
-        filter_kwargs = {
-            "valid_from__lte": as_of_datetime,
-            "valid_to__gt": as_of_datetime,
-        }
-        filter_q = Q(**filter_kwargs) | Q(valid_from__lte=as_of_datetime, valid_to__isnull=True)
+        entities = Entity.objects.as_of(as_of_datetime).order_by("id")
+        entity_details = EntityDetail.objects.as_of(as_of_datetime).order_by("id")
 
-        entities = Entity.objects.filter(filter_q)
-        entities = sz.EntityHistorySerializer(entities, many=True).data
+        if request.query_params.get("stream", "").lower() in ("1", "true", "ndjson"):
+            return ndjson_response(
+                iter_row_records(entities, sz.entity_history_rows, "entity"),
+                iter_row_records(entity_details, sz.entity_detail_history_rows, "entity_detail"),
+            )
 
-        entity_details = EntityDetail.objects.filter(filter_q)
-        entity_details = sz.EntityDetailHistorySerializer(entity_details, many=True).data
+        entities = sz.entity_history_rows.values(entities)
+        entity_details = sz.entity_detail_history_rows.values(entity_details)
 
         return Response(
             {
@@ -238,20 +400,13 @@ class EntityDiffView(EntitiesAPIView):
         from_dt = datetime.combine(from_date, datetime.min.time(), tzinfo=timezone.utc)
         to_dt = datetime.combine(to_date, datetime.max.time(), tzinfo=timezone.utc)
 
-        filter_q = Q(valid_from__lte=to_dt) & (Q(valid_to__gte=from_dt) | Q(valid_to__isnull=True))
-
-        entity_history = Entity.objects.filter(filter_q).order_by("-valid_from")
-        entity_detail_history = EntityDetail.objects.filter(filter_q).order_by("-valid_from")
-
-        response = {}
-
-        entity_versions_by_uuid = map_by_field(entity_history, "uuid")
-        detail_versions_by_uuid = map_by_field(entity_detail_history, "entity_uuid")
-
         entity_changes: dict = {}
-        fill_dict_with_changes(entity_changes, entity_versions_by_uuid, "entity_history")
-        fill_dict_with_changes(entity_changes, detail_versions_by_uuid, "entity_detail_history")
+        fill_dict_with_transitions(entity_changes, Entity, from_dt, to_dt, "uuid", "entity_history")
+        fill_dict_with_transitions(
+            entity_changes, EntityDetail, from_dt, to_dt, "entity_uuid", "entity_detail_history"
+        )
 
+        response = {}
         response["entity_changes"] = entity_changes
 
         return Response(